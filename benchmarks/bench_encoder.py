@@ -0,0 +1,92 @@
+"""
+Benchmark for the bulk edge encoding in `matcher/encoder.py`.
+
+Compares the bulk encoding path of the Encoder against the per-edge Python
+loop it replaced, on a synthetic venue, and checks that both produce the same
+score matrix. For example:
+
+    python benchmarks/bench_encoder.py --papers 10000 --reviewers 20000
+
+Note that a 10k x 20k float64 matrix takes 1.6GB, and the Encoder holds
+several of them.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from matcher.encoder import Encoder
+
+
+def loop_encode_scores(encoder, scores):
+    """The per-edge encoding loop, kept as a reference implementation."""
+    default = scores.get("default", 0)
+    edges = scores.get("edges", [])
+    score_matrix = np.full(encoder.matrix_shape, default, dtype=float)
+
+    for forum, user, score in edges:
+        coordinates = (
+            encoder.index_by_forum[forum],
+            encoder.index_by_user[user],
+        )
+        score_matrix[coordinates] = score
+
+    return score_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", default=10000, type=int)
+    parser.add_argument("--reviewers", default=20000, type=int)
+    parser.add_argument(
+        "--edges_per_paper",
+        default=500,
+        type=int,
+        help="number of score edges sampled for each paper",
+    )
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    papers = ["paper{}".format(i) for i in range(args.papers)]
+    reviewers = ["~Reviewer_{}1".format(i) for i in range(args.reviewers)]
+
+    paper_indices = np.repeat(np.arange(args.papers), args.edges_per_paper)
+    reviewer_indices = rng.integers(0, args.reviewers, paper_indices.size)
+    scores = rng.random(paper_indices.size)
+    edges = [
+        (papers[p], reviewers[r], s)
+        for p, r, s in zip(
+            paper_indices.tolist(),
+            reviewer_indices.tolist(),
+            scores.tolist(),
+        )
+    ]
+    scores_by_type = {"scores": {"edges": edges}}
+    print(
+        "{} papers x {} reviewers, {} edges".format(
+            args.papers, args.reviewers, len(edges)
+        )
+    )
+
+    start = time.time()
+    encoder = Encoder(reviewers, papers, [], scores_by_type, {"scores": 1})
+    print("Encoder construction: {:.2f}s".format(time.time() - start))
+
+    start = time.time()
+    bulk_matrix = encoder._encode_scores(scores_by_type["scores"])
+    bulk_time = time.time() - start
+    print("bulk _encode_scores: {:.2f}s".format(bulk_time))
+
+    start = time.time()
+    loop_matrix = loop_encode_scores(encoder, scores_by_type["scores"])
+    loop_time = time.time() - start
+    print("loop _encode_scores: {:.2f}s".format(loop_time))
+
+    print("speedup: {:.1f}x".format(loop_time / bulk_time))
+    assert np.array_equal(bulk_matrix, loop_matrix)
+
+
+if __name__ == "__main__":
+    main()
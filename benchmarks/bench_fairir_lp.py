@@ -0,0 +1,118 @@
+"""
+Benchmark for the LP backends of `matcher/solvers/fairir.py`.
+
+Solves the same synthetic venue with FairIR once per LP backend and reports
+the runtime, the number of LP solves of the makespan search and rounding
+loop, the objective (total affinity of the assignment) and the smallest paper
+score of each. For example, at venue scale:
+
+    python benchmarks/bench_fairir_lp.py --papers 2000 --reviewers 1500 \
+        --edges_per_paper 100 --sparse
+
+The size-limited Gurobi license that ships with gurobipy only solves models
+with up to 2000 variables and constraints. Backends that fail are reported
+with their error instead of stopping the benchmark.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from matcher.encoder import Encoder
+from matcher.solvers import FairIR
+from matcher.solvers.lp_backends import LP_BACKENDS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", default=200, type=int)
+    parser.add_argument("--reviewers", default=150, type=int)
+    parser.add_argument(
+        "--edges_per_paper",
+        default=40,
+        type=int,
+        help="number of score edges sampled for each paper",
+    )
+    parser.add_argument("--demand", default=3, type=int)
+    parser.add_argument(
+        "--thresh",
+        default=0.0,
+        type=float,
+        help="fairness threshold, 0 searches for one",
+    )
+    parser.add_argument("--sparse", action="store_true")
+    parser.add_argument(
+        "--backends", nargs="+", default=list(LP_BACKENDS), choices=LP_BACKENDS
+    )
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    papers = ["paper{}".format(i) for i in range(args.papers)]
+    reviewers = ["~Reviewer_{}1".format(i) for i in range(args.reviewers)]
+
+    edges = []
+    for p in range(args.papers):
+        sampled = rng.choice(
+            args.reviewers, args.edges_per_paper, replace=False
+        )
+        scores = np.round(rng.random(args.edges_per_paper), 3)
+        edges.extend(
+            (papers[p], reviewers[r], s)
+            for r, s in zip(sampled.tolist(), scores.tolist())
+        )
+    scores_by_type = {"scores": {"edges": edges}}
+    encoder = Encoder(
+        reviewers,
+        papers,
+        [],
+        scores_by_type,
+        {"scores": 1},
+        sparse=args.sparse,
+    )
+
+    max_load = int(np.ceil(args.demand * args.papers / args.reviewers)) + 1
+    print(
+        "{} papers x {} reviewers, {} edges, demand {}, max load {}".format(
+            args.papers, args.reviewers, len(edges), args.demand, max_load
+        )
+    )
+
+    if args.sparse:
+        score_matrix = encoder.sparse_aggregate_score_matrix.toarray()
+    else:
+        score_matrix = encoder.aggregate_score_matrix
+    for backend in args.backends:
+        start = time.time()
+        try:
+            solver = FairIR(
+                [0] * args.reviewers,
+                [max_load] * args.reviewers,
+                [args.demand] * args.papers,
+                encoder,
+                thresh=args.thresh,
+                lp_backend=backend,
+            )
+            # count the LP solves, each one restarts from the last basis
+            lp_solve, lp_solves = solver.lp.solve, []
+            solver.lp.solve = lambda: lp_solves.append(1) or lp_solve()
+            assignment = solver.solve()
+        except Exception as e:
+            print("{:>8}: failed ({})".format(backend, e))
+            continue
+        paper_scores = (assignment * score_matrix).sum(axis=1)
+        print(
+            "{:>8}: {:.2f}s, {} LP solves, objective {:.3f}, "
+            "min paper score {:.3f}".format(
+                backend,
+                time.time() - start,
+                len(lp_solves),
+                paper_scores.sum(),
+                paper_scores.min(),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
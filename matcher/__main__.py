@@ -65,6 +65,83 @@ parser.add_argument(
     action="store_true",
     help="""Use flag to allow 0 affinity (unknown scores default to 0) pairs in solver solution""",
 )
+parser.add_argument(
+    "--sparse_encoding",
+    action="store_true",
+    help="""Use flag to keep the score and constraint matrices sparse, for venues with many more papers x reviewers than score edges""",
+)
+parser.add_argument(
+    "--compact_encoding",
+    action="store_true",
+    help="""Use flag to store constraints as int8 and scores as float32, to reduce the memory used by the encoded matrices""",
+)
+parser.add_argument(
+    "--solver_threads",
+    type=int,
+    help="""Number of Gurobi threads for FairIR and PerturbedMaximization, defaults to the available CPUs divided by --concurrent_workers""",
+)
+parser.add_argument(
+    "--solver_memory_limit",
+    type=float,
+    help="""Gurobi memory limit in GB for FairIR and PerturbedMaximization""",
+)
+parser.add_argument(
+    "--solver_method",
+    type=int,
+    help="""Gurobi LP method for FairIR and PerturbedMaximization (-1 automatic, 0 primal simplex, 1 dual simplex, 2 barrier)""",
+)
+parser.add_argument(
+    "--solver_time_limit",
+    type=float,
+    help="""Gurobi time limit in seconds for each LP solve of FairIR and PerturbedMaximization""",
+)
+parser.add_argument(
+    "--concurrent_workers",
+    type=int,
+    help="""Number of matcher processes sharing this machine, used to split its CPUs and memory between them""",
+)
+parser.add_argument(
+    "--fairir_lp_backend",
+    default="gurobi",
+    choices=["gurobi", "highs"],
+    help="""LP solver of the FairIR relaxations, highs (from SciPy) does not need a Gurobi license""",
+)
+parser.add_argument(
+    "--minmax_single_flow",
+    action="store_true",
+    help="""Use flag to solve MinMax with one min-cost flow that prices the load above the reviewer minimums, instead of two""",
+)
+parser.add_argument(
+    "--minmax_candidate_limit",
+    type=int,
+    help="""Start each MinMax flow graph with the arcs of every reviewer's and paper's k lowest cost pairs, and add the others only as needed for an optimal solution""",
+)
+parser.add_argument(
+    "--decompose_components",
+    action="store_true",
+    help="""Use flag to solve each connected component of the assignable pairs separately with MinMax and FairFlow""",
+)
+parser.add_argument(
+    "--flow_processes",
+    type=int,
+    help="""Number of processes used by MinMax and FairFlow to solve the components, and by the FairFlow parallel search, defaults to the available CPUs""",
+)
+parser.add_argument(
+    "--fairflow_parallel_search",
+    action="store_true",
+    help="""Use flag to evaluate several FairFlow makespans at once, in up to --flow_processes processes""",
+)
+parser.add_argument(
+    "--fairflow_search_tolerance",
+    default=0.0,
+    type=float,
+    help="""Relative gap between the feasible and infeasible makespans at which FairFlow stops searching""",
+)
+parser.add_argument(
+    "--fairflow_warm_start",
+    action="store_true",
+    help="""Use flag to try each FairFlow makespan starting from the best solution found so far""",
+)
 parser.add_argument("--user_group", type=str)
 
 parser.add_argument(
@@ -287,7 +364,24 @@ match_data = {
     "bad_match_thresholds": bad_match_thresholds,
     "num_alternates": num_alternates,
     "allow_zero_score_assignments": args.allow_zero_score_assignments,
+    "sparse_encoding": args.sparse_encoding,
+    "compact_encoding": args.compact_encoding,
     "attribute_constraints": attr_constraints,
+    "solver_resources": {
+        "threads": args.solver_threads,
+        "memory_limit": args.solver_memory_limit,
+        "method": args.solver_method,
+        "time_limit": args.solver_time_limit,
+        "concurrent_workers": args.concurrent_workers,
+    },
+    "fairir_lp_backend": args.fairir_lp_backend,
+    "minmax_single_flow": args.minmax_single_flow,
+    "minmax_candidate_limit": args.minmax_candidate_limit,
+    "decompose_components": args.decompose_components,
+    "flow_processes": args.flow_processes,
+    "fairflow_parallel_search": args.fairflow_parallel_search,
+    "fairflow_search_tolerance": args.fairflow_search_tolerance,
+    "fairflow_warm_start": args.fairflow_warm_start,
     "assignments_output": "assignments.json",
     "alternates_output": "alternates.json",
     "logger": logger,
@@ -24,6 +24,9 @@ SOLVER_MAP = {
     "PerturbedMaximization": PerturbedMaximizationSolver
 }
 
+# Solvers that run on Gurobi and take its resource settings
+GUROBI_SOLVERS = (FairIR, PerturbedMaximizationSolver)
+
 
 class MatcherStatus(Enum):
     INITIALIZED = "Initialized"
@@ -61,7 +64,18 @@ class KeywordDatasource:
         perturbation=0.0,
         bad_match_thresholds=[],
         allow_zero_score_assignments=False,
+        sparse_encoding=False,
+        compact_encoding=False,
         attribute_constraints=None,
+        solver_resources=None,
+        fairir_lp_backend="gurobi",
+        minmax_single_flow=False,
+        minmax_candidate_limit=None,
+        decompose_components=False,
+        flow_processes=None,
+        fairflow_parallel_search=False,
+        fairflow_search_tolerance=0.0,
+        fairflow_warm_start=False,
         assignments_output="assignments.json",
         alternates_output="alternates.json",
         logger=logging.getLogger(__name__),
@@ -78,7 +92,18 @@ class KeywordDatasource:
         self.probability_limits = probability_limits
         self.num_alternates = num_alternates
         self.allow_zero_score_assignments = allow_zero_score_assignments
+        self.sparse_encoding = sparse_encoding
+        self.compact_encoding = compact_encoding
         self.attribute_constraints = attribute_constraints
+        self.solver_resources = solver_resources if solver_resources else {}
+        self.fairir_lp_backend = fairir_lp_backend
+        self.minmax_single_flow = minmax_single_flow
+        self.minmax_candidate_limit = minmax_candidate_limit
+        self.decompose_components = decompose_components
+        self.flow_processes = flow_processes
+        self.fairflow_parallel_search = fairflow_parallel_search
+        self.fairflow_search_tolerance = fairflow_search_tolerance
+        self.fairflow_warm_start = fairflow_warm_start
         self.normalization_types = []
         self.perturbation = perturbation
         self.bad_match_thresholds = bad_match_thresholds
@@ -171,12 +196,47 @@ class Matcher:
                 attribute_constraints=self.datasource.attribute_constraints,
                 perturbation=self.datasource.perturbation,
                 bad_match_thresholds=self.datasource.bad_match_thresholds,
+                sparse=getattr(self.datasource, "sparse_encoding", False),
+                compact=getattr(self.datasource, "compact_encoding", False),
                 logger=self.logger,
             )
 
             self.logger.debug("Preparing solver")
 
             # solver
+            solver_kwargs = {}
+            if self.solver_class in GUROBI_SOLVERS:
+                solver_kwargs["resources"] = getattr(
+                    self.datasource, "solver_resources", None
+                )
+            if self.solver_class is FairIR:
+                solver_kwargs["lp_backend"] = getattr(
+                    self.datasource, "fairir_lp_backend", "gurobi"
+                )
+            if self.solver_class is MinMaxSolver:
+                solver_kwargs["single_flow"] = getattr(
+                    self.datasource, "minmax_single_flow", False
+                )
+                solver_kwargs["candidate_limit"] = getattr(
+                    self.datasource, "minmax_candidate_limit", None
+                )
+            if self.solver_class in (MinMaxSolver, FairFlow):
+                solver_kwargs["decompose"] = getattr(
+                    self.datasource, "decompose_components", False
+                )
+                solver_kwargs["processes"] = getattr(
+                    self.datasource, "flow_processes", None
+                )
+            if self.solver_class is FairFlow:
+                solver_kwargs["parallel_search"] = getattr(
+                    self.datasource, "fairflow_parallel_search", False
+                )
+                solver_kwargs["search_tolerance"] = getattr(
+                    self.datasource, "fairflow_search_tolerance", 0.0
+                )
+                solver_kwargs["warm_start"] = getattr(
+                    self.datasource, "fairflow_warm_start", False
+                )
             solver = self.solver_class(
                 self.datasource.minimums,
                 self.datasource.maximums,
@@ -184,6 +244,7 @@ class Matcher:
                 encoder,
                 allow_zero_score_assignments=self.datasource.allow_zero_score_assignments,
                 logger=self.logger,
+                **solver_kwargs,
             )
 
             solution = None
@@ -216,6 +277,14 @@ class Matcher:
                         )
                     )
                 additional_status_info = {}
+                if self.solver_class in GUROBI_SOLVERS:
+                    additional_status_info["solver_resources"] = json.dumps(
+                        solver.resources
+                    )
+                if self.solver_class is FairIR:
+                    additional_status_info["fairir_lp_backend"] = (
+                        solver.lp_backend
+                    )
                 if hasattr(solver, "get_fraction_of_opt"):
                     additional_status_info["randomized_fraction_of_opt"] = str(
                         solver.get_fraction_of_opt()
@@ -5,7 +5,10 @@ Responsible for:
 """
 
 from collections import defaultdict, namedtuple
+from itertools import islice
+from operator import itemgetter
 import numpy as np
+from scipy import sparse as sp
 import json
 import logging
 
@@ -25,6 +28,87 @@ class EncoderError(Exception):
     pass
 
 
+class DefaultSparseMatrix:
+    """
+    A (papers, reviewers) matrix that only stores the entries which differ
+    from a default value. Used by the Encoder in sparse mode.
+
+    Arguments:
+    - `offsets`:
+        a scipy.sparse matrix, holding the difference between each stored
+        entry and `default`.
+
+    - `default`:
+        a scalar, the value of every entry that is not stored in `offsets`.
+    """
+
+    def __init__(self, offsets, default=0):
+        self.offsets = sp.csr_matrix(offsets)
+        self.default = default
+
+    @property
+    def shape(self):
+        return self.offsets.shape
+
+    @property
+    def dtype(self):
+        return self.offsets.dtype
+
+    @property
+    def nnz(self):
+        return self.offsets.nnz
+
+    def toarray(self):
+        """Return the matrix as a dense numpy.ndarray."""
+        dense = self.offsets.toarray()
+        if self.default != 0:
+            dense += self.default
+        return dense
+
+    def entries(self):
+        """
+        Return the row indices, column indices, and values of the stored
+        entries, in row-major order.
+        """
+        offsets = self.offsets.tocoo()
+        return offsets.row, offsets.col, offsets.data + self.default
+
+    def values_at(self, rows, cols):
+        """Return the values at the given row and column indices."""
+        if len(rows) == 0:
+            return np.zeros(0, dtype=self.dtype) + self.default
+        return np.asarray(self.offsets[rows, cols]).ravel() + self.default
+
+    def submatrix(self, rows, cols):
+        """Return the matrix restricted to the given row and column indices."""
+        return DefaultSparseMatrix(self.offsets[rows][:, cols], self.default)
+
+    def any(self):
+        return self.default != 0 or self.offsets.count_nonzero() > 0
+
+    def min(self):
+        return self.offsets.min() + self.default
+
+    def max(self):
+        return self.offsets.max() + self.default
+
+    def __mul__(self, scalar):
+        return DefaultSparseMatrix(
+            self.offsets * scalar, self.default * scalar
+        )
+
+    __rmul__ = __mul__
+
+    def __add__(self, other):
+        if isinstance(other, DefaultSparseMatrix):
+            return DefaultSparseMatrix(
+                self.offsets + other.offsets, self.default + other.default
+            )
+        return DefaultSparseMatrix(self.offsets, self.default + other)
+
+    __radd__ = __add__
+
+
 class Encoder:
     """
      Responsible for keeping track of paper and reviewer indexes.
@@ -42,8 +126,16 @@ class Encoder:
 
      - `scores_by_type`:
          a dict, keyed on string IDs representing score 'types',
-         where each value is a list of triples, formatted as follows:
+         where each value is a dict with an optional "default" score and
+         "edges": a list, or any iterable (e.g. a generator), of triples,
+         formatted as follows:
          (<str paper_ID>, <str reviewer_ID>, <float score>)
+         and/or "batches": an iterable of columnar batches, formatted as
+         follows:
+         (<paper_IDs>, <reviewer_IDs>, <scores>), three sequences of equal
+         length.
+         Iterables are consumed `edge_chunk_size` edges at a time, so they are
+         never held in memory in full.
 
     - `weight_by_type`:
          a dict, keyed on string IDs that match those in `scores_by_type`,
@@ -64,8 +156,24 @@ class Encoder:
      - `bad_match_thresholds`:
          a list of floats, representing the thresholds in affinity score for 
          categorizing a paper-reviewer match, used by the Perturbed Maximization Solver.
+
+     - `sparse`:
+         a boolean. If True, score, cost, constraint and probability limit
+         matrices are kept as DefaultSparseMatrix objects (available as
+         `score_matrices` and the `sparse_*` attributes), so that memory scales
+         with the number of edges. Solvers that can't consume sparse input get
+         a dense view through `aggregate_score_matrix`, `cost_matrix`,
+         `constraint_matrix` and `prob_limit_matrix`, which is built the first
+         time it is requested.
+
+     - `compact`:
+         a boolean. If True, constraints are stored as int8 and scores and
+         costs as float32, and a single float `probability_limits` is
+         broadcast as a read-only view instead of a full matrix.
     """
 
+    edge_chunk_size = 100000
+
     def __init__(
         self,
         reviewers,
@@ -78,9 +186,16 @@ class Encoder:
         attribute_constraints=None,
         perturbation=0.0,
         bad_match_thresholds=[],
+        sparse=False,
+        compact=False,
         logger=logging.getLogger(__name__),
     ):
         self.logger = logger
+        self.sparse = sparse
+        self.compact = compact
+        self.score_dtype = np.float32 if compact else float
+        self.constraint_dtype = np.int8 if compact else int
+        self._dense_matrices = {}
 
         if len(reviewers) == 0:
             raise EncoderError("Reviewers List can not be empty.")
@@ -117,10 +232,8 @@ class Encoder:
                 without_normalization_matrices[score_type] = scores
 
         self.logger.debug("Init conflicts")
-        self.constraint_matrix = self._encode_constraints(constraints)
-        self.prob_limit_matrix = self._encode_probability_limits(
-            probability_limits
-        )
+        constraint_matrix = self._encode_constraints(constraints)
+        prob_limit_matrix = self._encode_probability_limits(probability_limits)
 
         self.perturbation = perturbation
         self.bad_match_thresholds = [
@@ -152,12 +265,17 @@ class Encoder:
         self.attribute_constraints = constraints_list
 
         # don't use numpy.sum() here. it will collapse the matrices into a single value.
-        self.aggregate_score_matrix = np.full(
-            self.matrix_shape, 0, dtype=float
-        )
+        if self.sparse:
+            aggregate_score_matrix = DefaultSparseMatrix(
+                sp.csr_matrix(self.matrix_shape, dtype=self.score_dtype), 0.0
+            )
+        else:
+            aggregate_score_matrix = np.full(
+                self.matrix_shape, 0, dtype=self.score_dtype
+            )
 
         if without_normalization_matrices:
-            self.aggregate_score_matrix = sum(
+            aggregate_score_matrix = sum(
                 [
                     scores * weight_by_type[score_type]
                     for score_type, scores in without_normalization_matrices.items()
@@ -165,11 +283,60 @@ class Encoder:
             )
 
         if with_normalization_matrices:
-            self.aggregate_score_matrix += self._normalize(
+            normalize = (
+                self._normalize_sparse if self.sparse else self._normalize
+            )
+            aggregate_score_matrix += normalize(
                 weight_by_type, with_normalization_matrices
             )
 
-        self.cost_matrix = _score_to_cost(self.aggregate_score_matrix)
+        if not self.sparse:
+            aggregate_score_matrix = aggregate_score_matrix.astype(
+                self.score_dtype, copy=False
+            )
+
+        cost_matrix = _score_to_cost(aggregate_score_matrix)
+
+        matrices = {
+            "aggregate_score_matrix": aggregate_score_matrix,
+            "cost_matrix": cost_matrix,
+            "constraint_matrix": constraint_matrix,
+            "prob_limit_matrix": prob_limit_matrix,
+        }
+        for name, matrix in matrices.items():
+            if self.sparse:
+                setattr(self, "sparse_" + name, matrix)
+            else:
+                setattr(self, "sparse_" + name, None)
+                self._dense_matrices[name] = matrix
+
+    def _dense_view(self, name):
+        """
+        Return the numpy.ndarray form of the matrix `name`. In sparse mode it
+        is only materialized the first time a solver asks for it.
+        """
+        if name not in self._dense_matrices:
+            self.logger.debug("Materializing dense {}".format(name))
+            self._dense_matrices[name] = getattr(
+                self, "sparse_" + name
+            ).toarray()
+        return self._dense_matrices[name]
+
+    @property
+    def aggregate_score_matrix(self):
+        return self._dense_view("aggregate_score_matrix")
+
+    @property
+    def cost_matrix(self):
+        return self._dense_view("cost_matrix")
+
+    @property
+    def constraint_matrix(self):
+        return self._dense_view("constraint_matrix")
+
+    @property
+    def prob_limit_matrix(self):
+        return self._dense_view("prob_limit_matrix")
 
     def _normalize(self, weight_by_type, with_normalization_matrices):
 
@@ -192,54 +359,227 @@ class Encoder:
             ]
         )
 
+    def _normalize_sparse(self, weight_by_type, with_normalization_matrices):
+        """
+        Sparse counterpart of _normalize. Every pair outside the union of the
+        stored entries of the normalized score types has the same normalized
+        value, so only the pairs in the union are evaluated explicitly.
+        """
+        union = sp.csr_matrix(self.matrix_shape, dtype=bool)
+        for scores in with_normalization_matrices.values():
+            union = union + (scores.offsets != 0)
+        rows, cols = union.nonzero()
+
+        def normalized(values_by_type):
+            sum_of_weights = sum(
+                [
+                    (values != 0.0) * weight_by_type[score_type]
+                    for score_type, values in values_by_type.items()
+                ]
+            )
+            with np.errstate(divide="ignore"):
+                normalizer = np.where(
+                    sum_of_weights == 0, 0, 1 / sum_of_weights
+                )
+            return normalizer * sum(
+                [
+                    values * weight_by_type[score_type]
+                    for score_type, values in values_by_type.items()
+                ]
+            )
+
+        default = normalized(
+            {
+                score_type: np.array([scores.default], dtype=float)
+                for score_type, scores in with_normalization_matrices.items()
+            }
+        )[0]
+        values = normalized(
+            {
+                score_type: scores.values_at(rows, cols)
+                for score_type, scores in with_normalization_matrices.items()
+            }
+        )
+        offsets = sp.csr_matrix(
+            (values - default, (rows, cols)),
+            shape=self.matrix_shape,
+            dtype=self.score_dtype,
+        )
+        offsets.eliminate_zeros()
+
+        return DefaultSparseMatrix(offsets, default)
+
+    def _index_edges(self, edges, dtype):
+        """
+        Split a list of triples, formatted as follows:
+        (<str paper_ID>, <str reviewer_ID>, <value>)
+        into aligned arrays of paper indices, reviewer indices, and values.
+
+        The ID columns are mapped to indices with C-level lookups, so that the
+        values can be written into a matrix with a single fancy-index assignment.
+        """
+        count = len(edges)
+        paper_indices = np.fromiter(
+            map(self.index_by_forum.__getitem__, map(itemgetter(0), edges)),
+            dtype=np.intp,
+            count=count,
+        )
+        reviewer_indices = np.fromiter(
+            map(self.index_by_user.__getitem__, map(itemgetter(1), edges)),
+            dtype=np.intp,
+            count=count,
+        )
+        values = np.fromiter(
+            map(itemgetter(2), edges), dtype=dtype, count=count
+        )
+
+        return paper_indices, reviewer_indices, values
+
+    def _index_batch(self, batch, dtype):
+        """
+        Same as _index_edges, for a columnar batch, formatted as follows:
+        (<paper_IDs>, <reviewer_IDs>, <values>)
+        """
+        paper_ids, reviewer_ids, values = batch
+        paper_indices = np.fromiter(
+            map(self.index_by_forum.__getitem__, paper_ids),
+            dtype=np.intp,
+            count=len(paper_ids),
+        )
+        reviewer_indices = np.fromiter(
+            map(self.index_by_user.__getitem__, reviewer_ids),
+            dtype=np.intp,
+            count=len(reviewer_ids),
+        )
+        if not len(paper_indices) == len(reviewer_indices) == len(values):
+            raise EncoderError("Edge batch columns must have the same length")
+
+        return paper_indices, reviewer_indices, np.asarray(values, dtype=dtype)
+
+    def _indexed_chunks(self, edges, batches, dtype):
+        """
+        Yield the indexed form of `edges` and `batches`, one chunk at a time.
+        A list of edges is indexed in one go, other iterables are read
+        `edge_chunk_size` edges at a time.
+        """
+        if isinstance(edges, (list, tuple)):
+            yield self._index_edges(edges, dtype)
+        else:
+            edges = iter(edges)
+            chunk = list(islice(edges, self.edge_chunk_size))
+            while chunk:
+                yield self._index_edges(chunk, dtype)
+                chunk = list(islice(edges, self.edge_chunk_size))
+
+        for batch in batches:
+            yield self._index_batch(batch, dtype)
+
+    def _encode_edges(self, edges, default, dtype, batches=()):
+        """
+        return a matrix containing the values of `edges` and `batches`, and
+        `default` for every pair without an edge. In sparse mode the matrix is
+        a DefaultSparseMatrix, otherwise it is a numpy.ndarray.
+        """
+        chunks = self._indexed_chunks(edges, batches, dtype)
+
+        if not self.sparse:
+            matrix = np.full(self.matrix_shape, default, dtype=dtype)
+            for paper_indices, reviewer_indices, values in chunks:
+                matrix[paper_indices, reviewer_indices] = values
+            return matrix
+
+        chunks = list(chunks) or [self._index_edges([], dtype)]
+        paper_indices, reviewer_indices, values = (
+            np.concatenate(column) for column in zip(*chunks)
+        )
+
+        # keep the last value of repeated edges, like the dense assignment does
+        linear_indices = np.ravel_multi_index(
+            (paper_indices, reviewer_indices), self.matrix_shape
+        )
+        _, last_reversed = np.unique(linear_indices[::-1], return_index=True)
+        last = linear_indices.size - 1 - last_reversed
+        offsets = sp.csr_matrix(
+            (
+                values[last] - default,
+                (paper_indices[last], reviewer_indices[last]),
+            ),
+            shape=self.matrix_shape,
+            dtype=dtype,
+        )
+        offsets.eliminate_zeros()
+
+        return DefaultSparseMatrix(offsets, default)
+
     def _encode_scores(self, scores):
         """return a matrix containing unweighted scores."""
         default = scores.get("default", 0)
         edges = scores.get("edges", [])
-        score_matrix = np.full(self.matrix_shape, default, dtype=float)
-
-        for forum, user, score in edges:
-            coordinates = (
-                self.index_by_forum[forum],
-                self.index_by_user[user],
-            )
-            score_matrix[coordinates] = score
+        batches = scores.get("batches", [])
 
-        return score_matrix
+        return self._encode_edges(
+            edges, default, dtype=self.score_dtype, batches=batches
+        )
 
     def _encode_constraints(self, constraints):
         """
         return a matrix containing constraint values. label should have no bearing on the outcome.
         """
-        constraint_matrix = np.full(self.matrix_shape, 0, dtype=int)
-        for forum, user, constraint in constraints:
-            coordinates = (
-                self.index_by_forum[forum],
-                self.index_by_user[user],
-            )
-            constraint_matrix[coordinates] = constraint
-
-        return constraint_matrix
+        return self._encode_edges(constraints, 0, dtype=self.constraint_dtype)
 
     def _encode_probability_limits(self, probability_limits):
         """
         return a matrix containing probability limits
         """
         if isinstance(probability_limits, float):
-            prob_limit_matrix = np.full(
-                self.matrix_shape, probability_limits, dtype=float
-            )
-        else:  # list of tuples
-            prob_limit_matrix = np.full(
-                self.matrix_shape, 1, dtype=float
-            )  # default to no limit
-            for forum, user, limit in probability_limits:
-                coordinates = (
-                    self.index_by_forum[forum],
-                    self.index_by_user[user],
+            if self.sparse:
+                return DefaultSparseMatrix(
+                    sp.csr_matrix(self.matrix_shape, dtype=float),
+                    probability_limits,
                 )
-                prob_limit_matrix[coordinates] = limit
-        return prob_limit_matrix
+            if self.compact:
+                return np.broadcast_to(
+                    np.float64(probability_limits), self.matrix_shape
+                )
+            return np.full(self.matrix_shape, probability_limits, dtype=float)
+
+        # list of tuples, default to no limit
+        return self._encode_edges(probability_limits, 1.0, dtype=float)
+
+    def _paper_scores(self, paper_index):
+        """return the aggregate scores of every reviewer for one paper."""
+        if self.sparse:
+            scores = self.sparse_aggregate_score_matrix
+            paper_offsets = scores.offsets[[paper_index]].toarray().ravel()
+            return paper_offsets + scores.default
+        return self.aggregate_score_matrix[paper_index]
+
+    def _scores_at(self, paper_indices, reviewer_indices):
+        """return the aggregate scores at the given paper, reviewer indices."""
+        if self.sparse:
+            return self.sparse_aggregate_score_matrix.values_at(
+                paper_indices, reviewer_indices
+            )
+        return self.aggregate_score_matrix[paper_indices, reviewer_indices]
+
+    @staticmethod
+    def _flow_nonzero(flow_matrix):
+        """
+        return the paper and reviewer indices of the non-zero flows, in
+        row-major order.
+        """
+        if sp.issparse(flow_matrix):
+            flow_matrix = sp.csr_matrix(flow_matrix, copy=True)
+            flow_matrix.sum_duplicates()
+            return flow_matrix.nonzero()
+        return np.nonzero(np.asarray(flow_matrix))
+
+    @staticmethod
+    def _paper_flows(flow_matrix, paper_index):
+        """return the flows of every reviewer for one paper."""
+        if sp.issparse(flow_matrix):
+            return flow_matrix[[paper_index]].toarray().ravel()
+        return flow_matrix[paper_index]
 
     def decode_assignments(self, flow_matrix):
         """
@@ -248,20 +588,18 @@ class Encoder:
         """
         assignments_by_forum = defaultdict(list)
 
-        for paper_index, paper_flows in enumerate(flow_matrix):
-            paper_id = self.papers[paper_index]
-            for reviewer_index, flow in enumerate(paper_flows):
-                reviewer = self.reviewers[reviewer_index]
-
-                if flow:
-                    coordinates = (paper_index, reviewer_index)
-                    paper_user_entry = {
-                        "aggregate_score": self.aggregate_score_matrix[
-                            coordinates
-                        ],
-                        "user": reviewer,
-                    }
-                    assignments_by_forum[paper_id].append(paper_user_entry)
+        paper_indices, reviewer_indices = self._flow_nonzero(flow_matrix)
+        scores = self._scores_at(paper_indices, reviewer_indices)
+        for paper_index, reviewer_index, score in zip(
+            paper_indices.tolist(), reviewer_indices.tolist(), scores.tolist()
+        ):
+            paper_user_entry = {
+                "aggregate_score": score,
+                "user": self.reviewers[reviewer_index],
+            }
+            assignments_by_forum[self.papers[paper_index]].append(
+                paper_user_entry
+            )
 
         return dict(assignments_by_forum)
 
@@ -273,28 +611,31 @@ class Encoder:
         """
         alternates_by_forum = {}
 
-        for paper_index, paper_flows in enumerate(flow_matrix):
-            paper_id = self.papers[paper_index]
-            unassigned = []
-            for reviewer_index, flow in enumerate(paper_flows):
-                reviewer = self.reviewers[reviewer_index]
-
-                # alternates must not be assigned
-                if not flow:
-                    coordinates = (paper_index, reviewer_index)
-                    paper_user_entry = {
-                        "aggregate_score": self.aggregate_score_matrix[
-                            coordinates
-                        ],
-                        "user": reviewer,
-                    }
-                    unassigned.append(paper_user_entry)
-
-            unassigned.sort(
-                key=lambda entry: entry["aggregate_score"], reverse=True
+        for paper_index, paper_id in enumerate(self.papers):
+            paper_scores = self._paper_scores(paper_index)
+
+            # alternates must not be assigned
+            unassigned = np.flatnonzero(
+                self._paper_flows(flow_matrix, paper_index) == 0
             )
 
-            alternates_by_forum[paper_id] = unassigned[:num_alternates]
+            if 0 < num_alternates < unassigned.size:
+                # keep every reviewer scoring at least the k-th best score,
+                # so that ties are broken by reviewer order below
+                unassigned_scores = paper_scores[unassigned]
+                top = np.argpartition(-unassigned_scores, num_alternates - 1)
+                kth_score = unassigned_scores[top[:num_alternates]].min()
+                unassigned = unassigned[unassigned_scores >= kth_score]
+
+            order = np.argsort(-paper_scores[unassigned], kind="stable")
+            alternates = unassigned[order][:num_alternates]
+
+            alternates_by_forum[paper_id] = [
+                {"aggregate_score": score, "user": self.reviewers[index]}
+                for index, score in zip(
+                    alternates.tolist(), paper_scores[alternates].tolist()
+                )
+            ]
 
         return alternates_by_forum
 
@@ -308,13 +649,12 @@ class Encoder:
         alternates_by_forum = {}
         for paper_index, reviewer_indices in alternates_by_index.items():
             paper_id = self.papers[paper_index]
+            paper_scores = self._paper_scores(paper_index)
             reviewer_list = []
             for reviewer_index in reviewer_indices:
                 reviewer_id = self.reviewers[reviewer_index]
                 entry = {
-                    "aggregate_score": self.aggregate_score_matrix[
-                        (paper_index, reviewer_index)
-                    ],
+                    "aggregate_score": float(paper_scores[reviewer_index]),
                     "user": reviewer_id,
                 }
                 reviewer_list.append(entry)
@@ -66,6 +66,11 @@ def run_matching(
             self.name, interface.config_note.id
         )
     )
+    # split the host between the worker's concurrent matching processes
+    solver_resources = getattr(interface, "solver_resources", None)
+    concurrency = self.app.conf.worker_concurrency
+    if solver_resources is not None and concurrency:
+        solver_resources.setdefault("concurrent_workers", concurrency)
     matcher = Matcher(
         datasource=interface, solver_class=solver_class, logger=logger
     )
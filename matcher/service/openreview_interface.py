@@ -10,7 +10,27 @@ from matcher.core import MatcherError, MatcherStatus
 from openreview.api import Note
 
 
+class _ScoreEdges:
+    """The score edges of one invitation, as (head, tail, score) triples.
+
+    Every iteration fetches the edges again, one batch of papers at a time.
+    """
+
+    def __init__(self, interface, edge_invitation_id, translate_map=None):
+        self.interface = interface
+        self.edge_invitation_id = edge_invitation_id
+        self.translate_map = translate_map
+
+    def __iter__(self):
+        return self.interface._iter_score_edges(
+            self.edge_invitation_id, translate_map=self.translate_map
+        )
+
+
 class BaseConfigNoteInterface:
+    # number of papers whose edges are requested concurrently at a time
+    edge_paper_batch_size = 100
+
     def __init__(
         self,
         client,
@@ -22,6 +42,14 @@ class BaseConfigNoteInterface:
         self.logger.debug("GET note id={}".format(config_note_id))
         self.config_note = self.client.get_note(config_note_id)
 
+    def _get_solver_resources(self):
+        """Read the Gurobi resource settings of the config note, the ones
+        that are not set are left to the worker environment."""
+        return {
+            name: self.config_note.content.get("solver_" + name)
+            for name in ["threads", "memory_limit", "method", "time_limit"]
+        }
+
     def validate_score_spec(self):
         for invitation_id in self.config_note.content.get(
             "scores_specification", {}
@@ -287,42 +315,36 @@ class BaseConfigNoteInterface:
 
     @property
     def scores_by_type(self):
-        scores_specification = self.config_note.content.get(
-            "scores_specification", {}
-        )
-
-        if not self._scores_by_type and scores_specification:
-            edges_by_invitation = {}
-            defaults_by_invitation = {}
-            for invitation_id, spec in scores_specification.items():
-                edges_by_invitation[invitation_id] = self._get_all_edges(
-                    invitation_id
-                )
-                defaults_by_invitation[invitation_id] = spec.get("default", 0)
+        """The default and the edges of each score invitation.
 
-            translate_maps = {
-                inv_id: score_spec["translate_map"]
-                for inv_id, score_spec in scores_specification.items()
-                if "translate_map" in score_spec
-            }
-
-            for inv_id, edges in edges_by_invitation.items():
-                invitation_edges = [
-                    (
-                        edge["head"],
-                        edge["tail"],
-                        self._edge_to_score(
-                            edge, translate_map=translate_maps.get(inv_id)
-                        ),
-                    )
-                    for edge in edges
-                ]
+        The edges of an invitation are not stored: each time they are
+        iterated over, they are fetched again, one batch of papers at a time,
+        so that the Encoder can consume them without the full edge list ever
+        being held in memory.
+        """
+        if self._scores_by_type is None:
+            scores_specification = self.config_note.content.get(
+                "scores_specification", {}
+            )
+            self._scores_by_type = {}
+            for inv_id, spec in scores_specification.items():
                 self._scores_by_type[inv_id] = {
-                    "default": defaults_by_invitation[inv_id],
-                    "edges": invitation_edges,
+                    "default": spec.get("default", 0),
+                    "edges": _ScoreEdges(
+                        self, inv_id, translate_map=spec.get("translate_map")
+                    ),
                 }
         return self._scores_by_type
 
+    def _iter_score_edges(self, edge_invitation_id, translate_map=None):
+        """Generate (head, tail, score) triples for a score invitation"""
+        for edge in self._iter_all_edges(edge_invitation_id):
+            yield (
+                edge["head"],
+                edge["tail"],
+                self._edge_to_score(edge, translate_map=translate_map),
+            )
+
     @property
     def weight_by_type(self):
         scores_specification = self.config_note.content.get(
@@ -450,6 +472,10 @@ class BaseConfigNoteInterface:
 
     def _get_all_edges(self, edge_invitation_id):
         """Helper function for retrieving and parsing all edges in bulk"""
+        return list(self._iter_all_edges(edge_invitation_id))
+
+    def _iter_all_edges(self, edge_invitation_id):
+        """Helper function for retrieving edges in batches of papers and parsing them one at a time"""
 
         self.logger.debug(f"Get edges for invitation id={edge_invitation_id}")
 
@@ -466,34 +492,34 @@ class BaseConfigNoteInterface:
             else:
                 return []
 
-        result = openreview.tools.concurrent_requests(
-            get_paper_edges,
-            self.papers, 
-            desc=f"Retrieving edges for {edge_invitation_id}"
-        )
-
-        all_edges = []
         all_reviewers = {r: r for r in self.reviewers}
-
-        for edges in result:
-            for edge in edges:
-                if 'tail' in edge and edge['tail'] in all_reviewers:
-                    all_edges.append(
-                        {
+        papers = self.papers
+
+        # request the edges of a batch of papers at a time, so that only one
+        # batch is held in memory while the edges are consumed
+        for start in range(0, len(papers), self.edge_paper_batch_size):
+            batch = papers[start : start + self.edge_paper_batch_size]
+            result = openreview.tools.concurrent_requests(
+                get_paper_edges,
+                batch,
+                desc=f"Retrieving edges for {edge_invitation_id} "
+                f"(papers {start + 1}-{start + len(batch)} of {len(papers)})",
+            )
+            for edges in result:
+                for edge in edges:
+                    if 'tail' in edge and edge['tail'] in all_reviewers:
+                        yield {
                             "invitation": edge_invitation_id,
                             "head": edge.get('head'),
                             "tail": edge.get('tail'),
                             "weight": edge.get('weight'),
                             "label": edge.get('label'),
                         }
-                    )
 
         self.logger.debug(
             f"Finished getting edges for invitation id={edge_invitation_id}"
         )
 
-        return all_edges
-
     def _edge_to_score(self, edge, translate_map=None):
         """
         Given an openreview.Edge, and a mapping defined by `translate_map`,
@@ -583,6 +609,40 @@ class ConfigNoteInterfaceV1(BaseConfigNoteInterface):
             self.config_note.content.get("allow_zero_score_assignments", "No")
             == "Yes"
         )
+        self.sparse_encoding = (
+            self.config_note.content.get("sparse_encoding", "No") == "Yes"
+        )
+        self.compact_encoding = (
+            self.config_note.content.get("compact_encoding", "No") == "Yes"
+        )
+        self.solver_resources = self._get_solver_resources()
+        self.fairir_lp_backend = self.config_note.content.get(
+            "fairir_lp_backend", "gurobi"
+        )
+        self.minmax_single_flow = (
+            self.config_note.content.get("minmax_single_flow", "No") == "Yes"
+        )
+        self.minmax_candidate_limit = self.config_note.content.get(
+            "minmax_candidate_limit"
+        )
+        if self.minmax_candidate_limit is not None:
+            self.minmax_candidate_limit = int(self.minmax_candidate_limit)
+        self.decompose_components = (
+            self.config_note.content.get("decompose_components", "No") == "Yes"
+        )
+        self.flow_processes = self.config_note.content.get("flow_processes")
+        if self.flow_processes is not None:
+            self.flow_processes = int(self.flow_processes)
+        self.fairflow_parallel_search = (
+            self.config_note.content.get("fairflow_parallel_search", "No")
+            == "Yes"
+        )
+        self.fairflow_search_tolerance = float(
+            self.config_note.content.get("fairflow_search_tolerance", 0.0)
+        )
+        self.fairflow_warm_start = (
+            self.config_note.content.get("fairflow_warm_start", "No") == "Yes"
+        )
         self.probability_limits = float(
             self.config_note.content.get("randomized_probability_limits", 1.0)
         )
@@ -596,12 +656,12 @@ class ConfigNoteInterfaceV1(BaseConfigNoteInterface):
         # Lazy variables
         self._reviewers = None
         self._papers = None
-        self._scores_by_type = {}
         self._minimums = None
         self._maximums = None
         self._demands = None
         self._constraints = None
         self._attribute_constraints = []
+        self._scores_by_type = None
 
         self.validate_score_spec()
 
@@ -786,6 +846,40 @@ class ConfigNoteInterfaceV2(BaseConfigNoteInterface):
             self.config_note.content.get("allow_zero_score_assignments", "No")
             == "Yes"
         )
+        self.sparse_encoding = (
+            self.config_note.content.get("sparse_encoding", "No") == "Yes"
+        )
+        self.compact_encoding = (
+            self.config_note.content.get("compact_encoding", "No") == "Yes"
+        )
+        self.solver_resources = self._get_solver_resources()
+        self.fairir_lp_backend = self.config_note.content.get(
+            "fairir_lp_backend", "gurobi"
+        )
+        self.minmax_single_flow = (
+            self.config_note.content.get("minmax_single_flow", "No") == "Yes"
+        )
+        self.minmax_candidate_limit = self.config_note.content.get(
+            "minmax_candidate_limit"
+        )
+        if self.minmax_candidate_limit is not None:
+            self.minmax_candidate_limit = int(self.minmax_candidate_limit)
+        self.decompose_components = (
+            self.config_note.content.get("decompose_components", "No") == "Yes"
+        )
+        self.flow_processes = self.config_note.content.get("flow_processes")
+        if self.flow_processes is not None:
+            self.flow_processes = int(self.flow_processes)
+        self.fairflow_parallel_search = (
+            self.config_note.content.get("fairflow_parallel_search", "No")
+            == "Yes"
+        )
+        self.fairflow_search_tolerance = float(
+            self.config_note.content.get("fairflow_search_tolerance", 0.0)
+        )
+        self.fairflow_warm_start = (
+            self.config_note.content.get("fairflow_warm_start", "No") == "Yes"
+        )
         self.probability_limits = float(
             self.config_note.content.get("randomized_probability_limits", 1.0)
         )
@@ -799,12 +893,12 @@ class ConfigNoteInterfaceV2(BaseConfigNoteInterface):
         # Lazy variables
         self._reviewers = None
         self._papers = None
-        self._scores_by_type = {}
         self._minimums = None
         self._maximums = None
         self._demands = None
         self._constraints = None
         self._attribute_constraints = None
+        self._scores_by_type = None
 
         self.validate_score_spec()
 
@@ -5,10 +5,12 @@ import argparse
 
 from gurobipy import *
 
+from .gurobi_resources import get_resources, set_gurobi_params
+
 
 class Basic(object):
     """Paper matching formulated as a linear program."""
-    def __init__(self, loads, coverages, weights, country = None, institute = None, conflict = None, loads_lb=None):
+    def __init__(self, loads, coverages, weights, country = None, institute = None, conflict = None, loads_lb=None, resources=None):
         """Initialize the Basic matcher
         Args:
             loads - a list of integers specifying the maximum number of papers
@@ -20,6 +22,8 @@ class Basic(object):
                    papers.
             loads_lb - a list of integers specifying the min number of papers
                   for each reviewer (optional).
+            resources - a dict of Gurobi resource settings, see
+                  gurobi_resources.get_resources (optional).
         Returns:
             initialized matcher.
         """
@@ -38,6 +42,8 @@ class Basic(object):
         self.m = Model("%s: basic matcher" % str(self.id))
         self.solution = None
         self.m.setParam('OutputFlag', 0)
+        self.resources = get_resources(resources)
+        set_gurobi_params(self.m, self.resources)
 
         # Primal vars.
         start = time.time()
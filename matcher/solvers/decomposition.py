@@ -0,0 +1,179 @@
+"""
+Splits a paper-reviewer assignment problem into the connected components of
+its candidate arcs, so that the components can be solved independently.
+
+A reviewer-paper pair is a candidate arc if it is not a conflict (its
+constraint is 0 or 1), and it is a forced assignment, its weight is non-zero,
+or zero weight assignments are allowed. Papers and reviewers in different
+components can never be assigned to each other, so the solution of the whole
+problem is the union of the solutions of its components.
+
+Components are solved in a pool of processes, except inside daemonic
+processes (e.g. Celery workers), which may not have children.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from ..encoder import DefaultSparseMatrix
+
+# the encoder attributes read by the solvers that support decomposition
+ComponentEncoder = namedtuple(
+    "ComponentEncoder",
+    [
+        "cost_matrix",
+        "constraint_matrix",
+        "aggregate_score_matrix",
+        "sparse",
+        "sparse_cost_matrix",
+        "sparse_constraint_matrix",
+    ],
+    defaults=[None, None, None, False, None, None],
+)
+
+
+def submatrix(matrix, rows, cols):
+    """Restrict a numpy array or DefaultSparseMatrix to the given indices."""
+    if isinstance(matrix, DefaultSparseMatrix):
+        return matrix.submatrix(rows, cols)
+    return np.asarray(matrix)[np.ix_(rows, cols)]
+
+
+def _candidate_pairs(weight_matrix, constraint_matrix, allow_zero):
+    """Return the paper and reviewer indices of the candidate arcs."""
+    if isinstance(weight_matrix, DefaultSparseMatrix) and not (
+        allow_zero or weight_matrix.default != 0
+    ):
+        weight_rows, weight_cols, _ = weight_matrix.entries()
+        constraint_rows, constraint_cols, _ = constraint_matrix.entries()
+        pairs = np.unique(
+            np.stack(
+                [
+                    np.concatenate([weight_rows, constraint_rows]),
+                    np.concatenate([weight_cols, constraint_cols]),
+                ]
+            ),
+            axis=1,
+        )
+        rows, cols = pairs
+        weights = weight_matrix.values_at(rows, cols)
+        constraints = constraint_matrix.values_at(rows, cols)
+    else:
+        if isinstance(weight_matrix, DefaultSparseMatrix):
+            weight_matrix = weight_matrix.toarray()
+            constraint_matrix = constraint_matrix.toarray()
+        weights = np.asarray(weight_matrix)
+        constraints = np.asarray(constraint_matrix)
+        rows, cols = None, None
+
+    is_candidate = (constraints == 1) | (
+        (constraints == 0) & (allow_zero | (weights != 0))
+    )
+    if rows is None:
+        return np.nonzero(is_candidate)
+    return rows[is_candidate], cols[is_candidate]
+
+
+def find_components(
+    weight_matrix,
+    constraint_matrix,
+    demands,
+    minimums,
+    allow_zero_score_assignments=False,
+):
+    """
+    Find the connected components of the candidate arcs.
+
+    Arguments:
+        weight_matrix: a #papers by #reviewers numpy array or
+            DefaultSparseMatrix of costs or scores.
+        constraint_matrix: the matching constraints, in the same format.
+        demands: the number of reviews required by each paper.
+        minimums: the minimum number of papers of each reviewer.
+        allow_zero_score_assignments: whether zero weight pairs are arcs.
+
+    Returns:
+        A list of (paper indices, reviewer indices) arrays, one pair per
+        component with at least one arc, or None if the problem does not
+        split into several components. Papers and reviewers without any arc
+        are left out, since nothing can be assigned to them; if one of them
+        needs an assignment, the problem is not split either, so that the
+        solver can report it as a whole.
+    """
+    num_papers, num_reviewers = np.shape(weight_matrix)
+    rows, cols = _candidate_pairs(
+        weight_matrix, constraint_matrix, allow_zero_score_assignments
+    )
+    num_nodes = num_papers + num_reviewers
+    adjacency = sparse.coo_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, num_papers + cols)),
+        shape=(num_nodes, num_nodes),
+    )
+    _, labels = csgraph.connected_components(adjacency, directed=False)
+    paper_labels, reviewer_labels = labels[:num_papers], labels[num_papers:]
+
+    has_arc = np.zeros(num_nodes, dtype=bool)
+    has_arc[rows] = True
+    has_arc[num_papers + cols] = True
+    isolated_papers = ~has_arc[:num_papers]
+    isolated_reviewers = ~has_arc[num_papers:]
+    if np.any(np.asarray(demands)[isolated_papers] > 0) or np.any(
+        np.asarray(minimums)[isolated_reviewers] > 0
+    ):
+        return None
+
+    component_labels = np.unique(labels[has_arc])
+    if len(component_labels) < 2:
+        return None
+
+    return [
+        (
+            np.flatnonzero(paper_labels == label),
+            np.flatnonzero(reviewer_labels == label),
+        )
+        for label in component_labels
+    ]
+
+
+def _solve_component(solver_class, args, kwargs, attributes):
+    """Solve one component, returning its solution and solver attributes."""
+    solver = solver_class(*args, **kwargs)
+    solution = solver.solve()
+    return solution, [getattr(solver, name) for name in attributes]
+
+
+def solve_components(
+    solver_class, component_arguments, attributes=(), processes=None
+):
+    """
+    Solve each component with its own instance of `solver_class`.
+
+    Arguments:
+        solver_class: the solver to instantiate for each component.
+        component_arguments: a list of (args, kwargs) pairs, used to
+            instantiate the solver of each component.
+        attributes: names of the solver attributes to return, besides the
+            solution.
+        processes: the number of worker processes, defaults to the number
+            of CPUs. Components are solved in this process if it is 1.
+
+    Returns:
+        A list of (solution, attribute values) pairs, one per component.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(component_arguments))
+    tasks = [
+        (solver_class, args, kwargs, attributes)
+        for args, kwargs in component_arguments
+    ]
+
+    if processes <= 1 or multiprocessing.current_process().daemon:
+        return [_solve_component(*task) for task in tasks]
+
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(_solve_component, *zip(*tasks)))
@@ -1,12 +1,57 @@
-from collections import defaultdict
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import multiprocessing
+import os
 from ortools.graph.python import min_cost_flow
 import numpy as np
 import uuid
 import time
 from .core import SolverException
+from .decomposition import ComponentEncoder, find_components, solve_components
 import logging
 
 
+def _share_array(array):
+    """Copy an array into a new block of shared memory.
+
+    Returns the block, and the (name, shape, dtype) needed to attach to it.
+    """
+    array = np.ascontiguousarray(array)
+    memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=memory.buf)[...] = array
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+# the FairFlow of a makespan search worker process, and its shared memory.
+_worker = {}
+
+
+def _init_makespan_worker(state, shared_arrays):
+    """Build the FairFlow of a makespan search worker process.
+
+    Args:
+        state - the attributes of the FairFlow, except the shared ones.
+        shared_arrays - dict of attribute name to (name, shape, dtype) of the
+            shared memory holding the attribute.
+    """
+    solver = FairFlow.__new__(FairFlow)
+    solver.__dict__.update(state)
+    _worker["memories"] = []
+    for attribute, (name, shape, dtype) in shared_arrays.items():
+        memory = shared_memory.SharedMemory(name=name)
+        _worker["memories"].append(memory)
+        setattr(solver, attribute, np.ndarray(shape, dtype, buffer=memory.buf))
+    solver.orig_affinities = solver.affinity_matrix
+    _worker["solver"] = solver
+
+
+def _try_worker_makespan(ms, start):
+    """Try a makespan with the FairFlow of this worker process."""
+    return _worker["solver"]._try_makespan(ms, start)
+
+
 class FairFlow(object):
     """Approximate makespan matching via flow network (with lower bounds).
 
@@ -28,8 +73,46 @@ class FairFlow(object):
     either: there are no papers in the first group, there are no papers in the
     third group, or running the procedure does not change the sum total score of
     the matching.
+
+    If decompose is set, the papers and reviewers are split into the
+    connected components of the pairs that can be assigned, which are solved
+    separately (and in parallel) since their makespans don't interact.
+
+    If parallel_search is set, the binary search on the makespan evaluates
+    the makespans of the next few steps of the search at once, in a pool of
+    processes that share the affinity and constraint matrices. The search
+    then walks through the results exactly as the sequential search would.
+
+    The search stops early once the gap between the best feasible makespan
+    and the lowest makespan known to fail, relative to the latter, is within
+    search_tolerance. If warm_start is set, each makespan is tried starting
+    from the best solution found so far instead of the starter solution,
+    which skips most of the validifier work; with parallel_search, the
+    makespans evaluated at once all start from the best solution found
+    before them.
     """
 
+    # read-only matrices shared with the makespan search worker processes.
+    _shared_attributes = (
+        "affinity_matrix",
+        "affinity_by_paper",
+        "constraint_matrix",
+        "starter_solution",
+    )
+    # attributes that makespan search worker processes set up themselves.
+    _worker_attributes = (
+        "orig_affinities",
+        "min_cost_flow",
+        "solution",
+        "paper_scores",
+        "paper_reviewers",
+        "start_inds",
+        "end_inds",
+        "caps",
+        "costs",
+        "supplies",
+    )
+
     def __init__(
         self,
         minimums,
@@ -39,6 +122,11 @@ class FairFlow(object):
         allow_zero_score_assignments=False,
         solution=None,
         logger=logging.getLogger(__name__),
+        decompose=False,
+        processes=None,
+        parallel_search=False,
+        search_tolerance=0.0,
+        warm_start=False,
     ):
         """
         Initialize a makespan flow matcher
@@ -50,14 +138,26 @@ class FairFlow(object):
         :param allow_zero_score_assignments: bool to allow pairs with zero affinity in the solution.
             unknown matching scores default to 0. set to True to allow zero (unknown) affinity in solution.
         :param solution: a matrix of assignments (same shape as encoder.affinity_matrix)
+        :param decompose: bool to solve each connected component of the assignable pairs separately.
+        :param processes: number of processes used to solve the components, defaults to the number of CPUs.
+        :param parallel_search: bool to evaluate several makespans at once, in up to processes processes.
+        :param search_tolerance: relative gap between the feasible and infeasible makespans at which to stop searching.
+        :param warm_start: bool to try each makespan starting from the best solution found so far.
 
         :return: initialized makespan matcher.
         """
         self.logger = logger
         self.allow_zero_score_assignments = allow_zero_score_assignments
+        self.decompose = decompose
+        self.processes = processes
+        self.parallel_search = parallel_search
+        self.search_tolerance = search_tolerance
+        self.warm_start = warm_start
         self.logger.debug("Init FairFlow")
         self.constraint_matrix = encoder.constraint_matrix
-        affinity_matrix = encoder.aggregate_score_matrix.transpose()
+        affinity_matrix = encoder.aggregate_score_matrix.transpose().astype(
+            np.float64
+        )
 
         self.maximums = maximums
         self.minimums = minimums
@@ -93,12 +193,12 @@ class FairFlow(object):
         self.id = uuid.uuid4()
         self.makespan = 0.0  # the minimum allowable paper score.
         self.solution = (
-            solution
-            if solution
+            np.array(solution, dtype=np.float64)
+            if solution is not None
             else np.zeros((self.num_reviewers, self.num_papers))
         )
         self.starter_solution = self.solution.copy()
-        self.valid = True if solution else False
+        self.valid = solution is not None
 
         if self.affinity_matrix.shape != self.solution.shape:
             raise SolverException(
@@ -107,6 +207,13 @@ class FairFlow(object):
                 )
             )
 
+        # paper scores are sums over the contiguous rows of this copy, so
+        # that they don't depend on which papers are updated together.
+        self.affinity_by_paper = np.ascontiguousarray(
+            self.affinity_matrix.transpose()
+        )
+        self._reset_solution(self.solution)
+
         self.max_affinities = np.max(self.affinity_matrix)
         self.big_c = 10000
         self.bigger_c = self.big_c**2
@@ -148,6 +255,55 @@ class FairFlow(object):
         """Get the objective value of the RAP."""
         return np.sum(self.sol_as_mat() * self.orig_affinities)
 
+    def _reset_solution(self, solution):
+        """Replace the solution, and recompute the paper scores and reviewers.
+
+        Args:
+            solution - a reviewers x papers binary matrix.
+
+        Returns:
+            None -- sets the solution, the score of each paper, and for each
+            paper a list of (affinity, reviewer) pairs of its assigned
+            reviewers, sorted from the worst to the best.
+        """
+        self.solution = solution
+        self.paper_scores = np.zeros(self.num_papers)
+        self.paper_reviewers = [[] for _ in range(self.num_papers)]
+        revs, paps = np.nonzero(self.solution)
+        self._add_paper_reviewers(revs, paps)
+        self._update_paper_scores(paps)
+
+    def _assign(self, revs, paps):
+        """Assign reviewers to papers, given aligned arrays of indices."""
+        assert np.all(self.solution[revs, paps] == 0.0)
+        self.solution[revs, paps] = 1.0
+        self._add_paper_reviewers(revs, paps)
+        self._update_paper_scores(paps)
+
+    def _unassign(self, revs, paps):
+        """Unassign reviewers from papers, given aligned arrays of indices."""
+        assert np.all(self.solution[revs, paps] == 1.0)
+        self.solution[revs, paps] = 0.0
+        affs = self.affinity_matrix[revs, paps]
+        for aff, rev, pap in zip(affs.tolist(), revs.tolist(), paps.tolist()):
+            self.paper_reviewers[pap].remove((aff, rev))
+        self._update_paper_scores(paps)
+
+    def _add_paper_reviewers(self, revs, paps):
+        """Insert newly assigned reviewers in the sorted paper reviewers."""
+        affs = self.affinity_matrix[revs, paps]
+        for aff, rev, pap in zip(affs.tolist(), revs.tolist(), paps.tolist()):
+            bisect.insort(self.paper_reviewers[pap], (aff, rev))
+
+    def _update_paper_scores(self, paps):
+        """Recompute the scores of the given papers only."""
+        paps = np.unique(paps)
+        self.paper_scores[paps] = np.sum(
+            np.ascontiguousarray(self.solution[:, paps].transpose())
+            * self.affinity_by_paper[paps],
+            axis=1,
+        )
+
     def _refresh_internal_vars(self):
         """Set start, end, caps, costs to be empty."""
         self.min_cost_flow = min_cost_flow.SimpleMinCostFlow()
@@ -173,7 +329,7 @@ class FairFlow(object):
         Returns:
             A 3-tuple of paper ids.
         """
-        paper_scores = np.sum(self.solution * self.affinity_matrix, axis=0)
+        paper_scores = self.paper_scores
         g1 = np.where(paper_scores >= self.makespan)[0]
         g2 = np.intersect1d(
             np.where(self.makespan > paper_scores),
@@ -192,10 +348,20 @@ class FairFlow(object):
         Returns:
             A tuple of rows and columns of the
         """
-        mask = (self.solution - 1.0) * -self.big_c
-        tmp = (mask + self.affinity_matrix).astype("float")
-        worst_revs = np.argmin(tmp, axis=0)
-        return worst_revs[papers], papers
+        # the lowest affinity (and index) assigned reviewer, or for papers
+        # without reviewers, the lowest affinity reviewer.
+        worst_revs = np.array(
+            [
+                (
+                    self.paper_reviewers[pap][0][1]
+                    if self.paper_reviewers[pap]
+                    else np.argmin(self.affinity_by_paper[pap])
+                )
+                for pap in papers
+            ],
+            dtype=np.int64,
+        )
+        return worst_revs, papers
 
     def _construct_and_solve_validifier_network(self):
         """Construct a network to make an invalid solution valid.
@@ -280,137 +446,154 @@ class FairFlow(object):
         Returns:
             None -- modifies the internal min_cost_flow network.
         """
-        # Must convert to python ints first.
-        g1 = [int(x) for x in g1]
-        g2 = [int(x) for x in g2]
-        g3 = [int(x) for x in g3]
+        g1, g2, g3 = (np.asarray(g, dtype=np.int64) for g in (g1, g2, g3))
+        dummy_offset = self.num_reviewers + self.num_papers + 2
 
-        pap_scores = np.sum(self.solution * self.affinity_matrix, axis=0)
+        pap_scores = self.paper_scores
 
         # First construct edges between the source and each pap in g1.
         self._refresh_internal_vars()
-        for i in range(np.size(g1)):
-            self.start_inds.append(self.source)
-            self.end_inds.append(self.num_reviewers + g1[i])
-            self.caps.append(1)
-            self.costs.append(0)
+        self._add_arcs(
+            np.full(np.size(g1), self.source), self.num_reviewers + g1
+        )
 
         # Next construct the sink node and edges to each paper in g3.
-        papers_needing_no_assignments = 0
-        for i in range(np.size(g3)):
-            if not self.demands[g3[i]]:
-                continue
-            self.start_inds.append(self.num_reviewers + g3[i])
-            self.end_inds.append(self.sink)
-            edge_capacity = 1
-            self.caps.append(edge_capacity)
-            self.costs.append(0)
-            papers_needing_no_assignments += 1 - edge_capacity
+        demanded_g3 = g3[np.asarray(self.demands)[g3] != 0]
+        self._add_arcs(
+            self.num_reviewers + demanded_g3,
+            np.full(np.size(demanded_g3), self.sink),
+        )
 
         # For each paper in g2, create a dummy node the restricts the flow to
         # that paper to 1.
-        for pap2 in g2:
-            self.start_inds.append(
-                self.num_reviewers + self.num_papers + 2 + pap2
-            )
-            self.end_inds.append(self.num_reviewers + pap2)
-            self.caps.append(1)
-            self.costs.append(0)
+        self._add_arcs(dummy_offset + g2, self.num_reviewers + g2)
 
         # For each assignment in the g1 group, reverse the flow.
-        revs, paps1 = np.nonzero(self.solution[:, g1])
-        assignment_to_give = set()
-        added = set()
-        pg2_to_minaff = defaultdict(lambda: np.inf)  # min incoming affinity.
-        for i in range(np.size(revs)):
-            rev = int(revs[i])
-            pap = g1[paps1[i]]
-            assert self.solution[rev, pap] == 1.0
-            self.start_inds.append(self.num_reviewers + pap)
-            self.end_inds.append(rev)
-            self.caps.append(1)
-            self.costs.append(0)
-            assignment_to_give.add(rev)
-
-            # and now connect this reviewer to each dummy paper associate with
-            # a paper in g2 if that rev not already been assigned to that paper.
-            if rev not in added:
-                for pap2 in g2:
-                    if (
-                        self.solution[rev, pap2] == 0.0
-                        and self.constraint_matrix[pap2, rev] == 0.0
-                    ):
-                        rp_aff = self.affinity_matrix[rev, pap2]
-                        if self.allow_zero_score_assignments or rp_aff != 0.0:
-                            self.start_inds.append(rev)
-                            self.end_inds.append(
-                                self.num_reviewers + self.num_papers + 2 + pap2
-                            )
-                            pg2_to_minaff[pap2] = min(
-                                pg2_to_minaff[pap2], rp_aff
-                            )
-
-                            self.caps.append(1)
-                            self.costs.append(0)
-                added.add(rev)
+        revs1, paps1 = np.nonzero(self.solution[:, g1])
+        paps1 = g1[paps1]
+
+        # and now connect each of these reviewers to each dummy paper
+        # associated with a paper in g2 if that rev not already been assigned
+        # to that paper.
+        g1_revs = np.unique(revs1)
+        can_review_g2 = self._assignable(g1_revs, g2)
+        g2_revs, g2_cols = np.nonzero(can_review_g2)
+        g2_revs = g1_revs[g2_revs]
+        min_in = np.min(  # min incoming affinity of each paper in g2.
+            np.where(
+                can_review_g2,
+                self.affinity_matrix[np.ix_(g1_revs, g2)],
+                np.inf,
+            ),
+            axis=0,
+            initial=np.inf,
+        )
+
+        # The arcs of each reviewer are ordered as: the reversal of its first
+        # g1 assignment, its arcs to g2, then the reversal of its other g1
+        # assignments.
+        is_first = np.ones(np.size(revs1), dtype=bool)
+        is_first[1:] = revs1[1:] != revs1[:-1]
+        rank = np.arange(np.size(revs1)) - np.searchsorted(revs1, revs1)
+        arc_revs = np.concatenate([revs1, g2_revs])
+        arc_order = np.concatenate(
+            [np.where(is_first, 0, 1 + np.size(g2) + rank), 1 + g2_cols]
+        )
+        order = np.lexsort((arc_order, arc_revs))
+        self._add_arcs(
+            np.concatenate([self.num_reviewers + paps1, g2_revs])[order],
+            np.concatenate([revs1, dummy_offset + g2[g2_cols]])[order],
+        )
+
         # For each paper in g2, reverse the flow to assigned revs only if the
         # reversal, plus the min edge coming in from G1 wouldn't violate ms.
-        revs, paps2 = np.nonzero(self.solution[:, g2])
-        for i in range(np.size(revs)):
-            rev = int(revs[i])
-            pap = g2[paps2[i]]
-            pap_score = pap_scores[pap]
-            assert self.solution[rev, pap] == 1.0
-            min_in = pg2_to_minaff[pap]
-            rp_aff = self.affinity_matrix[rev, pap]
-            # lower bound on new paper score.
-            lower_bound = pap_score + min_in - rp_aff
-            ms_satisfied = (self.makespan - self.max_affinities) <= lower_bound
-            if min_in < np.inf and ms_satisfied:
-                self.start_inds.append(self.num_reviewers + pap)
-                self.end_inds.append(rev)
-                self.caps.append(1)
-                self.costs.append(0)
-                assignment_to_give.add(rev)
+        revs2, paps2 = np.nonzero(self.solution[:, g2])
+        min_in2 = min_in[paps2]
+        paps2 = g2[paps2]
+        # lower bound on new paper score.
+        lower_bound = (
+            pap_scores[paps2] + min_in2 - self.affinity_matrix[revs2, paps2]
+        )
+        ms_satisfied = (self.makespan - self.max_affinities) <= lower_bound
+        reversible = (min_in2 < np.inf) & ms_satisfied
+        self._add_arcs(
+            self.num_reviewers + paps2[reversible], revs2[reversible]
+        )
+
+        # Built like the original set, so that its iteration order is kept.
+        assignment_to_give = set(revs1.tolist())
+        assignment_to_give.update(revs2[reversible].tolist())
+        give_revs = np.array(list(assignment_to_give), dtype=np.int64)
 
         # For each reviewer, connect them to a paper in g3 if not assigned.
-        for rev in assignment_to_give:
-            for pap3 in g3:
-                if (
-                    self.solution[rev, pap3] == 0.0
-                    and self.constraint_matrix[pap3, rev] == 0.0
-                ):
-                    rp_aff = self.affinity_matrix[rev, pap3]
-                    if self.allow_zero_score_assignments or rp_aff != 0.0:
-                        self.start_inds.append(rev)
-                        self.end_inds.append(self.num_reviewers + pap3)
-                        self.caps.append(1)
-                        lb = self.makespan - self.max_affinities
-                        pap_score = pap_scores[pap3]
-                        # give a bigger reward if assignment would improve group.
-                        if rp_aff + pap_score >= lb:
-                            self.costs.append(
-                                int(-1.0 - self.bigger_c * rp_aff)
-                            )
-                        else:
-                            self.costs.append(int(-1.0 - self.big_c * rp_aff))
-
-        flow = int(
-            min(np.size(g3) - papers_needing_no_assignments, np.size(g1))
+        revs3, paps3 = np.nonzero(self._assignable(give_revs, g3))
+        revs3 = give_revs[revs3]
+        paps3 = g3[paps3]
+        rp_aff = self.affinity_matrix[revs3, paps3]
+        lb = self.makespan - self.max_affinities
+        # give a bigger reward if assignment would improve group.
+        costs = np.where(
+            rp_aff + pap_scores[paps3] >= lb,
+            -1.0 - self.bigger_c * rp_aff,
+            -1.0 - self.big_c * rp_aff,
         )
+        self._add_arcs(revs3, self.num_reviewers + paps3, costs)
+
+        flow = int(min(np.size(g3), np.size(g1)))
         self.supplies = np.zeros(self.num_reviewers + self.num_papers + 2)
         self.supplies[self.source] = flow
         self.supplies[self.sink] = -flow
 
-        for i in range(len(self.start_inds)):
-            self.min_cost_flow.add_arcs_with_capacity_and_unit_cost(
-                self.start_inds[i],
-                self.end_inds[i],
-                self.caps[i],
-                self.costs[i],
-            )
-        for i in range(len(self.supplies)):
-            self.min_cost_flow.set_nodes_supplies(i, int(self.supplies[i]))
+        self.start_inds = np.concatenate(self.start_inds).astype(np.int32)
+        self.end_inds = np.concatenate(self.end_inds).astype(np.int32)
+        self.caps = np.concatenate(self.caps).astype(np.int64)
+        self.costs = np.concatenate(self.costs).astype(np.int64)
+        self.min_cost_flow.add_arcs_with_capacity_and_unit_cost(
+            self.start_inds, self.end_inds, self.caps, self.costs
+        )
+        self.min_cost_flow.set_nodes_supplies(
+            np.arange(len(self.supplies), dtype=np.int32),
+            self.supplies.astype(np.int64),
+        )
+
+    def _add_arcs(self, start_inds, end_inds, costs=None):
+        """Append arcs of capacity 1 (and cost 0 by default) to the network.
+
+        Args:
+            start_inds - array of tail nodes.
+            end_inds - array of head nodes.
+            costs - array of float costs, truncated to integers, or None.
+
+        Returns:
+            None -- extends start_inds, end_inds, caps and costs.
+        """
+        self.start_inds.append(start_inds)
+        self.end_inds.append(end_inds)
+        self.caps.append(np.ones(np.size(start_inds), dtype=np.int64))
+        if costs is None:
+            costs = np.zeros(np.size(start_inds))
+        # int() truncation, as SimpleMinCostFlow costs must be integers.
+        self.costs.append(np.trunc(costs).astype(np.int64))
+
+    def _assignable(self, revs, paps):
+        """Find the unassigned pairs that can be added to the solution.
+
+        Args:
+            revs - numpy array of reviewer indices.
+            paps - numpy array of paper indices.
+
+        Returns:
+            A boolean matrix (revs x paps) of pairs that are not assigned, not
+            constrained, and have non-zero affinity unless zero affinity
+            assignments are allowed.
+        """
+        block = np.ix_(revs, paps)
+        assignable = (self.solution[block] == 0.0) & (
+            self.constraint_matrix[np.ix_(paps, revs)].T == 0.0
+        )
+        if not self.allow_zero_score_assignments:
+            assignable &= self.affinity_matrix[block] != 0.0
+        return assignable
 
     def solve_ms_improvement(self):
         """Reassign reviewers to improve the makespan.
@@ -423,38 +606,42 @@ class FairFlow(object):
         """
         solver_status = self.min_cost_flow.solve()
         if solver_status == self.min_cost_flow.OPTIMAL:
-            num_un = 0
-            for arc in range(self.min_cost_flow.num_arcs()):
-                # Can ignore arcs leading out of source or into sink.
-                if (
-                    self.min_cost_flow.tail(arc) != self.source
-                    and self.min_cost_flow.head(arc) != self.sink
-                ):
-                    if self.min_cost_flow.flow(arc) > 0:
-                        # flow goes from tail to head
-                        head = self.min_cost_flow.head(arc)
-                        tail = self.min_cost_flow.tail(arc)
-                        if head >= self.num_reviewers + self.num_papers + 2:
-                            # this is an edge that restricts flow to a paper
-                            pap = head - (
-                                self.num_reviewers + self.num_papers + 2
-                            )
-                            rev = tail
-                            assert self.solution[rev, pap] == 0.0
-                            self.solution[rev, pap] = 1.0
-                        elif tail >= self.num_reviewers + self.num_papers + 2:
-                            continue
-                        elif head >= self.num_reviewers:
-                            pap = head - self.num_reviewers
-                            rev = tail
-                            assert self.solution[rev, pap] == 0.0
-                            self.solution[rev, pap] = 1.0
-                            num_un += 1
-                        else:
-                            rev = head
-                            pap = tail - self.num_reviewers
-                            assert self.solution[rev, pap] == 1.0
-                            self.solution[rev, pap] = 0.0
+            dummy_offset = self.num_reviewers + self.num_papers + 2
+            flows = self.min_cost_flow.flows(
+                np.arange(self.min_cost_flow.num_arcs(), dtype=np.int32)
+            )
+            # Can ignore arcs leading out of source or into sink.
+            used = (
+                (flows > 0)
+                & (self.start_inds != self.source)
+                & (self.end_inds != self.sink)
+            )
+            # flow goes from tail to head
+            tails = self.start_inds[used].astype(np.int64)
+            heads = self.end_inds[used].astype(np.int64)
+
+            # edges that restrict flow to a paper, and reviewer to paper edges
+            to_dummy = heads >= dummy_offset
+            to_paper = (
+                (tails < dummy_offset)
+                & ~to_dummy
+                & (heads >= self.num_reviewers)
+            )
+            # paper to reviewer edges
+            to_reviewer = heads < self.num_reviewers
+
+            self._unassign(
+                heads[to_reviewer], tails[to_reviewer] - self.num_reviewers
+            )
+            self._assign(
+                np.concatenate([tails[to_dummy], tails[to_paper]]),
+                np.concatenate(
+                    [
+                        heads[to_dummy] - dummy_offset,
+                        heads[to_paper] - self.num_reviewers,
+                    ]
+                ),
+            )
             self.valid = False
         else:
             raise SolverException(
@@ -477,8 +664,7 @@ class FairFlow(object):
                     if self.min_cost_flow.flow(arc) > 0:
                         rev = self.min_cost_flow.tail(arc)
                         pap = self.min_cost_flow.head(arc) - self.num_reviewers
-                        assert self.solution[rev, pap] == 0.0
-                        self.solution[rev, pap] = 1.0
+                        self._assign(np.array([rev]), np.array([pap]))
 
             if not (np.all(np.sum(self.solution, axis=0) == self.demands)):
                 raise SolverException(
@@ -533,7 +719,8 @@ class FairFlow(object):
             self._refresh_internal_vars()
             # Unassign the worst reviewer from each paper in g3.
             w_revs, w_paps = self._worst_reviewer(g3)
-            self.solution[w_revs, w_paps] = 0.0
+            assigned = self.solution[w_revs, w_paps] == 1.0
+            self._unassign(w_revs[assigned], w_paps[assigned])
 
             # Try to route reviewers from the top group to the bottom.
             self._construct_ms_improvement_network(g1, g2, g3)
@@ -574,60 +761,61 @@ class FairFlow(object):
 
         mcf = min_cost_flow.SimpleMinCostFlow()
 
+        # Capacities are truncated to integers, like int() does.
+        caps = np.trunc(np.asarray(_caps, dtype=np.float64)).astype(np.int64)
+        covs = np.trunc(np.asarray(_covs, dtype=np.float64)).astype(np.int64)
+
         # edges from source to reviewers.
-        for i in range(n_rev):
-            if int(_caps[i]) > 0:
-                mcf.add_arcs_with_capacity_and_unit_cost(source, i, int(_caps[i]), 0)
+        src_revs = np.flatnonzero(caps > 0)
 
         # edges from reviewers to papers.
-        for i in range(n_rev):
-            for j in range(n_pap):
-                arc_cap = 1
-                if self.solution[i, j] == 1:
-                    continue
-
-                edge_constraint = self.constraint_matrix[(j, i)]
-
-                # a constraint of 0 means there's no constraint, so apply the cost as normal, so add an arc normally
-                # a constraint of 1 means that this user was explicitly assigned to this paper. We do not support positive constraints right now, so, do not add an arc
-                # a constraint of anything other that 0 or 1 essentially indicates a conflict, so do not add an arc
-                if edge_constraint == 0 and (
-                    self.allow_zero_score_assignments or ws[i, j] != 0
-                ):
-                    # Costs must be integers. Also, we have affinities so make the "costs" negative affinities.
-                    mcf.add_arcs_with_capacity_and_unit_cost(
-                        i,
-                        n_rev + j,
-                        int(arc_cap),
-                        int(-1.0 - self.big_c * ws[i, j]),
-                    )
+        # a constraint of 0 means there's no constraint, so apply the cost as normal, so add an arc normally
+        # a constraint of 1 means that this user was explicitly assigned to this paper. We do not support positive constraints right now, so, do not add an arc
+        # a constraint of anything other that 0 or 1 essentially indicates a conflict, so do not add an arc
+        eligible = (self.solution != 1) & (self.constraint_matrix.T == 0)
+        if not self.allow_zero_score_assignments:
+            eligible &= ws != 0
+        revs, paps = np.nonzero(eligible)
 
         # edges from papers to sink.
-        for j in range(n_pap):
-            if int(_covs[j]) > 0:
-                mcf.add_arcs_with_capacity_and_unit_cost(
-                    n_rev + j, sink, int(_covs[j]), 0
-                )
+        sink_paps = np.flatnonzero(covs > 0)
+
+        n_src, n_arcs = np.size(src_revs), np.size(revs)
+        mcf.add_arcs_with_capacity_and_unit_cost(
+            np.concatenate(
+                [np.full(n_src, source), revs, n_rev + sink_paps]
+            ).astype(np.int32),
+            np.concatenate(
+                [src_revs, n_rev + paps, np.full(np.size(sink_paps), sink)]
+            ).astype(np.int32),
+            np.concatenate(
+                [caps[src_revs], np.ones(n_arcs), covs[sink_paps]]
+            ).astype(np.int64),
+            # Costs must be integers. Also, we have affinities so make the "costs" negative affinities.
+            np.concatenate(
+                [
+                    np.zeros(n_src),
+                    np.trunc(-1.0 - self.big_c * ws[revs, paps]),
+                    np.zeros(np.size(sink_paps)),
+                ]
+            ).astype(np.int64),
+        )
 
-        supplies = np.zeros(n_rev + n_pap + 2)
+        # set Node supply for this MCF.
+        supplies = np.zeros(n_rev + n_pap + 2, dtype=np.int64)
         supplies[source] = int(flow)
         supplies[sink] = int(-flow)
-
-        # set Node supply for this MCF.
-        for i in range(len(supplies)):
-            mcf.set_nodes_supplies(i, int(supplies[i]))
+        mcf.set_nodes_supplies(
+            np.arange(len(supplies), dtype=np.int32), supplies
+        )
 
         # Solve.
         solver_status = mcf.solve()
         if solver_status == mcf.OPTIMAL:
-            for arc in range(mcf.num_arcs()):
-                # Can ignore arcs leading out of source or into sink.
-                if mcf.tail(arc) != source and mcf.head(arc) != sink:
-                    if mcf.flow(arc) > 0:
-                        rev = mcf.tail(arc)
-                        pap = mcf.head(arc) - n_rev
-                        assert self.solution[rev, pap] == 0.0
-                        self.solution[rev, pap] = 1.0
+            # Can ignore arcs leading out of source or into sink.
+            flows = mcf.flows(np.arange(n_src, n_src + n_arcs, dtype=np.int32))
+            assigned = flows > 0
+            self._assign(revs[assigned], paps[assigned])
             self.solved = True
         else:
             raise SolverException(
@@ -639,7 +827,9 @@ class FairFlow(object):
 
         Perform a binary search on the makespan value. Solve the RAP with each
         makespan value and return the solution corresponding to the makespan
-        which achieves the largest minimum paper score.
+        which achieves the largest minimum paper score. The search runs for
+        at most 10 iterations, and stops once the relative gap between the
+        feasible and infeasible makespans is within search_tolerance.
 
         Args:
             None
@@ -653,76 +843,199 @@ class FairFlow(object):
         self.makespan = ms
         best = None
         best_worst_pap_score = 0.0
+        best_solution = None
 
-        for i in range(10):
-            self.logger.debug("#info FairFlow:ITERATION %s ms %s" % (i, ms))
-            try:
-                s1, s3 = self.try_improve_ms()
-                self.logger.debug("Round 0: s1 {} s3 {}".format(s1, s3))
-                can_improve_round_counter = 1
-                can_improve = s3 > 0
-                prev_s1, prev_s3 = -1, -1
-                while can_improve and prev_s3 != s3:
-                    prev_s1, prev_s3 = s1, s3
-                    start = time.time()
-                    s1, s3 = self.try_improve_ms()
+        results = {}
+        with self._makespan_search() as (try_makespans, depth):
+            for i in range(10):
+                if best is not None and mx - mn <= self.search_tolerance * mx:
                     self.logger.debug(
-                        "Round {}: s1 {} s3 {}".format(
-                            can_improve_round_counter, s1, s3
-                        )
+                        "#info FairFlow:search converged after %s iterations"
+                        % i
                     )
-                    can_improve_round_counter += 1
-                    can_improve = s3 > 0
-                    self.logger.debug(
-                        "#info FairFlow:try_improve takes: %s s"
-                        % (time.time() - start)
+                    break
+                if ms not in results:
+                    results = try_makespans(
+                        self._makespan_tree(mn, ms, mx, min(depth, 10 - i)),
+                        best_solution,
                     )
-
-                worst_pap_score = np.min(
-                    np.sum(self.solution * self.affinity_matrix, axis=0)
+                success, worst_pap_score, solution = results[ms]
+                self.logger.debug(
+                    "#info FairFlow:ITERATION %s ms %s success %s"
+                    % (i, ms, success)
                 )
                 self.logger.debug(
                     "#info FairFlow:best worst paper score %s worst score %s"
                     % (best_worst_pap_score, worst_pap_score)
                 )
 
-                success_c1 = s3 == 0
-                success_c2 = np.all(
-                    self.affinity_matrix[self.solution.astype(bool)] != 0
-                )
-                success = success_c1 & (
-                    self.allow_zero_score_assignments | success_c2
-                )
-                self.logger.debug(
-                    "#info FairFlow:success = %s [success_c1: %s, success_c2: %s]"
-                    % (success, success_c1, success_c2)
-                )
-            except SolverException as error_handle:
-                self.logger.debug("No Solution={}".format(error_handle))
-                worst_pap_score = -np.inf
-                success = False
-                self.logger.debug("#info FairFlow:success = %s" % success)
-
-            if success and worst_pap_score >= best_worst_pap_score:
-                best = ms
-                best_worst_pap_score = worst_pap_score
-                mn = ms
-                ms += (mx - ms) / 2.0
-            else:
-                mx = ms
-                ms -= (ms - mn) / 2.0
-            self.makespan = ms
-            self.solution = self.starter_solution.copy()
+                if success and worst_pap_score >= best_worst_pap_score:
+                    best = ms
+                    best_worst_pap_score = worst_pap_score
+                    best_solution = solution
+                    mn = ms
+                    ms += (mx - ms) / 2.0
+                else:
+                    mx = ms
+                    ms -= (ms - mn) / 2.0
+                self.makespan = ms
         self.logger.debug("#info FairFlow:Best found %s" % best)
         self.logger.debug(
             "#info FairFlow:Best Worst Paper Score found %s"
             % best_worst_pap_score
         )
+        if best_solution is not None:
+            # the best solution was solved and valid, even if it was found by
+            # another process.
+            self._reset_solution(best_solution)
+            self.valid = True
+            self.solved = True
         if best is None:
             return 0.0
         else:
             return best
 
+    @staticmethod
+    def _makespan_tree(mn, ms, mx, depth):
+        """List the makespans the binary search may try in its next steps.
+
+        Args:
+            mn - lower end of the search interval.
+            ms - makespan the search tries next.
+            mx - upper end of the search interval.
+            depth - number of steps.
+
+        Returns:
+            The 2 ** depth - 1 makespans, computed like the search does.
+        """
+        if depth == 0:
+            return []
+        return (
+            [ms]
+            + FairFlow._makespan_tree(ms, ms + (mx - ms) / 2.0, mx, depth - 1)
+            + FairFlow._makespan_tree(mn, ms - (ms - mn) / 2.0, ms, depth - 1)
+        )
+
+    @contextmanager
+    def _makespan_search(self):
+        """Set up the evaluation of makespans for find_ms.
+
+        Returns:
+            A function from a list of makespans and a start solution to a
+            dict of makespan to _try_makespan results, and the number of
+            search steps to evaluate at once. If parallel_search is set, the
+            makespans are tried in a pool of processes, except inside
+            daemonic processes (e.g. Celery workers), which may not have
+            children.
+        """
+        processes = self.processes or os.cpu_count() or 1
+        depth = int(np.log2(processes + 1))
+        if (
+            not self.parallel_search
+            or depth < 2
+            or multiprocessing.current_process().daemon
+        ):
+            yield lambda makespans, start: {
+                ms: self._try_makespan(ms, start) for ms in makespans
+            }, 1
+            return
+
+        memories, shared_arrays = [], {}
+        try:
+            for attribute in self._shared_attributes:
+                memory, shared_arrays[attribute] = _share_array(
+                    getattr(self, attribute)
+                )
+                memories.append(memory)
+            state = {
+                attribute: value
+                for attribute, value in self.__dict__.items()
+                if attribute not in self._shared_attributes
+                and attribute not in self._worker_attributes
+            }
+            with ProcessPoolExecutor(
+                min(processes, 2**depth - 1),
+                initializer=_init_makespan_worker,
+                initargs=(state, shared_arrays),
+            ) as executor:
+                yield lambda makespans, start: dict(
+                    zip(
+                        makespans,
+                        executor.map(
+                            _try_worker_makespan,
+                            makespans,
+                            [start] * len(makespans),
+                        ),
+                    )
+                ), depth
+        finally:
+            for memory in memories:
+                memory.close()
+                memory.unlink()
+
+    def _try_makespan(self, ms, start=None):
+        """Improve a solution as much as possible for a makespan.
+
+        Args:
+            ms - the makespan.
+            start - the solution to start from, defaults to the starter
+                solution.
+
+        Returns:
+            Whether a valid solution was found where no paper falls below
+            the makespan by more than the max affinity, its worst paper
+            score, and if warm_start is set and it succeeded, the solution.
+            The solution is reset to the starter solution afterwards.
+        """
+        self.makespan = ms
+        if start is None:
+            start = self.starter_solution
+        self._reset_solution(start.copy())
+        try:
+            s1, s3 = self.try_improve_ms()
+            self.logger.debug("Round 0: s1 {} s3 {}".format(s1, s3))
+            can_improve_round_counter = 1
+            can_improve = s3 > 0
+            prev_s1, prev_s3 = -1, -1
+            while can_improve and prev_s3 != s3:
+                prev_s1, prev_s3 = s1, s3
+                start = time.time()
+                s1, s3 = self.try_improve_ms()
+                self.logger.debug(
+                    "Round {}: s1 {} s3 {}".format(
+                        can_improve_round_counter, s1, s3
+                    )
+                )
+                can_improve_round_counter += 1
+                can_improve = s3 > 0
+                self.logger.debug(
+                    "#info FairFlow:try_improve takes: %s s"
+                    % (time.time() - start)
+                )
+
+            worst_pap_score = np.min(self.paper_scores)
+
+            success_c1 = s3 == 0
+            success_c2 = np.all(
+                self.affinity_matrix[self.solution.astype(bool)] != 0
+            )
+            success = success_c1 & (
+                self.allow_zero_score_assignments | success_c2
+            )
+            self.logger.debug(
+                "#info FairFlow:success = %s [success_c1: %s, success_c2: %s]"
+                % (success, success_c1, success_c2)
+            )
+        except SolverException as error_handle:
+            self.logger.debug("No Solution={}".format(error_handle))
+            worst_pap_score = -np.inf
+            success = False
+            self.logger.debug("#info FairFlow:success = %s" % success)
+
+        solution = self.solution if self.warm_start and success else None
+        self._reset_solution(self.starter_solution.copy())
+        return success, worst_pap_score, solution
+
     def solve(self):
         """Find a makespan and solve flow.
 
@@ -737,6 +1050,17 @@ class FairFlow(object):
         """
 
         self._validate_input_range()
+        if self.decompose and not self.valid:
+            components = find_components(
+                self.affinity_matrix.transpose(),
+                self.constraint_matrix,
+                self.demands,
+                self.minimums,
+                self.allow_zero_score_assignments,
+            )
+            if components is not None:
+                return self._solve_components(components)
+
         ms = self.find_ms()
         self.makespan = ms
         s1, s3 = self.try_improve_ms()
@@ -748,3 +1072,59 @@ class FairFlow(object):
             can_improve = s3 > 0
 
         return self.sol_as_mat().transpose()
+
+    def _solve_components(self, components):
+        """Solve each connected component with its own FairFlow.
+
+        Args:
+            components - list of (paper indices, reviewer indices) arrays.
+
+        Returns:
+            The solution as a matrix.
+        """
+        self.logger.debug(
+            "#info FairFlow:solving %s components" % len(components)
+        )
+        minimums = np.asarray(self.minimums)
+        maximums = np.asarray(self.maximums)
+        demands = np.asarray(self.demands)
+        scores = self.affinity_matrix.transpose()
+
+        component_arguments = []
+        for paps, revs in components:
+            encoder = ComponentEncoder(
+                constraint_matrix=self.constraint_matrix[np.ix_(paps, revs)],
+                aggregate_score_matrix=scores[np.ix_(paps, revs)],
+            )
+            component_arguments.append(
+                (
+                    (
+                        minimums[revs].tolist(),
+                        maximums[revs].tolist(),
+                        demands[paps].tolist(),
+                        encoder,
+                    ),
+                    dict(
+                        allow_zero_score_assignments=self.allow_zero_score_assignments,
+                        logger=self.logger,
+                        search_tolerance=self.search_tolerance,
+                        warm_start=self.warm_start,
+                    ),
+                )
+            )
+
+        results = solve_components(
+            FairFlow,
+            component_arguments,
+            attributes=["solved", "makespan"],
+            processes=self.processes,
+        )
+
+        for (paps, revs), (solution, _) in zip(components, results):
+            self.solution[np.ix_(revs, paps)] = solution.transpose()
+        self._reset_solution(self.solution)
+        self.valid = True
+        self.solved = all(solved for _, (solved, _) in results)
+        self.makespan = min(makespan for _, (_, makespan) in results)
+
+        return self.sol_as_mat().transpose()
@@ -6,13 +6,21 @@ import math
 import json
 import psutil
 from .core import SolverException
+from .gurobi_resources import get_resources
+from .lp_backends import (
+    LP_BACKENDS,
+    LESS_EQUAL,
+    GREATER_EQUAL,
+    EQUAL,
+    OPTIMAL,
+    SUBOPTIMAL,
+    INFEASIBLE,
+    TIME_LIMIT,
+)
 
-from .basic_gurobi import Basic
-from gurobipy import *
 from scipy import sparse
-from itertools import product
 
-class FairIR(Basic):
+class FairIR(object):
     """Fair paper matcher via iterative relaxation.
 
     """
@@ -26,6 +34,8 @@ class FairIR(Basic):
         thresh=0.0,
         ##thresh=0.005, ## default value for NeurIPS
         allow_zero_score_assignments=False,
+        resources=None,
+        lp_backend="gurobi",
         logger=logging.getLogger(__name__)
         ):
         """Initialize.
@@ -40,6 +50,12 @@ class FairIR(Basic):
             weights (stored in encoder) - the affinity matrix (np.array) of papers to reviewers.
                    Rows correspond to reviewers and columns correspond to
                    papers.
+            resources - a dict of Gurobi threads, memory_limit (GB), method,
+                  time_limit (seconds per LP solve) and concurrent_workers,
+                  see gurobi_resources.get_resources.
+            lp_backend - the name of the LP solver of the relaxations, one of
+                  lp_backends.LP_BACKENDS: "gurobi" (default) or "highs",
+                  which does not need a license.
 
             Returns:
                 initialized makespan matcher.
@@ -48,47 +64,62 @@ class FairIR(Basic):
         # TODO: To allow zero score assignment, add small epsilon to all zero valued entries to avoid loss of data
         #     : during sparsification
 
-        conflict_sims = encoder.constraint_matrix.T * (encoder.constraint_matrix <= -1).T ## -1 where constraints are -1, 0 else
-        forced_matrix = (encoder.constraint_matrix >= 1).T ## 1 where constraints are 1, 0 else
-        allowed_sims = encoder.aggregate_score_matrix.transpose() * (encoder.constraint_matrix >= 0).T ## unconstrained sims
-        #weights = conflict_sims + allowed_sims ## R x P ## TODO: sparsify weights, build set of sparse tuples? group by paper?
-        weights = allowed_sims
+        # the sparse encoder matrices can be used directly as long as pairs
+        # without a stored score have a score of 0
+        sparse_scores = getattr(encoder, "sparse_aggregate_score_matrix", None)
+        self.sparse = (
+            getattr(encoder, "sparse", False)
+            and sparse_scores.default == 0
+            and sparse_scores.nnz > 0
+        )
 
-        # Sparsify weights
+        if self.sparse:
+            weights, forced_pairs, bad_affinity_reviewers = self._sparse_weights(
+                sparse_scores, encoder.sparse_constraint_matrix
+            )
+        else:
+            conflict_sims = encoder.constraint_matrix.T * (encoder.constraint_matrix <= -1).T ## -1 where constraints are -1, 0 else
+            forced_matrix = (encoder.constraint_matrix >= 1).T ## 1 where constraints are 1, 0 else
+            allowed_sims = encoder.aggregate_score_matrix.transpose() * (encoder.constraint_matrix >= 0).T ## unconstrained sims
+            #weights = conflict_sims + allowed_sims ## R x P ## TODO: sparsify weights, build set of sparse tuples? group by paper?
+            weights = allowed_sims
+
+        # Sparsify weights into a COO edge list grouped by reviewer. The
+        # position of an edge in the list is the index of its LP variable.
         sparse_weights = sparse.coo_matrix(weights)
-        zero_weights = not np.any(weights)
+        n_rev, n_pap = np.size(weights, axis=0), np.size(weights, axis=1)
 
-        if not zero_weights:
-            weights_list = sparse_weights.data
-            reviewer_idxs = sparse_weights.row
-            paper_idxs = sparse_weights.col
+        if sparse_weights.nnz > 0:
+            order = np.argsort(sparse_weights.row, kind="stable")
+            self.edge_weights = sparse_weights.data[order]
+            self.edge_revs = sparse_weights.row[order]
+            self.edge_paps = sparse_weights.col[order]
         else:
-            weights_list = [0] * np.size(weights)
-            reviewer_idxs, paper_idxs = [], []
-            for t in list(product(range(np.size(weights, axis=0)), range(np.size(weights, axis=1)))):
-                reviewer_idxs.append(t[0])
-                paper_idxs.append(t[1])
-
-        self.papers_by_reviewer = {r: [] for r in reviewer_idxs}
-        self.reviewers_by_paper = {p: [] for p in paper_idxs}
-        self.weights_by_rp = {}
-        self.rp_to_lp_idx = {r: {} for r in reviewer_idxs}
-        for w, r, p in zip(weights_list, reviewer_idxs, paper_idxs):
-            self.weights_by_rp[(r, p)] = w
-            
-        for r, p in zip(reviewer_idxs, paper_idxs):
-            self.papers_by_reviewer[r].append(p)
-            self.reviewers_by_paper[p].append(r)
+            self.edge_weights = np.zeros(n_rev * n_pap)
+            self.edge_revs, self.edge_paps = np.divmod(
+                np.arange(n_rev * n_pap), n_pap
+            )
+        self.n_edges = len(self.edge_weights)
+
+        # Edge index + 1 of each (reviewer, paper) pair, 0 if there is none
+        self.edge_index = sparse.csr_matrix(
+            (
+                np.arange(1, self.n_edges + 1),
+                (self.edge_revs, self.edge_paps),
+            ),
+            shape=(n_rev, n_pap),
+        )
 
         self.logger = logger
-        self.n_rev = np.size(weights, axis=0)
-        self.n_pap = np.size(weights, axis=1)
+        self.n_rev = n_rev
+        self.n_pap = n_pap
         self.solved = False
         self.loads = maximums
         self.loads_lb = minimums
         self.coverages = demands
         self.allow_zero_score_assignments = allow_zero_score_assignments
         self.weights = weights
+        self.max_weight = weights.max()
         self.attr_constraints = encoder.attribute_constraints
         # Example attr_constraints schema
         '''
@@ -100,24 +131,30 @@ class FairIR(Basic):
         }]
         '''
 
-        # Build set of forced tuples (r, p)
-        forced_list = []
-        for r in self.papers_by_reviewer.keys():
-            for p in self.papers_by_reviewer[r]:
-                if forced_matrix[r, p] == 1:
-                    forced_list.append(
-                        (r, p)
-                    )
+        # Build set of forced edges
+        if self.sparse:
+            forced_edges = self._lp_indices(
+                *np.array(forced_pairs, dtype=int).reshape(-1, 2).T
+            )
+            forced_edges = forced_edges[forced_edges >= 0]
+        else:
+            forced_edges = np.flatnonzero(
+                forced_matrix[self.edge_revs, self.edge_paps] == 1
+            )
+        forced_per_paper = np.bincount(
+            self.edge_paps[forced_edges], minlength=self.n_pap
+        )
 
         if not self.allow_zero_score_assignments:
             # Find reviewers with no non-zero affinity edges after constraints are applied and remove their load_lb
-            bad_affinity_reviewers = np.where(
-                np.all(
-                    (encoder.aggregate_score_matrix.T * (encoder.constraint_matrix == 0).T)
-                    == 0,
-                    axis=1,
-                )
-            )[0]
+            if not self.sparse:
+                bad_affinity_reviewers = np.where(
+                    np.all(
+                        (encoder.aggregate_score_matrix.T * (encoder.constraint_matrix == 0).T)
+                        == 0,
+                        axis=1,
+                    )
+                )[0]
             logging.debug(
                 "Setting minimum load for {} reviewers to 0 "
                 "because they do not have known affinity with any paper".format(
@@ -127,14 +164,27 @@ class FairIR(Basic):
             for rev_id in bad_affinity_reviewers:
                 self.loads_lb[rev_id] = 0
 
+        if lp_backend not in LP_BACKENDS:
+            raise SolverException(
+                "Unknown FairIR LP backend {}, expected one of {}".format(
+                    lp_backend, ", ".join(LP_BACKENDS)
+                )
+            )
+
         self._log_and_profile('Setting up model')
         self.id = uuid.uuid4()
-        self.m = Model("%s : FairIR" % str(self.id))
-        self.m.setParam('Threads', 50)
         self.makespan = thresh
         self.solution = None
+        self.status = None
 
-        self.m.setParam('OutputFlag', 0)
+        self.resources = get_resources(resources)
+        self.lp_backend = lp_backend
+        self.lp = LP_BACKENDS[lp_backend](
+            "%s : FairIR" % str(self.id), self.resources
+        )
+        self.logger.info(
+            f"FairIR: {lp_backend} LP backend, resources {self.resources}"
+        )
 
         self.load_ub_name = 'lib'
         self.load_lb_name = 'llb'
@@ -142,124 +192,219 @@ class FairIR(Basic):
         self.ms_constr_prefix = 'ms'
         self.round_constr_prefix = 'round'
 
-        # primal variables
+        # primal variables and the objective
         start = time.time()
-        self.lp_vars = []
-        self.r_to_lp_idx = {}
-        for rev_idx, i in enumerate(self.papers_by_reviewer.keys()):
-            self.lp_vars.append([])
-            papers = self.papers_by_reviewer[i]
-            self.r_to_lp_idx[i] = rev_idx
-            for idx, j in enumerate(papers):
-                self.rp_to_lp_idx[i][j] = idx
-                self.lp_vars[rev_idx].append(self.m.addVar(ub=1.0,
-                                                     name=self.var_name(i, j)))
-        self.m.update()
-        self._log_and_profile('#info FairIR:Time to add vars %s' % (time.time() - start))
-
-        start = time.time()
-        # set the objective
-        obj = LinExpr()
-        for rev_idx, i in enumerate(self.papers_by_reviewer.keys()):
-            papers = self.papers_by_reviewer[i]
-            for paper_idx, j in enumerate(papers):
-                obj += self.weights[i][j] * self.lp_vars[rev_idx][paper_idx]
-        self.m.setObjective(obj, GRB.MAXIMIZE)
-        self._log_and_profile('#info FairIR:Time to set obj %s' % (time.time() - start))
+        self.lp.add_variables(self.edge_weights, self._var_names())
+        self._log_and_profile('#info FairIR:Time to add vars and set obj %s' % (time.time() - start))
+
+        # reviewer x edge and paper x edge incidence matrices.
+        edges = np.arange(self.n_edges)
+        rev_incidence = sparse.csr_matrix(
+            (np.ones(self.n_edges), (self.edge_revs, edges)),
+            shape=(self.n_rev, self.n_edges),
+        )
+        self.pap_incidence = sparse.csr_matrix(
+            (np.ones(self.n_edges), (self.edge_paps, edges)),
+            shape=(self.n_pap, self.n_edges),
+        )
+        self.ms_matrix = sparse.csr_matrix(
+            (self.edge_weights, (self.edge_paps, edges)),
+            shape=(self.n_pap, self.n_edges),
+        )
 
         start = time.time()
         # load upper bound constraints.
-        for r_idx, r in enumerate(self.papers_by_reviewer.keys()):
-            load = self.loads[r]
-            self.m.addConstr(sum(self.lp_vars[r_idx]) <= load,
-                             self.lub_constr_name(r))
+        reviewers = np.unique(self.edge_revs)
+        self.lp.add_constraints(
+            rev_incidence[reviewers],
+            LESS_EQUAL,
+            np.asarray(self.loads, dtype=float)[reviewers],
+            names=[self.lub_constr_name(r) for r in reviewers],
+        )
 
         # load load bound constraints.
         if self.loads_lb is not None:
-            for r_idx, r in enumerate(self.papers_by_reviewer.keys()):
-                load = self.loads_lb[r]
-                self.m.addConstr(sum(self.lp_vars[r_idx]) >= load,
-                                 self.llb_constr_name(r))
+            self.lp.add_constraints(
+                rev_incidence[reviewers],
+                GREATER_EQUAL,
+                np.asarray(self.loads_lb, dtype=float)[reviewers],
+                names=[self.llb_constr_name(r) for r in reviewers],
+            )
 
         # coverage constraints.
-        for p, cov in enumerate(self.coverages):
-            reviewers = self.reviewers_by_paper[p]
-            self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)]
-                                  for i in reviewers]) == cov,
-                             self.cov_constr_name(p))
+        self.lp.add_constraints(
+            self.pap_incidence,
+            EQUAL,
+            np.asarray(self.coverages, dtype=float),
+            names=[self.cov_constr_name(p) for p in range(self.n_pap)],
+        )
 
         self._log_and_profile('#info FairIR:Time to set loads and coverage %s' % (time.time() - start))
 
         # forced assignment constraints.
-        for forced in forced_list:
-            reviewer, paper = forced[0], forced[1]
-            self.fix_assignment(self.r_to_lp_idx[reviewer], self._paper_number_to_lp_idx(reviewer, paper), 1)
+        self.fix_assignment(forced_edges, 1)
 
         # attribute constraints.
+        self.attr_member_masks = []
         if self.attr_constraints is not None:
             self._log_and_profile(f"Attribute constraints detected")
+            senses = {
+                '==': EQUAL,
+                '>=': GREATER_EQUAL,
+                '<=': LESS_EQUAL,
+            }
+            coverages = np.asarray(self.coverages)
+            remaining_demand = coverages - forced_per_paper
+            rows, cols = [], []
+            attr_senses, attr_bounds, attr_names = [], [], []
             for constraint_dict in self.attr_constraints:
-                constraint_start = time.time()
                 name, bound, comparator, members = constraint_dict['name'], constraint_dict['bound'], constraint_dict['comparator'], constraint_dict['members']
-                for p in range(self.n_pap):
-                    reviewers = self.reviewers_by_paper[p]
-                    overlap = set(reviewers).intersection(set(members))
-
-                    # Check number of forced assignments and adjust bounds
-                    num_forced = 0
-                    for forced in forced_list:
-                        if p == forced[1]:
-                            num_forced += 1
-
-                    remaining_demand = self.coverages[p] - num_forced
-
-                    if comparator == '==':
-                        adj_bound = bound if remaining_demand >= bound else remaining_demand
-                        self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)]
-                                    for i in overlap]) == adj_bound,
-                                    self.attr_constr_name(name, p))
-                    elif comparator == '>=':
-                        adj_bound = bound if remaining_demand >= bound else remaining_demand
-                        self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)]
-                                    for i in overlap]) >= adj_bound,
-                                    self.attr_constr_name(name, p))
-                    elif comparator == '<=':
-                        adj_bound = bound if num_forced <= bound else min(bound + num_forced, self.coverages[p])
-                        self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)]
-                                    for i in overlap]) <= adj_bound,
-                                    self.attr_constr_name(name, p))
-                # self._log_and_profile(f"Time to add {len(members)} {name} constraints: {time.time() - constraint_start}")
-
-                ## Don't call it for every consraint iteration
-                ## self.m.update()
+                member_mask = np.zeros(self.n_rev, dtype=bool)
+                member_mask[members] = True
+                self.attr_member_masks.append(member_mask)
+                if comparator not in senses:
+                    continue
+
+                # Adjust the bounds by the number of forced assignments
+                if comparator == '==' or comparator == '>=':
+                    adj_bounds = np.minimum(bound, remaining_demand)
+                elif comparator == '<=':
+                    adj_bounds = np.where(
+                        forced_per_paper <= bound,
+                        bound,
+                        np.minimum(bound + forced_per_paper, coverages),
+                    )
+
+                # one row per paper over the edges of the member reviewers
+                member_edges = np.flatnonzero(member_mask[self.edge_revs])
+                first_row = len(attr_bounds) * self.n_pap
+                rows.append(first_row + self.edge_paps[member_edges])
+                cols.append(member_edges)
+                attr_senses.append(senses[comparator])
+                attr_bounds.append(adj_bounds)
+                attr_names.extend(
+                    self.attr_constr_name(name, p) for p in range(self.n_pap)
+                )
+
+            if attr_bounds:
+                rows, cols = np.concatenate(rows), np.concatenate(cols)
+                self.lp.add_constraints(
+                    sparse.csr_matrix(
+                        (np.ones(len(rows)), (rows, cols)),
+                        shape=(len(attr_names), self.n_edges),
+                    ),
+                    np.repeat(attr_senses, self.n_pap),
+                    np.concatenate(attr_bounds).astype(float),
+                    names=attr_names,
+                )
 
         # makespan constraints.
-        for p in range(self.n_pap):
-            reviewers = self.reviewers_by_paper[p]
-            self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)] * self.weights[i][p]
-                                  for i in reviewers]) >= self.makespan,
-                             self.ms_constr_name(p))
-        self.m.update()
+        # makespan constraints are created once, change_makespan only
+        # updates their right hand sides.
+        ms_names = [self.ms_constr_name(p) for p in range(self.n_pap)]
+        self.ms_rows = self.lp.add_constraints(
+            self.ms_matrix,
+            GREATER_EQUAL,
+            np.full(self.n_pap, self.makespan, dtype=float),
+            names=ms_names,
+        )
         self._log_and_profile('#info FairIR:Time to add all constraints %s' % (time.time() - start))
 
-        # Store constraints
-        self.name_to_constraint = {}
-        for c in self.m.getConstrs():
-            self.name_to_constraint[c.ConstrName] = c
+        # Row of each makespan constraint that is still enforced
+        self.name_to_constraint = dict(zip(ms_names, self.ms_rows.tolist()))
+
+    @staticmethod
+    def _sparse_weights(score_matrix, constraint_matrix):
+        """Build the weights from the sparse encoder matrices.
+
+        Args:
+            score_matrix - the aggregate scores as a DefaultSparseMatrix with
+                a default of 0 (papers x reviewers).
+            constraint_matrix - the constraints as a DefaultSparseMatrix
+                (papers x reviewers).
+
+        Returns:
+            The unconstrained weights as a sparse reviewers x papers matrix,
+            the list of forced (reviewer, paper) tuples and the reviewers with
+            no non-zero affinity edge after constraints are applied.
+        """
+        papers, reviewers, scores = score_matrix.entries()
+        constraints = constraint_matrix.values_at(papers, reviewers)
+
+        allowed = constraints >= 0
+        weights = sparse.csr_matrix(
+            (scores[allowed], (reviewers[allowed], papers[allowed])),
+            shape=score_matrix.shape[::-1],
+        )
+        weights.eliminate_zeros()
+
+        forced_papers, forced_reviewers, forced_values = (
+            constraint_matrix.entries()
+        )
+        forced = forced_values >= 1
+        forced_pairs = list(
+            zip(forced_reviewers[forced].tolist(), forced_papers[forced].tolist())
+        )
+
+        known_reviewers = reviewers[(scores != 0) & (constraints == 0)]
+        bad_affinity_reviewers = np.setdiff1d(
+            np.arange(score_matrix.shape[1]), known_reviewers
+        )
+
+        return weights, forced_pairs, bad_affinity_reviewers
+
+    def _lp_indices(self, reviewers, papers):
+        """Index of the LP variable of each (reviewer, paper) pair, -1 if the
+        pair has no edge."""
+        indices = sparse.csr_matrix(self.edge_index[reviewers, papers])
+        return indices.toarray().ravel() - 1
+
+    def _paper_edges(self, paper_num):
+        """Indices of the LP variables of a paper, from its row of the paper
+        incidence matrix."""
+        start, end = self.pap_incidence.indptr[paper_num:paper_num + 2]
+        return self.pap_incidence.indices[start:end]
 
     def _paper_number_to_lp_idx(self, rev_num, paper_num):
-        papers = self.papers_by_reviewer[rev_num]
-        try:
-            return self.rp_to_lp_idx[rev_num][paper_num]
-        except:
+        idx = self._lp_indices([rev_num], [paper_num])[0]
+        if idx < 0:
             raise SolverException(f"No score between paper {paper_num} and reviewer {rev_num}")
+        return idx
 
     def _log_and_profile(self, log_message=""):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         conv = 1e9
         vmem = psutil.virtual_memory()
         smem = psutil.swap_memory()
         self.logger.debug(f"{log_message} | Memory: {vmem.used/conv:.2f}/{vmem.available/conv:.2f}={vmem.percent}% | Swap Memory: {smem.used/conv:.2f}/{smem.total/conv:.2f}={smem.percent}%")
 
+    @staticmethod
+    def var_name(i, j):
+        """The name of the variable corresponding to reviewer i and paper j."""
+        return "x_" + str(i) + "," + str(j)
+
+    def _var_names(self):
+        """Name of the LP variable of each edge."""
+        edges = zip(self.edge_revs.tolist(), self.edge_paps.tolist())
+        return [self.var_name(i, j) for i, j in edges]
+
+    def _solve_lp(self):
+        """Solve the current relaxation and store its status."""
+        start = time.time()
+        self.status = self.lp.solve()
+        self._log_and_profile('#info FairIR:Time to solve %s' % (time.time() - start))
+
+    def _check_time_limit(self):
+        """Raise if the last LP solve stopped at the configured time limit."""
+        if self.status == TIME_LIMIT:
+            raise SolverException(
+                "The LP solve did not finish within the solver time limit of "
+                "{} seconds. Try increasing the time limit.".format(
+                    self.resources["time_limit"]
+                )
+            )
+
     def _validate_input_range(self):
         """Validate if demand is in the range of min supply and max supply"""
         self._log_and_profile("Checking if demand is in range")
@@ -315,33 +460,30 @@ class FairIR(Basic):
             Nothing.
         """
         self._log_and_profile('#info FairIR:CHANGE_MAKESPAN call')
-        for c in self.m.getConstrs():
-            if c.getAttr("ConstrName").startswith(self.ms_constr_prefix):
-                self.m.remove(c)
-                # self.m.update()
-
         self.makespan = new_makespan
 
+        # A right hand side of -inf drops the constraint of a paper while
+        # keeping the model, and so the basis of the last solve, in place.
+        rhs = np.full(self.n_pap, -np.inf)
         if new_makespan != 0.0: ## Only add them back if the new makespan is non zero
-            for p in range(self.n_pap):
-                reviewers = self.reviewers_by_paper[p]
-                constraint_name = self.ms_constr_prefix + str(p)
-                if existing_makespans and constraint_name not in existing_makespans:
-                    continue
-                self.m.addConstr(sum([self.lp_vars[self.r_to_lp_idx[i]][self._paper_number_to_lp_idx(i, p)] * self.weights[i][p]
-                                    for i in reviewers]) >= new_makespan,
-                                self.ms_constr_prefix + str(p))
-            self.m.update()
+            rhs[:] = new_makespan
+            if existing_makespans is not None:
+                existing_makespans = set(existing_makespans)
+                rhs[
+                    [
+                        self.ms_constr_name(p) not in existing_makespans
+                        for p in range(self.n_pap)
+                    ]
+                ] = -np.inf
+        self.lp.set_rhs(self.ms_rows, rhs)
         self._log_and_profile('#info RETURN FairIR:CHANGE_MAKESPAN call')
 
     def sol_as_mat(self):
         self._log_and_profile('#info FairIR:SOL_AS_MAT call')
-        if self.m.status == GRB.OPTIMAL or self.m.status == GRB.SUBOPTIMAL:
+        if self.status == OPTIMAL or self.status == SUBOPTIMAL:
             self.solved = True
             solution = np.zeros((self.n_rev, self.n_pap))
-            for v in self.m.getVars():
-                i, j = self.indices_of_var(v)
-                solution[i, j] = v.x
+            solution[self.edge_revs, self.edge_paps] = self.lp.values()
             self.solution = solution
             return solution
         else:
@@ -352,15 +494,12 @@ class FairIR(Basic):
     def integral_sol_found(self, precalculated=None):
         self._log_and_profile('#info FairIR:INTEGRAL_SOL_FOUND call')
         """Return true if all lp variables are integral."""
-        sol = self.sol_as_dict() if precalculated is None else precalculated
-        return all(sol[self.var_name(i, j)] == 1.0 or
-                   sol[self.var_name(i, j)] == 0.0
-                   for i in self.papers_by_reviewer.keys() for j in self.papers_by_reviewer[i])
-
-    def fix_assignment(self, i, j, val):
-        """Round the variable x_ij to val."""
-        self.lp_vars[i][j].ub = val
-        self.lp_vars[i][j].lb = val
+        sol = self.sol_as_array() if precalculated is None else precalculated
+        return np.all((sol == 1.0) | (sol == 0.0))
+
+    def fix_assignment(self, idx, val):
+        """Round the LP variable(s) at idx to val."""
+        self.lp.fix_variables(idx, val)
         
     def fix_assignment_to_one_with_constraints(self, i, j, integral_assignments):
         """Round the variable x_ij to 1 if the attribute constraints are obeyed : i - reviewer, j - paper"""
@@ -368,17 +507,25 @@ class FairIR(Basic):
         ## FIRST check integral assignments only - these should correspond to the true assignments
         ## SECOND check lb == 1 or ub == 0 to check for assignments
         if self.attr_constraints is not None:
-            for constraint_dict in self.attr_constraints:
-                bound, comparator, members =  constraint_dict['bound'], constraint_dict['comparator'], constraint_dict['members']
-                s = sum([integral_assignments[k][j] for k in members]) + 1 ## s = current total + 1 more assignment
+            paper_edges = self._paper_edges(j)
+            for constraint_dict, member_mask in zip(
+                self.attr_constraints, self.attr_member_masks
+            ):
+                bound, comparator =  constraint_dict['bound'], constraint_dict['comparator']
+                member_edges = paper_edges[
+                    member_mask[self.edge_revs[paper_edges]]
+                ]
+                s = integral_assignments[member_edges].sum() + 1 ## s = current total + 1 more assignment
 
                 # If leq constraint and adding 1 does not violate the bound, fix assignment
                 if comparator == '<=' and s < bound:
-                    self.fix_assignment(i, j, 1.0)
-                    integral_assignments[i][j] = 1.0
+                    idx = self._paper_number_to_lp_idx(i, j)
+                    self.fix_assignment(idx, 1.0)
+                    integral_assignments[idx] = 1.0
         else:
-            self.fix_assignment(i, j, 1.0)
-            integral_assignments[i][j] = 1.0
+            idx = self._paper_number_to_lp_idx(i, j)
+            self.fix_assignment(idx, 1.0)
+            integral_assignments[idx] = 1.0
 
     def fix_assignment_to_zero_with_constraints(self, i, j, integral_assignments):
         """Round the variable x_ij to 1 if the attribute constraints are obeyed : i - reviewer, j - paper"""
@@ -386,17 +533,25 @@ class FairIR(Basic):
         ## FIRST check integral assignments only - these should correspond to the true assignments
         ## SECOND check lb == 1 or ub == 0 to check for assignments
         if self.attr_constraints is not None:
-            for constraint_dict in self.attr_constraints:
-                bound, comparator, members =  constraint_dict['bound'], constraint_dict['comparator'], constraint_dict['members']
-                s = sum([integral_assignments[k][j] for k in members]) + 1 ## s = current total + 1 more assignment
+            paper_edges = self._paper_edges(j)
+            for constraint_dict, member_mask in zip(
+                self.attr_constraints, self.attr_member_masks
+            ):
+                bound, comparator =  constraint_dict['bound'], constraint_dict['comparator']
+                member_edges = paper_edges[
+                    member_mask[self.edge_revs[paper_edges]]
+                ]
+                s = integral_assignments[member_edges].sum() + 1 ## s = current total + 1 more assignment
 
                 # If geq or eq constraint and the bound is already satisfied, allow assignment to be 0
                 if (comparator == '==' or comparator == '>=') and s >= bound:
-                    self.fix_assignment(i, j, 0.0)
-                    integral_assignments[i][j] = 0.0
+                    idx = self._paper_number_to_lp_idx(i, j)
+                    self.fix_assignment(idx, 0.0)
+                    integral_assignments[idx] = 0.0
         else:
-            self.fix_assignment(i, j, 0.0)
-            integral_assignments[i][j] = 0.0
+            idx = self._paper_number_to_lp_idx(i, j)
+            self.fix_assignment(idx, 0.0)
+            integral_assignments[idx] = 0.0
 
     def find_ms(self):
         self._log_and_profile('#info FairIR:FIND_MS call')
@@ -413,28 +568,25 @@ class FairIR(Basic):
             Highest feasible makespan value found.
         """
         mn = 0.0
-        mx = np.max(self.weights) * np.max(self.coverages)
+        mx = self.max_weight * np.max(self.coverages)
         ms = mx
         best = None
         self.change_makespan(ms)
-        start = time.time()
-        self.m.optimize()
-        self._log_and_profile('#info FairIR:Time to solve %s' % (time.time() - start))
+        self._solve_lp()
         for i in range(10):
             self._log_and_profile('#info FairIR:ITERATION %s ms %s' % (i, ms))
-            if self.m.status == GRB.INFEASIBLE:
+            self._check_time_limit()
+            if self.status == INFEASIBLE:
                 mx = ms
                 ms -= (ms - mn) / 2.0
             else:
                 assert(best is None or ms >= best)
-                assert(self.m.status == GRB.OPTIMAL)
+                assert(self.status == OPTIMAL)
                 best = ms
                 mn = ms
                 ms += (mx - ms) / 2.0
             self.change_makespan(ms)
-            start = time.time()
-            self.m.optimize()
-            self._log_and_profile('#info FairIR:Time to solve %s' % (time.time() - start))
+            self._solve_lp()
         self._log_and_profile(f'#info RETURN FairIR:FIND_MS call ms={best}')
 
         if best is None:
@@ -468,10 +620,6 @@ class FairIR(Basic):
         self.change_makespan(ms)
         self.round_fraction_iteration()
 
-        sol = {}
-        for v in self.m.getVars():
-            sol[v.varName] = v.x
-
         self._log_and_profile('#info RETURN FairIR:SOLVE call')
         return self.sol_as_mat().transpose()
 
@@ -488,17 +636,23 @@ class FairIR(Basic):
         Returns:
             A dictionary from var_name to value (either 0 or 1)
         """
-        if self.m.status == GRB.OPTIMAL or self.m.status == GRB.SUBOPTIMAL:
+        sol = self.sol_as_array()
+        return dict(zip(self._var_names(), sol.tolist()))
+
+    def sol_as_array(self):
+        """Return the LP value of every edge, in edge list order.
+
+        If the matching has not be solved optimally or suboptimally, then raise
+        an exception.
+        """
+        if self.status == OPTIMAL or self.status == SUBOPTIMAL:
             self.solved = True
-            _sol = {}
-            for v in self.m.getVars():
-                _sol[v.varName] = v.x
-            return _sol
+            return self.lp.values()
         else:
             raise Exception(
                 'You must have solved the model optimally or suboptimally '
                 'before calling this function.\nSTATUS %s\tMAKESPAN %f' % (
-                    self.m.status, self.makespan))
+                    self.status, self.makespan))
 
     def round_fractional(self, integral_assignments, count=0):
         self._log_and_profile('#info FairIR:ROUND_FRACTIONAL call: %s' % count)
@@ -514,7 +668,8 @@ class FairIR(Basic):
            fraction assignments and drop the load constraints on that reviewer.
 
         Args:
-            integral_assignments - np.array of revs x paps (initially None).
+            integral_assignments - np.array of the rounded value of each edge
+                (initially -1).
             log_file - the log file if exists.
             count - (int) to keep track of the number of calls to this function.
 
@@ -523,89 +678,68 @@ class FairIR(Basic):
             class.
         """
 
-        start = time.time()
-        self.m.optimize()
+        self._solve_lp()
+        self._check_time_limit()
 
-        self._log_and_profile('#info FairIR:Time to solve %s' % (time.time() - start))
-
-        if self.m.status != GRB.OPTIMAL and self.m.status != GRB.SUBOPTIMAL:
+        if self.status != OPTIMAL and self.status != SUBOPTIMAL:
             # TODO: Dump more information
-            self.m.computeIIS()
-            self.m.write("model.ilp")
-            self._log_and_profile('#info FairIR: The program is infeasible - check the model.ilp file for the problematic constraints.')
+            if self.lp.write_infeasibility("model.ilp") is not None:
+                self._log_and_profile('#info FairIR: The program is infeasible - check the model.ilp file for the problematic constraints.')
+            else:
+                self._log_and_profile('#info FairIR: The program is infeasible.')
             return False
-            #assert False, '%s\t%s' % (self.m.status, self.makespan)
+            #assert False, '%s\t%s' % (self.status, self.makespan)
 
         # Check that the constraints are obeyed when fetching sol
         # attribute constraints.
         self._log_and_profile('Checking if attribute constraints exist')
-        sol = self.sol_as_dict()
+        sol = self.sol_as_array()
 
         if self.integral_sol_found(precalculated=sol):
             return True
         else:
-            frac_assign_p = {}
-            frac_assign_r = {}
-            fractional_vars = []
-
-            fixed, frac = 0, 0
-
             # Find fractional vars.
-            for rev_idx, i in enumerate(self.papers_by_reviewer.keys()):
-                papers = self.papers_by_reviewer[i]
-                for paper_idx, j in enumerate(papers):
-                    if j not in frac_assign_p:
-                        frac_assign_p[j] = []
-                    if i not in frac_assign_r:
-                        frac_assign_r[i] = []
-
-                    if sol[self.var_name(i, j)] == 0.0 and integral_assignments[i][j] != 0.0:
-                        #self.fix_assignment_to_zero_with_constraints(i, j, integral_assignments)
-                        self.fix_assignment(rev_idx, paper_idx, 0.0)
-                        integral_assignments[i][j] = 0.0
-                        fixed += 1
-
-                    elif sol[self.var_name(i, j)] == 1.0 and integral_assignments[i][j] != 1.0:
-                        #self.fix_assignment_to_one_with_constraints(i, j, integral_assignments)
-                        self.fix_assignment(rev_idx, paper_idx, 1.0)
-                        integral_assignments[i][j] = 1.0
-                        fixed += 1
-
-                    elif sol[self.var_name(i, j)] != 1.0 and sol[self.var_name(i, j)] != 0.0:
-                        frac_assign_p[j].append(
-                            (i, j, sol[self.var_name(i, j)])
-                        )
-                        frac_assign_r[i].append(
-                            (i, j, sol[self.var_name(i, j)])
-                        )
-
-                        fractional_vars.append((i, j, sol[self.var_name(i, j)]))
-                        integral_assignments[i][j] = sol[self.var_name(i, j)]
-                        frac += 1
-                
+            to_zero = (sol == 0.0) & (integral_assignments != 0.0)
+            to_one = (sol == 1.0) & (integral_assignments != 1.0)
+            fractional = (sol != 0.0) & (sol != 1.0)
+
+            self.fix_assignment(np.flatnonzero(to_zero), 0.0)
+            self.fix_assignment(np.flatnonzero(to_one), 1.0)
+            integral_assignments[to_zero] = 0.0
+            integral_assignments[to_one] = 1.0
+            integral_assignments[fractional] = sol[fractional]
+
+            fixed = np.count_nonzero(to_zero) + np.count_nonzero(to_one)
+            frac = np.count_nonzero(fractional)
             self._log_and_profile(f'#info FairIR:ROUND_FRACTIONAL END O(RP) loop\nfixed={fixed}, frac={frac}')
 
             # First try to elim a makespan constraint.
+            frac_per_paper = np.bincount(
+                self.edge_paps[fractional], minlength=self.n_pap
+            )
+            papers = np.flatnonzero(
+                (frac_per_paper == 2) | (frac_per_paper == 3)
+            )
             removed = False
-            self._log_and_profile(f'#info FairIR:ROUND_FRACTIONAL Relaxing local fairness n_papers={len(frac_assign_p.keys())}')
-            for (paper, frac_vars) in frac_assign_p.items():
-                if len(frac_vars) == 2 or len(frac_vars) == 3:
-                    try: ## Pass on KeyError, trying to remove a constraint that was already removed
-                        self.m.remove(self.name_to_constraint[self.ms_constr_name(paper)])
-                        del self.name_to_constraint[self.ms_constr_name(paper)]
-                        removed = True
-                    except KeyError:
-                        pass
-                    except Exception as e:
-                        raise e
-
-            self.m.update()
+            self._log_and_profile(f'#info FairIR:ROUND_FRACTIONAL Relaxing local fairness n_papers={len(papers)}')
+            for paper in papers:
+                try: ## Pass on KeyError, trying to remove a constraint that was already removed
+                    self.lp.set_rhs(
+                        [self.name_to_constraint[self.ms_constr_name(paper)]],
+                        -np.inf,
+                    )
+                    del self.name_to_constraint[self.ms_constr_name(paper)]
+                    removed = True
+                except KeyError:
+                    pass
+                except Exception as e:
+                    raise e
 
             self._log_and_profile('#info RETURN FairIR:ROUND_FRACTIONAL call')
             return False
         
     def round_fraction_iteration(self):
-        integral_assignments = np.ones((self.n_rev, self.n_pap), dtype=np.float16) * -1
+        integral_assignments = np.full(self.n_edges, -1, dtype=np.float16)
         demand = sum(self.coverages)
         previous_assigned = -1
         for count in range(50):
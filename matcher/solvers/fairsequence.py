@@ -1,3 +1,4 @@
+import copy
 import math
 import numpy as np
 from sortedcontainers import SortedList
@@ -15,6 +16,95 @@ class PickingSequenceException(Exception):
     pass
 
 
+class _ReviewerQueue(object):
+    """The best reviewers of a paper, in decreasing order of affinity.
+
+    Ties are broken by increasing reviewer index. The reviewers are sorted
+    lazily by partial sorts, one chunk (of doubling size) at a time, so most
+    papers only ever sort a few of their best reviewers. Iterating over the
+    queue gives the reviewers sorted so far that have not been removed.
+    Removed reviewers are only marked, and skipped when the queue is read.
+    """
+
+    initial_chunk_size = 32
+
+    def __init__(self, affinities):
+        """
+        :param affinities: a 1d numpy array of the affinity of each reviewer for the paper.
+        """
+        self.affinities = affinities
+        self.chunk_size = self.initial_chunk_size
+        self.last = None
+        self.all_sorted = len(affinities) == 0
+        self.sorted_reviewers = []
+        # the sorted reviewers before start are all removed, the removed
+        # reviewers after it are in the removed set
+        self.start = 0
+        self.removed = set()
+
+    def __iter__(self):
+        for i in range(self.start, len(self.sorted_reviewers)):
+            r = self.sorted_reviewers[i]
+            if r not in self.removed:
+                yield r
+
+    def __copy__(self):
+        queue = _ReviewerQueue.__new__(_ReviewerQueue)
+        queue.__dict__.update(self.__dict__)
+        queue.sorted_reviewers = list(self.sorted_reviewers)
+        queue.removed = set(self.removed)
+        return queue
+
+    def sort_chunk(self):
+        """Sort the next best chunk of reviewers onto the end of the queue.
+
+        Returns:
+            False if all the reviewers were already sorted, True otherwise.
+        """
+        if self.all_sorted:
+            return False
+        keys = -self.affinities
+        if self.last is None:
+            unsorted = np.arange(len(keys))
+        else:
+            # the reviewers after the last sorted one, in (key, index) order.
+            last = self.last
+            unsorted = keys > keys[last]
+            unsorted[last + 1 :] |= keys[last + 1 :] == keys[last]
+            unsorted = np.flatnonzero(unsorted)
+        keys = keys[unsorted]
+
+        if len(keys) > self.chunk_size:
+            kth = np.partition(keys, self.chunk_size - 1)[self.chunk_size - 1]
+            chunk = np.flatnonzero(keys <= kth)
+        else:
+            chunk = np.arange(len(keys))
+            self.all_sorted = True
+        chunk = unsorted[chunk[np.argsort(keys[chunk], kind="stable")]]
+        self.sorted_reviewers.extend(chunk.tolist())
+        if len(chunk):
+            self.last = chunk[-1]
+        self.chunk_size *= 2
+        return True
+
+    def remove(self, reviewers):
+        """Mark reviewers as removed, then move the start of the queue past
+        the removed reviewers at its front."""
+        self.removed.update(reviewers)
+        sorted_reviewers = self.sorted_reviewers
+        while (
+            self.start < len(sorted_reviewers)
+            and sorted_reviewers[self.start] in self.removed
+        ):
+            self.removed.discard(sorted_reviewers[self.start])
+            self.start += 1
+        if self.start > len(sorted_reviewers) // 2:
+            # drop the removed front once it is most of the list, which
+            # keeps the cost amortized constant per removed reviewer
+            del sorted_reviewers[: self.start]
+            self.start = 0
+
+
 class FairSequence(object):
     """
     Assign reviewers using a modified version of the Greedy Reviewer Round-Robin algorithm
@@ -108,9 +198,9 @@ class FairSequence(object):
                 )
             )
 
-        self.best_revs = np.argsort(-1 * self.affinity_matrix, axis=0)
         self.max_affinity = np.max(self.affinity_matrix)
         self.safe_mode = True
+        self.checkpoint = None
 
         self.solved = False
         self.logger.debug("End Init FairSequence")
@@ -150,7 +240,9 @@ class FairSequence(object):
                 "You must have executed solve() before calling this function"
             )
 
-    def _is_valid_assignment(self, r, p, dict_alloc, previous_attained_scores):
+    def _is_valid_assignment(
+        self, r, p, bundle_values, own_values, previous_attained_scores
+    ):
         """Ensure that we can assign reviewer r to paper p without breaking WEF1.
 
         We have to check any paper p_prime that has chosen a reviewer which is worth
@@ -160,50 +252,67 @@ class FairSequence(object):
         Args:
             r - (int) the id of the reviewer we want to add
             p - (int) the id of the paper to which we are adding r
-            dict_alloc - (dict) the current allocation, maps papers to lists of reviewers
+            bundle_values - (tuple) the value of the bundle of p to every paper, and of the
+                            best reviewer in it, as returned by _bundle_values
+            own_values - (1d numpy array) maps each paper to the value of its own bundle
             previous_attained_scores - (1d numpy array) maps each paper to the lowest affinity
                                         for any reviewer it has been assigned
 
         Returns:
             True if r can be assigned to p without violating WEF1, False otherwise.
         """
-        papers_to_check_against = set()
-        for rev in dict_alloc[p] + [r]:
-            papers_to_check_against |= set(
-                np.where(
-                    previous_attained_scores < self.affinity_matrix[rev, :]
-                )[0].tolist()
-            )
+        bundle_sum, bundle_max = bundle_values
+        affinities = self.affinity_matrix[r]
+        max_vals = np.maximum(bundle_max, affinities)
+        papers_to_check_against = max_vals > previous_attained_scores
+
+        # p_prime's value for p's bundle, if we add r and remove the max value, then divide by p_prime's demand
+        other = (
+            bundle_sum[papers_to_check_against]
+            + affinities[papers_to_check_against]
+            - max_vals[papers_to_check_against]
+        ) / self.demands[p]
+
+        # p_prime's value for own bundle, divided by p_prime's demand
+        curr = (
+            own_values[papers_to_check_against]
+            / self.demands[papers_to_check_against]
+        )
 
-        for p_prime in papers_to_check_against:
-            # p_prime's value for p's bundle, if we add r and remove the max value, then divide by p_prime's demand
-            p_alloc_r = dict_alloc[p] + [r]
-            p_alloc_r_affin = self.affinity_matrix[
-                p_alloc_r, [p_prime] * len(p_alloc_r)
-            ].tolist()
-            other = sum(p_alloc_r_affin)
-            max_val = max(p_alloc_r_affin)
-            other -= max_val
-            other /= self.demands[p]
-
-            # p_prime's value for own bundle, divided by p_prime's demand
-            p_prime_alloc = dict_alloc[p_prime]
-            p_prime_affin = self.affinity_matrix[
-                p_prime_alloc, [p_prime] * len(p_prime_alloc)
-            ].tolist()
-            curr = sum(p_prime_affin)
-            curr /= self.demands[p_prime]
-
-            # check wef1
-            if other > curr and not math.isclose(other, curr):
-                return False
+        # check wef1: other > curr, and they are not close as in math.isclose
+        return not np.any(
+            other - curr > 1e-09 * np.maximum(np.abs(other), np.abs(curr))
+        )
 
-        return True
+    def _bundle_values(self, p, dict_alloc):
+        """Get the value of the bundle of paper p to every paper, and the value
+        of the best reviewer in it.
+
+        A bundle holds at most the demand of its paper, so the values are
+        computed when a pick checks the bundle, in O(demand * papers), rather
+        than kept for every pair of papers.
+        """
+        bundle_sum = np.zeros(self.num_papers)
+        bundle_max = np.full(self.num_papers, -np.inf)
+        for r in dict_alloc[p]:
+            affinities = self.affinity_matrix[r]
+            bundle_sum += affinities
+            np.maximum(bundle_max, affinities, out=bundle_max)
+        return bundle_sum, bundle_max
+
+    def _own_values(self, dict_alloc):
+        """Get the value of each paper's bundle to the paper itself."""
+        own_values = np.zeros(self.num_papers)
+        for p, reviewers in dict_alloc.items():
+            for r in reviewers:
+                own_values[p] += self.affinity_matrix[r, p]
+        return own_values
 
     def _select_next_paper(
         self,
         matrix_alloc,
         dict_alloc,
+        own_values,
         best_revs_map,
         current_reviewer_maximums,
         previous_attained_scores,
@@ -222,7 +331,8 @@ class FairSequence(object):
         Args:
             matrix_alloc - (2d numpy array) the assignment of reviewers to papers
             dict_alloc - (dict) the current allocation, maps papers to lists of reviewers
-            best_revs_map - (dict) maps from papers to lists of reviewers in decreasing affinity order
+            own_values - (1d numpy array) maps each paper to the value of its own bundle
+            best_revs_map - (dict) maps from papers to queues of reviewers in decreasing affinity order
             current_reviewer_maximums - (1d numpy array) number of papers a reviewer can still be assigned
             previous_attained_scores - (1d numpy array) maps each paper to the lowest affinity
                                         for any reviewer it has been assigned
@@ -230,7 +340,8 @@ class FairSequence(object):
 
         Returns:
             The index of the next paper to assign a reviewer, the index of the reviewer,
-            and the updated map to the best remaining reviewers per paper.
+            the updated map to the best remaining reviewers per paper, and whether the WEF1
+            check ruled out any reviewer.
         """
         min_priority = paper_priorities[0][0]
         choice_set = paper_priorities.irange(
@@ -240,44 +351,62 @@ class FairSequence(object):
         next_paper = None
         next_rev = None
         next_mg = -10000
+        wef1_restricted = False
 
         for _, p in choice_set:
             removal_set = []
-            for r in best_revs_map[p]:
-                if (
-                    current_reviewer_maximums[r] <= 0
-                    or self.constraint_matrix[r, p] != 0
-                    or (
-                        math.isclose(self.affinity_matrix[r, p], 0)
-                        and not self.allow_zero_score_assignments
-                    )
-                ):
-                    removal_set.append(r)
-                elif matrix_alloc[r, p] > 0.5:
-                    # We don't want to remove this reviewer from consideration forever, but
-                    # we also cannot currently assign them again.
-                    pass
-                elif self.affinity_matrix[r, p] > next_mg:
-                    # This agent might be the greedy choice.
-                    # Check if this is a valid assignment, then make it the greedy choice if so.
-                    # If not a valid assignment, go to the next reviewer for this agent.
-                    if not self.safe_mode or self._is_valid_assignment(
-                        r, p, dict_alloc, previous_attained_scores
+            bundle_values = None
+            reviewers = best_revs_map[p]
+            scan = True
+            while scan:
+                scan = False
+                for r in reviewers:
+                    if (
+                        current_reviewer_maximums[r] <= 0
+                        or self.constraint_matrix[r, p] != 0
+                        or (
+                            math.isclose(self.affinity_matrix[r, p], 0)
+                            and not self.allow_zero_score_assignments
+                        )
                     ):
-                        next_paper = p
-                        next_rev = r
-                        next_mg = self.affinity_matrix[r, p]
+                        removal_set.append(r)
+                    elif matrix_alloc[r, p] > 0.5:
+                        # We don't want to remove this reviewer from consideration forever, but
+                        # we also cannot currently assign them again.
+                        pass
+                    elif self.affinity_matrix[r, p] > next_mg:
+                        # This agent might be the greedy choice.
+                        # Check if this is a valid assignment, then make it the greedy choice if so.
+                        # If not a valid assignment, go to the next reviewer for this agent.
+                        if self.safe_mode and bundle_values is None:
+                            bundle_values = self._bundle_values(p, dict_alloc)
+                        if not self.safe_mode or self._is_valid_assignment(
+                            r,
+                            p,
+                            bundle_values,
+                            own_values,
+                            previous_attained_scores,
+                        ):
+                            next_paper = p
+                            next_rev = r
+                            next_mg = self.affinity_matrix[r, p]
+                            break
+                        wef1_restricted = True
+                    else:
+                        # This agent cannot be the greedy choice
                         break
                 else:
-                    # This agent cannot be the greedy choice
-                    break
+                    # We went through all the sorted reviewers without a choice, so sort
+                    # more of them and go through the queue again.
+                    reviewers.remove(removal_set)
+                    removal_set = []
+                    scan = reviewers.sort_chunk()
 
-            for r in removal_set:
-                best_revs_map[p].remove(r)
+            reviewers.remove(removal_set)
 
             if next_mg == self.max_affinity:
-                return next_paper, next_rev, best_revs_map
-        return next_paper, next_rev, best_revs_map
+                return next_paper, next_rev, best_revs_map, wef1_restricted
+        return next_paper, next_rev, best_revs_map, wef1_restricted
 
     def _find_trade(
         self, matrix_alloc, current_reviewer_maximums, paper_priorities
@@ -301,9 +430,33 @@ class FairSequence(object):
             minimum=(min_priority, -1), maximum=(min_priority, self.num_papers)
         )
         choice_set = [p[1] for p in choice_set]
-        available_reviewers = np.where(current_reviewer_maximums > 0)[
-            0
-        ].tolist()
+        available_reviewers = np.where(current_reviewer_maximums > 0)[0]
+
+        # Index the assigned reviewer-paper pairs by reviewer, leaving out the papers
+        # in the choice_set: we can't make progress by swapping with one of them.
+        tradable_alloc = matrix_alloc.copy()
+        tradable_alloc[:, choice_set] = 0
+        pair_revs, pair_paps = np.nonzero(tradable_alloc)
+
+        # The best available reviewer that can be assigned to each paper, found as needed.
+        best_available = {}
+
+        def best_available_reviewer(p_prime):
+            if p_prime not in best_available:
+                affinities = self.affinity_matrix[available_reviewers, p_prime]
+                eligible = ~matrix_alloc[available_reviewers, p_prime] & (
+                    self.constraint_matrix[available_reviewers, p_prime] == 0
+                )
+                if not self.allow_zero_score_assignments:
+                    eligible &= affinities != 0
+                best_available[p_prime] = (
+                    available_reviewers[eligible][
+                        np.argmax(affinities[eligible])
+                    ]
+                    if np.any(eligible)
+                    else None
+                )
+            return best_available[p_prime]
 
         generated_paths = [[(-1, p)] for p in choice_set]
         visited_nodes = set()
@@ -314,7 +467,7 @@ class FairSequence(object):
             "#info FairSequence:Looking for a sequence of papers which can swap an assigned reviewer "
             + "for an available reviewer. "
             + "Available reviewers: %s, Papers who can be assigned to: %s"
-            % (available_reviewers, choice_set)
+            % (available_reviewers.tolist(), choice_set)
         )
 
         curr_depth = 1
@@ -337,89 +490,60 @@ class FairSequence(object):
                 )
 
                 # Generete reviewer-paper pairs (r_prime, p_prime) where paper p can exchange r for r_prime.
-                reviewer_paper_pairs = matrix_alloc.copy()
-
-                # Can't make progress if we just swap with another paper in the choice_set
-                reviewer_paper_pairs[:, choice_set] = 0
-
                 # Can't swap out for a reviewer that we can't assign to p
-                reviewer_paper_pairs[
-                    self.constraint_matrix[:, p].astype(dtype=bool), :
-                ] = 0
+                can_swap = self.constraint_matrix[:, p] == 0
                 if not self.allow_zero_score_assignments:
-                    reviewer_paper_pairs[
-                        np.isclose(self.affinity_matrix[:, p], 0), :
-                    ] = 0
+                    can_swap &= ~np.isclose(self.affinity_matrix[:, p], 0)
 
                 # Can't swap out for a reviewer that p has already been assigned
-                p_revs = np.where(matrix_alloc[:, p])[0].tolist()
+                can_swap &= ~matrix_alloc[:, p]
                 # Also can't swap out for reviewers that p will be assigned through swaps
                 for pair_idx in range(len(path) - 1):
                     if path[pair_idx][1] == p:
-                        p_revs.add(path[pair_idx + 1][0])
-                reviewer_paper_pairs[p_revs, :] = 0
+                        can_swap[path[pair_idx + 1][0]] = False
 
                 # Collect the reviewer-paper pairs in decreasing order of utility to p
-                pairs_list = np.where(reviewer_paper_pairs)
-                pairs_list = zip(pairs_list[0], pairs_list[1])
-                sorted_pairs = []
-                for pair in pairs_list:
-                    sorted_pairs.append(
-                        (pair, self.affinity_matrix[pair[0], p])
+                pairs = np.flatnonzero(can_swap[pair_revs])
+                pairs = pairs[
+                    np.argsort(
+                        -self.affinity_matrix[pair_revs[pairs], p],
+                        kind="stable",
                     )
-                sorted_pairs = sorted(sorted_pairs, key=lambda x: -x[1])
+                ]
 
                 self.logger.debug(
-                    "#info FairSequence:List of reviewer-paper pairs we might add to path: %s. Time elapsed: %s s"
-                    % (sorted_pairs, time.time() - st)
+                    "#info FairSequence:Found %d reviewer-paper pairs we might add to path. Time elapsed: %s s"
+                    % (len(pairs), time.time() - st)
                 )
 
                 # For each pair (r_prime, p_prime), figure out if p_prime can take a new reviewer
                 # and end the trading sequence.
-                for (r_prime, p_prime), _ in sorted_pairs:
+                for r_prime, p_prime in zip(
+                    pair_revs[pairs].tolist(), pair_paps[pairs].tolist()
+                ):
                     if (r_prime, p_prime) not in visited_nodes:
                         visited_nodes.add((r_prime, p_prime))
                         new_paths.append(path + [(r_prime, p_prime)])
 
                         # Making greedy swaps helps maintain welfare of the solution
-                        sorted_available_revs = sorted(
-                            available_reviewers,
-                            key=lambda x: -self.affinity_matrix[x, p_prime],
-                        )
-                        for available_reviewer in sorted_available_revs:
-                            if (
-                                (
-                                    self.allow_zero_score_assignments
-                                    or not math.isclose(
-                                        self.affinity_matrix[
-                                            available_reviewer, p_prime
-                                        ],
-                                        0,
-                                    )
+                        available_reviewer = best_available_reviewer(p_prime)
+                        if available_reviewer is not None:
+                            # We found our trade
+                            self.logger.debug(
+                                "#info FairSequence:Trading sequence found: %s. Search completed in %s s"
+                                % (
+                                    path
+                                    + [
+                                        (r_prime, p_prime),
+                                        (available_reviewer, -1),
+                                    ],
+                                    time.time() - st,
                                 )
-                                and matrix_alloc[available_reviewer, p_prime]
-                                < 0.5
-                                and self.constraint_matrix[
-                                    available_reviewer, p_prime
-                                ]
-                                == 0
-                            ):
-                                # We found our trade
-                                self.logger.debug(
-                                    "#info FairSequence:Trading sequence found: %s. Search completed in %s s"
-                                    % (
-                                        path
-                                        + [
-                                            (r_prime, p_prime),
-                                            (available_reviewer, -1),
-                                        ],
-                                        time.time() - st,
-                                    )
-                                )
-                                return path + [
-                                    (r_prime, p_prime),
-                                    (available_reviewer, -1),
-                                ]
+                            )
+                            return path + [
+                                (r_prime, p_prime),
+                                (available_reviewer, -1),
+                            ]
             curr_depth += 1
             generated_paths = new_paths
             if len(visited_nodes) == num_visited:
@@ -429,35 +553,63 @@ class FairSequence(object):
             "Could not find an existing reviewer-paper pair to trade with."
         )
 
-    def greedy_wef1(self):
+    def greedy_wef1(self, checkpoint=None):
         """Compute a WEF1 assignment via a picking sequence.
 
+        In safe mode, the state of the picking sequence is saved to self.checkpoint
+        at the first pick for which the WEF1 check ruled out a reviewer (or at which
+        the sequence fails). All the picks before it are the same with safe mode off,
+        so a picking sequence with safe mode off can resume from there.
+
         Args:
-            None
+            checkpoint - (dict) the state of a picking sequence to resume from
 
         Returns:
             A 2d numpy array with a WEF1 partial allocation to the papers.
             The array has the same shape as self.affinity_matrix, with a 1 in the i, j
             entry when reviewer i is assigned to paper j (and 0 otherwise).
         """
-        matrix_alloc = np.zeros(self.affinity_matrix.shape, dtype=bool)
-        dict_alloc = {p: list() for p in range(self.num_papers)}
-        maximums_copy = self.maximums.copy()
+        if checkpoint is None:
+            matrix_alloc = np.zeros(self.affinity_matrix.shape, dtype=bool)
+            dict_alloc = {p: list() for p in range(self.num_papers)}
+            maximums_copy = self.maximums.copy()
 
-        best_revs_map = {}
-        for p in range(self.num_papers):
-            best_revs_map[p] = self.best_revs[:, p].tolist()
+            best_revs_map = {}
+            for p in range(self.num_papers):
+                best_revs_map[p] = _ReviewerQueue(self.affinity_matrix[:, p])
 
-        previous_attained_scores = np.ones(self.num_papers) * 1000
+            previous_attained_scores = np.ones(self.num_papers) * 1000
 
-        paper_priorities = SortedList(
-            [(0.0, p) for p in range(self.num_papers)]
-        )
+            paper_priorities = SortedList(
+                [(0.0, p) for p in range(self.num_papers)]
+            )
+
+            remaining_demand = np.sum(self.demands)
+            required_for_min = np.copy(self.minimums)
+            demand_required_for_min = np.sum(required_for_min)
+            been_restricted = False
+        else:
+            matrix_alloc = checkpoint["matrix_alloc"]
+            dict_alloc = checkpoint["dict_alloc"]
+            maximums_copy = checkpoint["maximums_copy"]
+            best_revs_map = checkpoint["best_revs_map"]
+            previous_attained_scores = checkpoint["previous_attained_scores"]
+            paper_priorities = checkpoint["paper_priorities"]
+            remaining_demand = checkpoint["remaining_demand"]
+            required_for_min = checkpoint["required_for_min"]
+            demand_required_for_min = checkpoint["demand_required_for_min"]
+            been_restricted = checkpoint["been_restricted"]
+            self.logger.debug(
+                "#info FairSequence:resuming the picking sequence after %d picks"
+                % (np.sum(self.demands) - remaining_demand)
+            )
 
-        remaining_demand = np.sum(self.demands)
-        required_for_min = np.copy(self.minimums)
-        demand_required_for_min = np.sum(required_for_min)
-        been_restricted = False
+        # the value of each paper's own bundle, kept up to date for the WEF1
+        # checks in safe mode.
+        own_values = None
+        if self.safe_mode:
+            own_values = self._own_values(dict_alloc)
+            self.checkpoint = None
 
         self.logger.debug(
             "#info FairSequence:total paper demand is %d" % remaining_demand
@@ -475,18 +627,52 @@ class FairSequence(object):
                     % (time.time() - start)
                 )
 
-            next_paper, next_rev, best_revs_map = self._select_next_paper(
+            (
+                next_paper,
+                next_rev,
+                best_revs_map,
+                wef1_restricted,
+            ) = self._select_next_paper(
                 matrix_alloc,
                 dict_alloc,
+                own_values,
                 best_revs_map,
                 maximums_copy,
                 previous_attained_scores,
                 paper_priorities,
             )
 
+            if (
+                self.safe_mode
+                and self.checkpoint is None
+                and (wef1_restricted or next_paper is None)
+            ):
+                # The reviewers that the selection removed from the queues can never
+                # be assigned to those papers, so the queues can be saved as they are.
+                self.checkpoint = {
+                    "matrix_alloc": matrix_alloc.copy(),
+                    "dict_alloc": {
+                        p: list(revs) for p, revs in dict_alloc.items()
+                    },
+                    "maximums_copy": maximums_copy.copy(),
+                    "best_revs_map": {
+                        p: copy.copy(revs) for p, revs in best_revs_map.items()
+                    },
+                    "previous_attained_scores": previous_attained_scores.copy(),
+                    "paper_priorities": paper_priorities.copy(),
+                    "remaining_demand": remaining_demand,
+                    "required_for_min": required_for_min.copy(),
+                    "demand_required_for_min": demand_required_for_min,
+                    "been_restricted": been_restricted,
+                }
+
             if next_paper is not None:
                 matrix_alloc[next_rev, next_paper] = 1
                 dict_alloc[next_paper].append(next_rev)
+                if self.safe_mode:
+                    own_values[next_paper] += self.affinity_matrix[
+                        next_rev, next_paper
+                    ]
                 previous_attained_scores[next_paper] = min(
                     self.affinity_matrix[next_rev, next_paper],
                     previous_attained_scores[next_paper],
@@ -595,7 +781,6 @@ class FairSequence(object):
             self.demands = self.demands[proper_papers]
             self.constraint_matrix = self.constraint_matrix[:, proper_papers]
             self.affinity_matrix = self.affinity_matrix[:, proper_papers]
-            self.best_revs = self.best_revs[:, proper_papers]
             self.num_papers = proper_papers.size
 
         try:
@@ -614,7 +799,7 @@ class FairSequence(object):
 
             try:
                 start = time.time()
-                self.solution = self.greedy_wef1()
+                self.solution = self.greedy_wef1(self.checkpoint)
                 self.logger.debug(
                     "#info FairSequence:greedy_wef1 (safe_mode off) took %s s"
                     % (time.time() - start)
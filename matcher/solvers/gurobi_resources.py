@@ -0,0 +1,85 @@
+"""
+Thread, memory, method and time limit settings for the Gurobi-backed solvers.
+
+Gurobi uses every core of the host by default, so several matching workers
+sharing one machine oversubscribe its CPUs. The effective settings of a run are
+taken, in order, from the matcher configuration, the worker's environment and
+defaults derived from the host: the available CPUs (and memory) are split
+evenly between the concurrent workers.
+"""
+
+import os
+import psutil
+
+# Environment variables that set the defaults of a worker host.
+ENV_VARS = {
+    "threads": "MATCHER_GUROBI_THREADS",
+    "memory_limit": "MATCHER_GUROBI_MEMORY_LIMIT",
+    "method": "MATCHER_GUROBI_METHOD",
+    "time_limit": "MATCHER_GUROBI_TIME_LIMIT",
+    "concurrent_workers": "MATCHER_CONCURRENT_WORKERS",
+}
+
+# The Gurobi parameter of each setting, memory limits are in GB and time
+# limits in seconds.
+GUROBI_PARAMS = {
+    "threads": "Threads",
+    "memory_limit": "MemLimit",
+    "method": "Method",
+    "time_limit": "TimeLimit",
+}
+
+_TYPES = {
+    "threads": int,
+    "memory_limit": float,
+    "method": int,
+    "time_limit": float,
+    "concurrent_workers": int,
+}
+
+
+def available_cpus():
+    """Number of CPUs this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_resources(resources=None):
+    """Resolve the effective resource settings of a solver run.
+
+    Args:
+        resources - a dict with any of the keys threads, memory_limit, method,
+            time_limit and concurrent_workers. Missing or None values are read
+            from the MATCHER_* environment variables in ENV_VARS, and derived
+            from the host if those are not set either.
+
+    Returns:
+        A dict with every setting of ENV_VARS plus the available cpus. The
+        method, time_limit and memory_limit are None when Gurobi's default
+        should be kept.
+    """
+    settings = {}
+    for name, env_var in ENV_VARS.items():
+        value = (resources or {}).get(name)
+        if value is None or value == "":
+            value = os.environ.get(env_var) or None
+        settings[name] = None if value is None else _TYPES[name](value)
+
+    settings["cpus"] = available_cpus()
+    workers = max(1, settings["concurrent_workers"] or 1)
+    settings["concurrent_workers"] = workers
+    if settings["threads"] is None:
+        settings["threads"] = max(1, settings["cpus"] // workers)
+    if settings["memory_limit"] is None and workers > 1:
+        total = psutil.virtual_memory().total / 1e9
+        settings["memory_limit"] = round(total / workers, 2)
+
+    return settings
+
+
+def set_gurobi_params(model, resources):
+    """Set the Gurobi parameters of the resolved resources on a model."""
+    for name, param in GUROBI_PARAMS.items():
+        if resources.get(name) is not None:
+            model.setParam(param, resources[name])
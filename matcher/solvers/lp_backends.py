@@ -0,0 +1,294 @@
+"""
+LP backends for the relaxations solved by FairIR.
+
+FairIR maximizes a linear objective over one vector of variables in [0, 1]
+subject to blocks of sparse linear constraints, and between solves it only
+fixes variables and changes right hand sides. Both backends keep their model
+and re-solve it from the previous basis. GurobiLP imports gurobipy when it is
+created, HighsLP needs no license: it uses the highspy bindings of HiGHS, or
+the copy of them that ships with SciPy, imported when it is created.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from .core import SolverException
+from .gurobi_resources import set_gurobi_params
+
+# Constraint senses, the same characters as Gurobi's.
+LESS_EQUAL = "<"
+GREATER_EQUAL = ">"
+EQUAL = "="
+
+# Solve statuses.
+OPTIMAL = "optimal"
+SUBOPTIMAL = "suboptimal"
+INFEASIBLE = "infeasible"
+TIME_LIMIT = "time_limit"
+
+
+class GurobiLP:
+    """An LP relaxation kept in a Gurobi model."""
+
+    def __init__(self, name, resources):
+        import gurobipy
+
+        self.grb = gurobipy.GRB
+        self.model = gurobipy.Model(name)
+        self.model.setParam("OutputFlag", 0)
+        set_gurobi_params(self.model, resources)
+        self.x = None
+        self.constraints = []
+
+    @property
+    def num_variables(self):
+        self.model.update()
+        return self.model.NumVars
+
+    @property
+    def num_constraints(self):
+        self.model.update()
+        return self.model.NumConstrs
+
+    def add_variables(self, objective, names):
+        """Add one variable in [0, 1] per objective coefficient."""
+        self.x = self.model.addMVar(len(objective), ub=1.0, name=list(names))
+        self.model.update()
+        self.model.setObjective(objective @ self.x, self.grb.MAXIMIZE)
+
+    def add_constraints(self, matrix, senses, rhs, names):
+        """Add the rows matrix @ x (senses) rhs and return their indices."""
+        constraints = self.model.addMConstr(
+            matrix, self.x, senses, rhs, name=names
+        )
+        start = len(self.constraints)
+        self.constraints.extend(constraints.tolist())
+        return np.arange(start, len(self.constraints))
+
+    def fix_variables(self, idx, value):
+        self.x[idx].ub = value
+        self.x[idx].lb = value
+
+    def get_bounds(self, idx):
+        self.model.update()
+        return self.x[idx].lb, self.x[idx].ub
+
+    def set_rhs(self, rows, rhs):
+        """Set the right hand sides of rows, +-inf drops a row."""
+        rhs = np.clip(
+            np.broadcast_to(rhs, len(rows)),
+            -self.grb.INFINITY,
+            self.grb.INFINITY,
+        )
+        self.model.setAttr(
+            "RHS", [self.constraints[row] for row in rows], rhs.tolist()
+        )
+
+    def get_rhs(self, rows):
+        self.model.update()
+        rhs = self.model.getAttr(
+            "RHS", [self.constraints[row] for row in rows]
+        )
+        rhs = np.array(rhs)
+        rhs[np.abs(rhs) >= self.grb.INFINITY] *= np.inf
+        return rhs
+
+    def solve(self):
+        self.model.optimize()
+        return {
+            self.grb.OPTIMAL: OPTIMAL,
+            self.grb.SUBOPTIMAL: SUBOPTIMAL,
+            self.grb.INFEASIBLE: INFEASIBLE,
+            self.grb.TIME_LIMIT: TIME_LIMIT,
+        }.get(self.model.status, str(self.model.status))
+
+    def values(self):
+        return self.x.X
+
+    def write_infeasibility(self, path):
+        """Write the irreducible infeasible subsystem to path."""
+        self.model.computeIIS()
+        self.model.write(path)
+        return path
+
+
+def _import_highs():
+    """Import the HiGHS bindings of highspy, or the copy of them that ships
+    with SciPy (1.15 and later)."""
+    try:
+        from highspy import _core
+    except ImportError:
+        try:
+            from scipy.optimize._highspy import _core
+        except ImportError:
+            raise SolverException(
+                "The highs LP backend needs highspy, or SciPy 1.15 or later"
+            )
+    return _core
+
+
+class HighsLP:
+    """An LP relaxation kept in a persistent HiGHS model.
+
+    The constraints are collected as sparse blocks and passed to HiGHS at the
+    first solve. After that, fixed variables and changed right hand sides are
+    updated in place, so every solve restarts from the basis of the previous
+    one. The dual simplex (or interior point followed by crossover, for method
+    2) returns a vertex of the relaxation, which FairIR's rounding relies on.
+    """
+
+    # HiGHS's default primal feasibility tolerance, values within it of 0 or 1
+    # are reported as integral
+    integrality_tolerance = 1e-7
+
+    def __init__(self, name, resources):
+        self.name = name
+        self.core = _import_highs()
+        self.highs = self.core._Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.setOptionValue(
+            "solver", "ipm" if resources.get("method") == 2 else "simplex"
+        )
+        self.time_limit = resources.get("time_limit")
+        self.objective = np.zeros(0)
+        self.lb, self.ub = np.zeros(0), np.zeros(0)
+        self.blocks = []
+        self.row_lb, self.row_ub = np.zeros(0), np.zeros(0)
+        self.senses = np.zeros(0, dtype="U1")
+        self.passed = False
+        self.x = None
+
+    @property
+    def num_variables(self):
+        return len(self.objective)
+
+    @property
+    def num_constraints(self):
+        return len(self.senses)
+
+    def add_variables(self, objective, names):
+        """Add one variable in [0, 1] per objective coefficient."""
+        self.objective = np.asarray(objective, dtype=float)
+        self.lb = np.zeros(len(self.objective))
+        self.ub = np.ones(len(self.objective))
+
+    def add_constraints(self, matrix, senses, rhs, names):
+        """Add the rows matrix @ x (senses) rhs and return their indices."""
+        if self.passed:
+            raise ValueError("Constraints must be added before solving")
+        start = self.num_constraints
+        rhs = np.asarray(rhs, dtype=float)
+        senses = np.broadcast_to(senses, len(rhs))
+        self.blocks.append(sparse.csr_matrix(matrix))
+        self.senses = np.concatenate([self.senses, senses])
+        self.row_lb = np.concatenate([self.row_lb, np.full(len(rhs), -np.inf)])
+        self.row_ub = np.concatenate([self.row_ub, np.full(len(rhs), np.inf)])
+        rows = np.arange(start, self.num_constraints)
+        self._set_row_bounds(rows, rhs)
+        return rows
+
+    def _set_row_bounds(self, rows, rhs):
+        """Store the row bounds of right hand sides rhs, return the rows whose
+        bounds changed."""
+        senses = self.senses[rows]
+        lower = np.where(senses == LESS_EQUAL, -np.inf, rhs)
+        upper = np.where(senses == GREATER_EQUAL, np.inf, rhs)
+        changed = (self.row_lb[rows] != lower) | (self.row_ub[rows] != upper)
+        self.row_lb[rows] = lower
+        self.row_ub[rows] = upper
+        return rows[changed]
+
+    def fix_variables(self, idx, value):
+        idx = np.atleast_1d(idx).astype(np.int32)
+        self.lb[idx] = value
+        self.ub[idx] = value
+        if self.passed and len(idx):
+            self.highs.changeColsBounds(
+                len(idx), idx, self.lb[idx], self.ub[idx]
+            )
+
+    def get_bounds(self, idx):
+        return self.lb[idx], self.ub[idx]
+
+    def set_rhs(self, rows, rhs):
+        """Set the right hand sides of rows, +-inf drops a row."""
+        rows = np.asarray(rows)
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), len(rows))
+        changed = self._set_row_bounds(rows, rhs)
+        if self.passed:
+            for row in changed.tolist():
+                self.highs.changeRowBounds(
+                    row, self.row_lb[row], self.row_ub[row]
+                )
+
+    def get_rhs(self, rows):
+        senses = self.senses[rows]
+        return np.where(
+            senses == GREATER_EQUAL, self.row_lb[rows], self.row_ub[rows]
+        )
+
+    def _pass_model(self):
+        """Pass the model to HiGHS, maximizing the objective."""
+        highs_core = self.core
+        matrix = (
+            sparse.vstack(self.blocks, format="csr", dtype=float)
+            if self.blocks
+            else sparse.csr_matrix((0, self.num_variables))
+        )
+        lp = highs_core.HighsLp()
+        lp.num_col_ = self.num_variables
+        lp.num_row_ = self.num_constraints
+        lp.sense_ = highs_core.ObjSense.kMaximize
+        lp.col_cost_ = self.objective
+        lp.col_lower_ = self.lb
+        lp.col_upper_ = self.ub
+        lp.row_lower_ = self.row_lb
+        lp.row_upper_ = self.row_ub
+        lp.a_matrix_.format_ = highs_core.MatrixFormat.kRowwise
+        lp.a_matrix_.start_ = matrix.indptr
+        lp.a_matrix_.index_ = matrix.indices
+        lp.a_matrix_.value_ = matrix.data
+        self.highs.passModel(lp)
+        self.blocks = []
+        self.passed = True
+
+    def solve(self):
+        if not self.passed:
+            self._pass_model()
+        if self.time_limit is not None:
+            # the time limit of HiGHS applies to all runs of the model
+            self.highs.setOptionValue(
+                "time_limit", self.time_limit + self.highs.getRunTime()
+            )
+        self.highs.run()
+
+        highs_core = self.core
+        status = self.highs.getModelStatus()
+        self.x = None
+        if status == highs_core.HighsModelStatus.kOptimal:
+            x = np.array(self.highs.getSolution().col_value)
+            x[np.abs(x) <= self.integrality_tolerance] = 0.0
+            x[np.abs(x - 1) <= self.integrality_tolerance] = 1.0
+            self.x = x
+            return OPTIMAL
+        if status in (
+            highs_core.HighsModelStatus.kInfeasible,
+            highs_core.HighsModelStatus.kUnboundedOrInfeasible,
+        ):
+            return INFEASIBLE
+        if status == highs_core.HighsModelStatus.kTimeLimit:
+            return TIME_LIMIT
+        return self.highs.modelStatusToString(status)
+
+    def values(self):
+        return self.x
+
+    def write_infeasibility(self, path):
+        """The HiGHS bindings do not write infeasible subsystems."""
+        return None
+
+
+LP_BACKENDS = {
+    "gurobi": GurobiLP,
+    "highs": HighsLP,
+}
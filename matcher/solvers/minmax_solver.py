@@ -12,11 +12,39 @@ except that the "num_reviews" argument is replaced by "minimums" and "maximums".
         integer representing the minimum/maximum number of reviews a reviewer
         should be assigned.
 
+If "single_flow" is True, the minimums are instead encoded as lower bounds in
+a single SimpleSolver graph, so that the graph is only built and solved once.
+The solution satisfies the same minimum, maximum and demand constraints as the
+two iterations, and its cost is never higher, because the minimum loads are no
+longer assigned greedily before the rest.
+
+If "decompose" is True, the reviewer-paper pairs that can be assigned are
+split into connected components first (see decomposition.py), and each
+component is solved by its own MinMaxSolver, in a pool of "processes" worker
+processes (defaults to the number of CPUs).
+
+If "candidate_limit" is an integer k, each SimpleSolver graph only starts with
+the arcs of every reviewer's and paper's k lowest cost pairs, and adds excluded
+arcs until the solution is certified optimal for the full graph (see
+simple_solver.py). The result has the same cost, with a much smaller graph.
+
+If the encoder was built in sparse mode, the sparse cost and constraint
+matrices are passed to SimpleSolver directly, and the resulting flow matrix is
+a scipy.sparse matrix.
+
 """
 import numpy as np
 import logging
+from scipy import sparse
 from .simple_solver import SimpleSolver
 from .core import SolverException
+from .decomposition import (
+    ComponentEncoder,
+    find_components,
+    solve_components,
+    submatrix,
+)
+from ..encoder import DefaultSparseMatrix
 import time
 
 
@@ -32,33 +60,69 @@ class MinMaxSolver:
         allow_zero_score_assignments=False,
         logger=logging.getLogger(__name__),
         limit_matrix=None,
+        single_flow=False,
+        decompose=False,
+        processes=None,
+        candidate_limit=None,
     ):
 
         self.minimums = minimums
         self.maximums = maximums
         self.demands = demands
-        self.cost_matrix = encoder.cost_matrix
         self.allow_zero_score_assignments = allow_zero_score_assignments
+        self.single_flow = single_flow
+        self.decompose = decompose
+        self.processes = processes
+        self.candidate_limit = candidate_limit
+
+        # the sparse matrices can only be used when pairs without a stored
+        # cost have a cost of 0, so that SimpleSolver never adds their arcs
+        sparse_cost_matrix = getattr(encoder, "sparse_cost_matrix", None)
+        self.sparse = (
+            getattr(encoder, "sparse", False)
+            and not self.allow_zero_score_assignments
+            and sparse_cost_matrix.default == 0
+            and sparse_cost_matrix.any()
+        )
+
+        if self.sparse:
+            self.cost_matrix = sparse_cost_matrix
+            self.constraint_matrix = encoder.sparse_constraint_matrix
+        else:
+            self.cost_matrix = encoder.cost_matrix
+            if not self.cost_matrix.any():
+                self.cost_matrix = np.random.rand(*encoder.cost_matrix.shape)
+            self.constraint_matrix = encoder.constraint_matrix
+
         if limit_matrix is None:
-            self.limit_matrix = np.ones(
-                np.shape(self.cost_matrix), dtype=np.int64
-            )
+            if self.sparse:
+                self.limit_matrix = DefaultSparseMatrix(
+                    sparse.csr_matrix(
+                        np.shape(self.cost_matrix), dtype=np.int64
+                    ),
+                    default=1,
+                )
+            else:
+                self.limit_matrix = np.ones(
+                    np.shape(self.cost_matrix), dtype=np.int64
+                )
+        elif isinstance(limit_matrix, DefaultSparseMatrix) and not self.sparse:
+            self.limit_matrix = limit_matrix.toarray()
         else:
             self.limit_matrix = limit_matrix
 
-        if not self.cost_matrix.any():
-            self.cost_matrix = np.random.rand(*encoder.cost_matrix.shape)
-
-        self.constraint_matrix = encoder.constraint_matrix
-
         if not self.allow_zero_score_assignments:
             # Find reviewers with no known cost edges (non-zero) after constraints are applied and remove their load_lb
-            bad_affinity_reviewers = np.where(
-                np.all(
-                    (self.cost_matrix * (self.constraint_matrix == 0)) == 0,
-                    axis=0,
-                )
-            )[0]
+            if self.sparse:
+                bad_affinity_reviewers = self._sparse_bad_affinity_reviewers()
+            else:
+                bad_affinity_reviewers = np.where(
+                    np.all(
+                        (self.cost_matrix * (self.constraint_matrix == 0))
+                        == 0,
+                        axis=0,
+                    )
+                )[0]
             logging.debug(
                 "Setting minimum load for {} reviewers to 0 because "
                 "they do not have known affinity with any paper".format(
@@ -74,6 +138,21 @@ class MinMaxSolver:
         self.cost = None
         self.logger = logger
 
+    def _sparse_bad_affinity_reviewers(self):
+        """
+        Sparse counterpart of the dense bad affinity check: reviewers without
+        a non-zero, unconstrained cost for any paper.
+        """
+        paper_indices, reviewer_indices, costs = self.cost_matrix.entries()
+        unconstrained = (
+            self.constraint_matrix.values_at(paper_indices, reviewer_indices)
+            == 0
+        )
+        known_reviewers = reviewer_indices[(costs != 0) & unconstrained]
+        return np.setdiff1d(
+            np.arange(np.size(self.cost_matrix, axis=1)), known_reviewers
+        )
+
     def _validate_input_range(self):
         """Validate if demand is in the range of min supply and max supply"""
         self.logger.debug("Checking if demand is in range")
@@ -101,6 +180,20 @@ class MinMaxSolver:
         """Computes combined solution of two SimpleSolvers"""
         self._validate_input_range()
 
+        if self.decompose:
+            components = find_components(
+                self.cost_matrix,
+                self.constraint_matrix,
+                self.demands,
+                self.minimums,
+                self.allow_zero_score_assignments,
+            )
+            if components is not None:
+                return self._solve_components(components)
+
+        if self.single_flow:
+            return self._solve_single_flow()
+
         start_time = time.time()
         self.logger.debug("Min Solver started at={}".format(start_time))
         minimum_solver = SimpleSolver(
@@ -112,6 +205,7 @@ class MinMaxSolver:
             logger=self.logger,
             strict=False,
             limit_matrix=self.limit_matrix,
+            candidate_limit=self.candidate_limit,
         )  # strict=False prevents errors from being thrown for supply/demand mismatch
         minimum_result = minimum_solver.solve()
         stop_time = time.time()
@@ -122,12 +216,21 @@ class MinMaxSolver:
         )
 
         adjusted_constraints = self.constraint_matrix
-        adjusted_limits = self.limit_matrix - minimum_solver.flow_matrix
-        adjusted_maximums = self.maximums - np.sum(
-            minimum_solver.flow_matrix, axis=0
+        minimum_flows = minimum_solver.flow_matrix
+        if isinstance(self.limit_matrix, DefaultSparseMatrix):
+            adjusted_limits = DefaultSparseMatrix(
+                self.limit_matrix.offsets - minimum_flows,
+                self.limit_matrix.default,
+            )
+        elif sparse.issparse(minimum_flows):
+            adjusted_limits = self.limit_matrix - minimum_flows.toarray()
+        else:
+            adjusted_limits = self.limit_matrix - minimum_flows
+        adjusted_maximums = (
+            self.maximums - np.asarray(minimum_flows.sum(axis=0)).ravel()
         )
-        adjusted_demands = self.demands - np.sum(
-            minimum_solver.flow_matrix, axis=1
+        adjusted_demands = (
+            self.demands - np.asarray(minimum_flows.sum(axis=1)).ravel()
         )
 
         start_time = time.time()
@@ -140,6 +243,7 @@ class MinMaxSolver:
             allow_zero_score_assignments=self.allow_zero_score_assignments,
             logger=self.logger,
             limit_matrix=adjusted_limits,
+            candidate_limit=self.candidate_limit,
         )
 
         maximum_result = maximum_solver.solve()
@@ -158,6 +262,134 @@ class MinMaxSolver:
         )
 
         self.flow_matrix = minimum_result + maximum_result
-        self.cost = np.sum(self.flow_matrix * self.cost_matrix)
+        self.cost = self._flow_cost()
 
         return self.flow_matrix
+
+    def _solve_single_flow(self):
+        """Computes the solution of one SimpleSolver with reviewer minimums"""
+        start_time = time.time()
+        self.logger.debug(
+            "Single flow Solver started at={}".format(start_time)
+        )
+        solver = SimpleSolver(
+            self.maximums,
+            self.demands,
+            self.cost_matrix,
+            self.constraint_matrix,
+            allow_zero_score_assignments=self.allow_zero_score_assignments,
+            logger=self.logger,
+            limit_matrix=self.limit_matrix,
+            minimums=self.minimums,
+            candidate_limit=self.candidate_limit,
+        )
+        self.flow_matrix = solver.solve()
+        stop_time = time.time()
+        self.logger.debug(
+            "Single flow Solver finished at {} and took {} seconds".format(
+                stop_time, stop_time - start_time
+            )
+        )
+
+        self.solved = solver.solved
+        self.optimal_cost = solver.min_cost_flow.optimal_cost()
+        self.cost = self._flow_cost()
+
+        return self.flow_matrix
+
+    def _solve_components(self, components):
+        """Computes the solutions of a MinMaxSolver per connected component"""
+        start_time = time.time()
+        self.logger.debug(
+            "Solving {} components separately".format(len(components))
+        )
+        minimums = np.asarray(self.minimums)
+        maximums = np.asarray(self.maximums)
+        demands = np.asarray(self.demands)
+
+        component_arguments = []
+        for papers, reviewers in components:
+            cost_matrix = submatrix(self.cost_matrix, papers, reviewers)
+            constraint_matrix = submatrix(
+                self.constraint_matrix, papers, reviewers
+            )
+            if not self.sparse:
+                encoder = ComponentEncoder(cost_matrix, constraint_matrix)
+            elif cost_matrix.any():
+                encoder = ComponentEncoder(
+                    sparse=True,
+                    sparse_cost_matrix=cost_matrix,
+                    sparse_constraint_matrix=constraint_matrix,
+                )
+            else:
+                # only forced assignments, which need the dense matrices
+                encoder = ComponentEncoder(
+                    cost_matrix.toarray(), constraint_matrix.toarray()
+                )
+            component_arguments.append(
+                (
+                    (
+                        minimums[reviewers].tolist(),
+                        maximums[reviewers].tolist(),
+                        demands[papers].tolist(),
+                        encoder,
+                    ),
+                    dict(
+                        allow_zero_score_assignments=self.allow_zero_score_assignments,
+                        logger=self.logger,
+                        limit_matrix=submatrix(
+                            self.limit_matrix, papers, reviewers
+                        ),
+                        single_flow=self.single_flow,
+                        candidate_limit=self.candidate_limit,
+                    ),
+                )
+            )
+
+        results = solve_components(
+            MinMaxSolver,
+            component_arguments,
+            attributes=["solved", "optimal_cost"],
+            processes=self.processes,
+        )
+
+        shape = np.shape(self.cost_matrix)
+        if self.sparse:
+            rows, cols, data = [], [], []
+            for (papers, reviewers), (flows, _) in zip(components, results):
+                flows = sparse.coo_matrix(flows)
+                rows.append(papers[flows.row])
+                cols.append(reviewers[flows.col])
+                data.append(flows.data)
+            self.flow_matrix = sparse.csr_matrix(
+                (
+                    np.concatenate(data),
+                    (np.concatenate(rows), np.concatenate(cols)),
+                ),
+                shape=shape,
+            )
+        else:
+            self.flow_matrix = np.zeros(shape)
+            for (papers, reviewers), (flows, _) in zip(components, results):
+                self.flow_matrix[np.ix_(papers, reviewers)] = flows
+
+        self.solved = all(solved for _, (solved, _) in results)
+        self.optimal_cost = sum(cost for _, (_, cost) in results)
+        self.cost = self._flow_cost()
+        stop_time = time.time()
+        self.logger.debug(
+            "Components were solved at {} and took {} seconds".format(
+                stop_time, stop_time - start_time
+            )
+        )
+
+        return self.flow_matrix
+
+    def _flow_cost(self):
+        """Total cost of self.flow_matrix under the cost matrix"""
+        if self.sparse:
+            flows = self.flow_matrix.tocoo()
+            return np.sum(
+                flows.data * self.cost_matrix.values_at(flows.row, flows.col)
+            )
+        return np.sum(self.flow_matrix * self.cost_matrix)
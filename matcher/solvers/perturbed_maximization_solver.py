@@ -10,9 +10,9 @@ a sampling program written in C.
 
 import logging
 import numpy as np
-import gurobipy as gp
 from cffi import FFI
 from .core import SolverException
+from .gurobi_resources import get_resources, set_gurobi_params
 from .bvn_extension import run_bvn
 from .minmax_solver import MinMaxSolver
 
@@ -24,14 +24,24 @@ class PerturbedMaximizationSolver:
         demands,
         encoder,
         allow_zero_score_assignments=False,
+        resources=None,
         logger=logging.getLogger(__name__),
     ):
         """
         Initialize the solver with the given encoder and constraints.
+
+        resources is a dict of Gurobi threads, memory_limit, method, time_limit
+        and concurrent_workers, see gurobi_resources.get_resources.
         """
-        
+        # gurobipy is only needed once this solver is used
+        import gurobipy as gp
+
         self.logger = logger
         self.logger.debug("[PerturbedMaximization]: Initializing ...")
+        self.resources = get_resources(resources)
+        self.logger.info(
+            f"[PerturbedMaximization]: Gurobi resources {self.resources}"
+        )
 
         # Store the inputs
         self.num_paps, self.num_revs = encoder.cost_matrix.shape
@@ -87,6 +97,7 @@ class PerturbedMaximizationSolver:
         def deterministic_assignment(consider_zeros=True):
             solver = gp.Model()
             solver.setParam('OutputFlag', 0)
+            set_gurobi_params(solver, self.resources)
             # Initialize assignment matrix and objective function
             objective  = 0.0
             assignment = [[0.0 for j in range(self.num_revs)] for i in range(self.num_paps)]
@@ -160,6 +171,7 @@ class PerturbedMaximizationSolver:
             def fractional_assignment_without_perturbation(consider_zeros=True):
                 solver = gp.Model()
                 solver.setParam('OutputFlag', 0)
+                set_gurobi_params(solver, self.resources)
                 # Initialize assignment matrix and objective function
                 objective  = 0.0
                 assignment = [
@@ -462,6 +474,7 @@ class PerturbedMaximizationSolver:
         This is the QuadraticPM algorithm from Xu et al 2023, where the perturbation
         function used is f(x) = x - p * x^2 with p = the perturbation variable.
         """
+        import gurobipy as gp
 
         self.logger.debug(
             "[PerturbedMaximization]: Solving the fractional assignment ..."
@@ -475,6 +488,7 @@ class PerturbedMaximizationSolver:
         def fractional_assignment_with_perturbation(consider_zeros=True):
             solver = gp.Model()
             solver.setParam('OutputFlag', 0)
+            set_gurobi_params(solver, self.resources)
             # Initialize assignment matrix and objective function
             objective  = 0.0
             assignment = [[0.0 for j in range(self.num_revs)] for i in range(self.num_paps)]
@@ -17,6 +17,7 @@ from .core import SolverException
 from .bvn_extension import run_bvn
 from ortools.linear_solver import pywraplp
 from cffi import FFI
+from scipy import sparse
 import logging
 import numpy as np
 from itertools import product
@@ -202,6 +203,8 @@ class RandomizedSolver:
         self.logger.debug("start fractional_assignment_solver")
 
         result_matrix = self.fractional_assignment_solver.solve()
+        if sparse.issparse(result_matrix):
+            result_matrix = result_matrix.toarray()
         self.solved = self.fractional_assignment_solver.solved
         self.expected_cost = self.fractional_assignment_solver.cost / self.one
         if not self.solved:
@@ -15,10 +15,13 @@ SimpleSolver is initialized with the following arguments:
 
     "cost_matrix":
         a #reviewers by #papers numpy array representing the cost of
-        each reviewer-paper combination.
+        each reviewer-paper combination. May also be a DefaultSparseMatrix
+        (see matcher/encoder.py), in which case only pairs with a stored cost
+        or constraint are considered for arcs.
 
     "constraint_matrix":
-        a #reviewers by #papers numpy array representing
+        a #reviewers by #papers numpy array (or DefaultSparseMatrix, if
+        cost_matrix is one) representing
         constraints on the match. Each cell can take a value of -1, 0, or 1:
 
         0: no constraint
@@ -37,38 +40,90 @@ SimpleSolver is initialized with the following arguments:
         a #papers by #reviewers numpy array representing the limit on the flow
         between that reviewer and paper (usually 1)
 
-
-Node is a namedtuple that is used to represent nodes in the graph:
-
-    "number" (0-indexed):
-        a unique number among all Nodes in the graph.
-        e.g. in a graph with 3 papers and 4 reviewers, number can take a
-        value from 0 to 11.
-
-    "index" (0-indexed):
-        a position in the cost/constraint matrix along the relevant axis
-        e.g. in a graph with 3 papers and 4 reviewers, paper nodes can have
-        "index" of value between 0 and 2, and reviewer nodes can have
-        "index" of value between 0 and 3
-
-    "supply":
-        an integer representing the supply (+) or demand (-) of a node.
+    "minimums":
+        None (default) or a list of length #reviewers. Each item in the list
+        is an integer representing the minimum number of reviews a reviewer
+        should be assigned, in which case "num_reviews" are the maximums.
+        The minimums are lower bounds on the source to reviewer arcs, encoded
+        with the standard gadget: each reviewer node supplies its minimum
+        itself, and the arc from the source only carries the remaining
+        maximum - minimum reviews.
+
+    "candidate_limit":
+        None (default) or an integer k. If set, the solver first only adds the
+        arcs of each reviewer's and each paper's k lowest cost pairs. The node
+        potentials of the solution (shortest path distances in its residual
+        graph) then certify whether it is optimal for the full graph: if any
+        excluded arc has a negative reduced cost, those arcs are added and the
+        graph is solved again, until none do. If the candidate arcs can't
+        route all the flow, all the excluded arcs are added.
+
+
+Nodes in the graph are represented by their number alone, in contiguous
+ranges: the source is node 0, followed by one node per reviewer, one node per
+paper and the sink. e.g. in a graph with 3 papers and 4 reviewers, reviewer
+nodes are numbered 1 to 4, paper nodes 5 to 7, and the sink is node 8.
+A node's position in the cost/constraint matrix along the relevant axis (its
+"index") is its number minus the offset of its range.
+
+Node supplies and arcs (tails, heads, capacities and costs) are kept in
+aligned numpy arrays, so the solution can be read back without any per-node
+lookups.
 
 """
 
 from __future__ import print_function, division
-from collections import namedtuple
 import logging
 import numpy as np
+from scipy import sparse
 from ortools.graph.python import min_cost_flow
 from .core import SolverException
-
-Node = namedtuple("Node", ["number", "index", "supply"])
+from ..encoder import DefaultSparseMatrix
+
+
+def _truncate(values):
+    """Convert `values` to an int64 array, truncating towards zero like int()."""
+    return np.asarray(values).astype(np.int64)
+
+
+def _kth_smallest(groups, values, num_groups, k):
+    """
+    Find the k-th smallest of the int64 `values` in each of the groups
+    numbered 0 to `num_groups` - 1, given the group of each value.
+    Groups with fewer than k values get the largest int64 instead.
+    """
+    thresholds = np.full(num_groups, np.iinfo(np.int64).max)
+    if len(values) == 0:
+        return thresholds
+
+    # sorting a single key of (group, value) is much faster than lexsort
+    lowest = values.min()
+    span = int(values.max()) - int(lowest) + 1
+    if num_groups * span < 2**62:
+        keys = np.sort(groups.astype(np.int64) * span + (values - lowest))
+        sorted_groups, sorted_values = np.divmod(keys, span)
+        sorted_values += lowest
+    else:
+        order = np.lexsort((values, groups))
+        sorted_groups, sorted_values = groups[order], values[order]
+
+    starts = np.searchsorted(sorted_groups, np.arange(num_groups))
+    ends = np.append(starts[1:], len(sorted_groups))
+    has_k = ends - starts >= k
+    thresholds[has_k] = sorted_values[starts[has_k] + k - 1]
+    return thresholds
 
 
 class SimpleSolver:
     """Main class that represents the graph"""
 
+    # number of reviewer-paper pairs converted into arcs at a time
+    arc_block_size = 2**22
+
+    # rounds of Bellman-Ford allowed to certify a pruned graph's solution,
+    # all excluded arcs are added back if the node potentials need more
+    max_potential_rounds = 100
+
     def __init__(
         self,
         num_reviews,
@@ -79,91 +134,201 @@ class SimpleSolver:
         logger=logging.getLogger(__name__),
         strict=True,
         limit_matrix=None,
+        minimums=None,
+        candidate_limit=None,
     ):
 
         self.logger = logger
         self.allow_zero_score_assignments = allow_zero_score_assignments
 
+        self.sparse = isinstance(cost_matrix, DefaultSparseMatrix)
+        if self.sparse and (
+            allow_zero_score_assignments or cost_matrix.default != 0
+        ):
+            # every unconstrained pair gets an arc, so there is nothing to skip
+            self.logger.debug("Using dense cost and constraint matrices")
+            self.sparse = False
+            cost_matrix = cost_matrix.toarray()
+            constraint_matrix = constraint_matrix.toarray()
+            if isinstance(limit_matrix, DefaultSparseMatrix):
+                limit_matrix = limit_matrix.toarray()
+
         self.cost = 0
         self.solved = False
         self.cost_matrix = cost_matrix
         self.constraint_matrix = constraint_matrix
-        self.flow_matrix = np.zeros(np.shape(self.cost_matrix))
+        if self.sparse:
+            self.flow_matrix = sparse.csr_matrix(np.shape(self.cost_matrix))
+        else:
+            self.flow_matrix = np.zeros(np.shape(self.cost_matrix))
         self.num_reviews = num_reviews
+        self.minimums = minimums
+        self.candidate_limit = candidate_limit
         self.demands = demands
         self.num_papers = np.size(cost_matrix, axis=0)
         self.num_reviewers = np.size(cost_matrix, axis=1)
-        self.current_offset = 0
-        if limit_matrix is None:
+        if limit_matrix is None and not self.sparse:
             limit_matrix = np.ones(np.shape(self.cost_matrix), dtype=np.int64)
 
         self._check_inputs(strict)
 
-        self.start_nodes = []
-        self.end_nodes = []
-        self.capacities = []
-        self.costs = []
-        self.node_by_number = {}
+        self._arc_chunks = []
 
         total_supply = min(sum(self.num_reviews), sum(self.demands))
 
         # -- Add Nodes --
 
-        # no index because the source isn't represented in the cost/constraint matrices.
-        self.source_node = self.add_node(index=None, supply=total_supply)
+        # the source and sink aren't represented in the cost/constraint matrices
+        self.source_node = 0
+        self.reviewer_offset = 1
+        self.paper_offset = self.reviewer_offset + self.num_reviewers
+        self.sink_node = self.paper_offset + self.num_papers
+        self.num_nodes = self.sink_node + 1
 
-        self.reviewer_nodes = [
-            self.add_node(i) for i in range(self.num_reviewers)
-        ]
-        self.paper_nodes = [self.add_node(i) for i in range(self.num_papers)]
-
-        # no index because the sink isn't represented in the cost/constraint matrices.
-        self.sink_node = self.add_node(index=None, supply=(-1 * total_supply))
-
-        # make various indexes for Nodes
-        self.reviewer_node_by_index = {n.index: n for n in self.reviewer_nodes}
-        self.paper_node_by_index = {n.index: n for n in self.paper_nodes}
+        self.reviewer_nodes = self.reviewer_offset + np.arange(
+            self.num_reviewers
+        )
+        self.paper_nodes = self.paper_offset + np.arange(self.num_papers)
+
+        # cast supplies to Python int first, because they may be floats
+        self.supplies = np.zeros(self.num_nodes, dtype=np.int64)
+        self.supplies[self.source_node] = int(total_supply)
+        self.supplies[self.sink_node] = -int(total_supply)
+
+        source_capacities = _truncate(self.num_reviews)
+        if self.minimums is not None:
+            # reviewers supply their own minimums, which the source then
+            # doesn't have to supply through their arcs
+            lower_bounds = _truncate(self.minimums)
+            self.supplies[self.reviewer_nodes] = lower_bounds
+            self.supplies[self.source_node] -= lower_bounds.sum()
+            source_capacities = source_capacities - lower_bounds
 
         # -- Add Edges --
 
         # connect the source node to all reviewer nodes.
-        for r_node in self.reviewer_nodes:
-            capacity = self.num_reviews[r_node.index]
-            self.add_edge(self.source_node, r_node, capacity, cost=0)
-
-        for r_node in self.reviewer_nodes:
-            for p_node in self.paper_nodes:
-
-                coordinates = (p_node.index, r_node.index)
-                arc_cost = int(self.cost_matrix[coordinates])
-                arc_constraint = self.constraint_matrix[coordinates]
-
-                # a constraint of 0 means there's no constraint, so apply the cost as normal
-                # a constraint of 1 means that this user was explicitly assigned to this paper
-                # a constraint of anything other that 0 or 1 essentially indicates a conflict, so do not add an arc
-                if arc_constraint == 0 and (
-                    self.allow_zero_score_assignments or arc_cost != 0
-                ):
-                    self.add_edge(
-                        r_node, p_node, limit_matrix[coordinates], arc_cost
-                    )
-                elif arc_constraint == 1:
-                    # TODO: this should be handled as a hard constraint
-                    arc_cost = self._least_cost() - 1
-                    self.add_edge(
-                        r_node,
-                        p_node,
-                        limit_matrix[coordinates],
-                        int(arc_cost),
-                    )
+        self.add_edges(
+            np.full(self.num_reviewers, self.source_node),
+            self.reviewer_nodes,
+            source_capacities,
+            np.zeros(self.num_reviewers, dtype=np.int64),
+        )
+
+        # connect reviewer nodes to paper nodes, reviewer by reviewer.
+        if self.sparse:
+            self._add_sparse_assignment_edges(limit_matrix)
+        else:
+            self._add_dense_assignment_edges(limit_matrix)
 
         # connect paper nodes to the sink node.
-        for p_node in self.paper_nodes:
-            capacity = self.demands[p_node.index]
-            self.add_edge(p_node, self.sink_node, capacity, cost=0)
+        self.add_edges(
+            self.paper_nodes,
+            np.full(self.num_papers, self.sink_node),
+            _truncate(self.demands),
+            np.zeros(self.num_papers, dtype=np.int64),
+        )
 
         self.construct_solver()
 
+    def _assignment_arcs(self, costs, constraints, limits):
+        """
+        Decide which reviewer-paper pairs get an arc, given aligned arrays of
+        their costs, constraints and limits.
+
+        Returns a mask of the pairs that get an arc, and the costs and
+        capacities of those arcs.
+        """
+        # costs and limits are truncated towards zero, like int() does
+        arc_costs = _truncate(costs)
+
+        # a constraint of 0 means there's no constraint, so apply the cost as normal
+        # a constraint of 1 means that this user was explicitly assigned to this paper
+        # a constraint of anything other that 0 or 1 essentially indicates a conflict, so do not add an arc
+        unconstrained = constraints == 0
+        if not self.allow_zero_score_assignments:
+            unconstrained &= arc_costs != 0
+
+        forced = constraints == 1
+        if forced.any():
+            # TODO: this should be handled as a hard constraint
+            arc_costs[forced] = int(self._least_cost() - 1)
+
+        has_arc = unconstrained | forced
+        return has_arc, arc_costs[has_arc], _truncate(limits[has_arc])
+
+    def _add_dense_assignment_edges(self, limit_matrix):
+        """
+        Add the reviewer to paper edges from the dense matrices, a block of
+        reviewers at a time to bound the size of the temporary arrays.
+        """
+        cost_matrix = np.asarray(self.cost_matrix).T
+        constraint_matrix = np.asarray(self.constraint_matrix).T
+        limit_matrix = np.asarray(limit_matrix).T
+
+        block_size = max(1, self.arc_block_size // max(1, self.num_papers))
+        for block_start in range(0, self.num_reviewers, block_size):
+            block = slice(block_start, block_start + block_size)
+            has_arc, arc_costs, capacities = self._assignment_arcs(
+                cost_matrix[block],
+                constraint_matrix[block],
+                limit_matrix[block],
+            )
+            r_indices, p_indices = np.nonzero(has_arc)
+            self.add_edges(
+                self.reviewer_offset + block_start + r_indices,
+                self.paper_offset + p_indices,
+                capacities,
+                arc_costs,
+            )
+
+    def _add_sparse_assignment_edges(self, limit_matrix):
+        """Add the reviewer to paper edges from the sparse matrices."""
+        r_indices, p_indices, costs, constraints, limits = (
+            self._sparse_candidate_arcs(limit_matrix)
+        )
+        has_arc, arc_costs, capacities = self._assignment_arcs(
+            costs, constraints, limits
+        )
+        self.add_edges(
+            self.reviewer_offset + r_indices[has_arc],
+            self.paper_offset + p_indices[has_arc],
+            capacities,
+            arc_costs,
+        )
+
+    def _sparse_candidate_arcs(self, limit_matrix):
+        """
+        Find the reviewer-paper pairs that can become arcs when the cost and
+        constraint matrices are sparse: pairs with a stored cost or constraint.
+        Every other pair has a cost of 0 and no constraint.
+
+        Returns aligned arrays of reviewer indices, paper indices, costs,
+        constraints and limits, ordered by reviewer and then by paper.
+        """
+        cost_rows, cost_cols, _ = self.cost_matrix.entries()
+        constraint_rows, constraint_cols, _ = self.constraint_matrix.entries()
+        linear_indices = np.unique(
+            np.concatenate(
+                [
+                    cost_cols.astype(np.int64) * self.num_papers + cost_rows,
+                    constraint_cols.astype(np.int64) * self.num_papers
+                    + constraint_rows,
+                ]
+            )
+        )
+        r_indices, p_indices = np.divmod(linear_indices, self.num_papers)
+
+        costs = self.cost_matrix.values_at(p_indices, r_indices)
+        constraints = self.constraint_matrix.values_at(p_indices, r_indices)
+        if limit_matrix is None:
+            limits = np.ones(linear_indices.size, dtype=np.int64)
+        elif isinstance(limit_matrix, DefaultSparseMatrix):
+            limits = limit_matrix.values_at(p_indices, r_indices)
+        else:
+            limits = np.asarray(limit_matrix)[p_indices, r_indices]
+
+        return r_indices, p_indices, costs, constraints, limits
+
     def _check_inputs(self, strict):
         """Validate inputs (e.g. that matrix and array dimensions are correct)"""
         self.logger.debug("Checking graph inputs")
@@ -171,10 +336,13 @@ class SimpleSolver:
         num_papers = np.size(self.cost_matrix, axis=0)
         num_reviewers = np.size(self.cost_matrix, axis=1)
 
+        matrix_type = DefaultSparseMatrix if self.sparse else np.ndarray
         for matrix in [self.cost_matrix, self.constraint_matrix]:
-            if not isinstance(matrix, np.ndarray):
+            if not isinstance(matrix, matrix_type):
                 raise SolverException(
-                    "cost and constraint matrices must be of type numpy.ndarray"
+                    "cost and constraint matrices must be of type {}".format(
+                        matrix_type.__name__
+                    )
                 )
 
         if not np.shape(self.cost_matrix) == np.shape(self.constraint_matrix):
@@ -199,6 +367,28 @@ class SimpleSolver:
                 )
             )
 
+        if self.minimums is not None:
+            if not len(self.minimums) == num_reviewers:
+                raise SolverException(
+                    "minimums must be same length ({}) as number of reviewers ({})".format(
+                        len(self.minimums), num_reviewers
+                    )
+                )
+
+            if np.any(
+                np.asarray(self.minimums) > np.asarray(self.num_reviews)
+            ):
+                raise SolverException(
+                    "minimums may not be greater than num_reviews"
+                )
+
+            if sum(self.minimums) > sum(self.demands):
+                raise SolverException(
+                    "Total minimum reviews ({}) may not be greater than total demand ({})".format(
+                        sum(self.minimums), sum(self.demands)
+                    )
+                )
+
         supply = sum(self.num_reviews)
         demand = sum(self.demands)
         self.logger.debug(
@@ -237,14 +427,15 @@ class SimpleSolver:
                 )
             )
 
-        if any([not isinstance(i, int) for i in self.capacities]):
-            raise SolverException(
-                "capacities list may not contain integers of type numpy.int64"
-            )
-
-        if any([not isinstance(i, int) for i in self.costs]):
+        if len(self.start_nodes) and not (
+            0 <= min(self.start_nodes.min(), self.end_nodes.min())
+            and max(self.start_nodes.max(), self.end_nodes.max())
+            < self.num_nodes
+        ):
             raise SolverException(
-                "costs list may not contain integers of type numpy.int64"
+                "start_nodes and end_nodes must be node numbers between 0 and {}".format(
+                    self.num_nodes - 1
+                )
             )
 
     def _boundary_cost(self, boundary_function):
@@ -265,6 +456,8 @@ class SimpleSolver:
         finds the greatest value in cost_matrix.
 
         """
+        if self.sparse:
+            return self.cost_matrix.max()
         return self._boundary_cost(self.cost_matrix.argmax)
 
     def _least_cost(self):
@@ -272,64 +465,139 @@ class SimpleSolver:
         finds the lowest value in cost_matrix.
 
         """
+        if self.sparse:
+            if not hasattr(self, "_sparse_least_cost"):
+                self._sparse_least_cost = self.cost_matrix.min()
+            return self._sparse_least_cost
         return self._boundary_cost(self.cost_matrix.argmin)
 
-    def add_node(self, index, supply=0):
+    def add_edges(self, start_nodes, end_nodes, capacities, costs):
         """
-        Register a new, unconnected Node object with this graph, with the given index and supply.
-        Assigns the Node the next available number, given all other Nodes in the graph.
+        Adds "edges" between the node numbers in `start_nodes` and `end_nodes` with the given capacities and costs,
+        all aligned arrays.
 
+        Edges are represented virtually by the presence of node numbers in the aligned arrays
+        `self.start_nodes` and `self.end_nodes`; there is no "Edge" object.
         """
-        # cast `supply` to Python int because SimpleMinCostFlow can't handle other int types
-        # (e.g. numpy.int64)
-        new_node = Node(
-            number=self.current_offset, index=index, supply=int(supply)
-        )
+        self._arc_chunks.append((start_nodes, end_nodes, capacities, costs))
 
-        if new_node.number in self.node_by_number:
-            raise SolverException(
-                "Node {} already exists in assignment graph.".format(
-                    new_node.number
+    def construct_solver(self):
+        """
+        Constructs the OR-Tools MinCostFlow solver with this SimpleSolver's nodes and edges.
+        """
+        # SimpleMinCostFlow takes int32 node numbers and int64 capacities and costs
+        arcs = [
+            np.concatenate([chunk[i] for chunk in self._arc_chunks]).astype(
+                dtype, copy=False
+            )
+            for i, dtype in enumerate([np.int32, np.int32, np.int64, np.int64])
+        ]
+        if self.candidate_limit is not None:
+            is_candidate = self._candidate_arcs(*arcs)
+            self._excluded_arcs = [arc[~is_candidate] for arc in arcs]
+            arcs = [arc[is_candidate] for arc in arcs]
+            self.logger.debug(
+                "Using {} candidate arcs, excluding {}".format(
+                    len(arcs[0]), len(self._excluded_arcs[0])
                 )
             )
-        else:
-            self.node_by_number[new_node.number] = new_node
-            self.current_offset += 1
-            return new_node
+        self.start_nodes, self.end_nodes, self.capacities, self.costs = arcs
+        self._build_min_cost_flow()
 
-    def add_edge(self, start_node, end_node, capacity, cost):
-        """
-        Adds an "edge" between `start_node` and `end_node` with the given capacity and cost.
+    def _build_min_cost_flow(self):
+        """Adds the current arcs and node supplies to a new OR-Tools solver."""
+        self._check_graph_integrity()
 
-        Edges are represented virtually by the presence of Node numbers in the aligned arrays
-        `self.start_nodes` and `self.end_nodes`; there is no "Edge" object.
-        """
-        self.start_nodes.append(start_node)
-        self.end_nodes.append(end_node)
+        self.min_cost_flow = min_cost_flow.SimpleMinCostFlow()
 
-        # cast `capacity` to Python int because SimpleMinCostFlow can't handle other int types
-        # (e.g. numpy.int64)
-        self.capacities.append(int(capacity))
-        self.costs.append(cost)
+        # arc i in the solver is the i-th edge that was added
+        self.min_cost_flow.add_arcs_with_capacity_and_unit_cost(
+            self.start_nodes, self.end_nodes, self.capacities, self.costs
+        )
+        self.min_cost_flow.set_nodes_supplies(
+            np.arange(self.num_nodes, dtype=np.int32), self.supplies
+        )
 
-    def construct_solver(self):
+    def _candidate_arcs(self, start_nodes, end_nodes, capacities, costs):
         """
-        Constructs the OR-Tools MinCostFlow solver with this SimpleSolver's Nodes and edges.
+        Returns a mask of the arcs that are kept in a pruned graph: all the
+        arcs from the source and to the sink, and the `candidate_limit` lowest
+        cost assignment arcs of each reviewer and each paper.
         """
-        self._check_graph_integrity()
-
-        self.min_cost_flow = min_cost_flow.SimpleMinCostFlow()
+        is_assignment = (start_nodes >= self.reviewer_offset) & (
+            start_nodes < self.paper_offset
+        )
+        is_candidate = ~is_assignment
+        assignment_costs = costs[is_assignment]
+        for nodes in [start_nodes[is_assignment], end_nodes[is_assignment]]:
+            # ties with the k-th lowest cost are kept as well
+            thresholds = _kth_smallest(
+                nodes, assignment_costs, self.num_nodes, self.candidate_limit
+            )
+            is_candidate[is_assignment] |= (
+                assignment_costs <= thresholds[nodes]
+            )
+        return is_candidate
 
-        for arc_index in range(len(self.start_nodes)):
-            self.min_cost_flow.add_arcs_with_capacity_and_unit_cost(
-                self.start_nodes[arc_index].number,
-                self.end_nodes[arc_index].number,
-                self.capacities[arc_index],
-                self.costs[arc_index],
+    def _node_potentials(self, flows):
+        """
+        Computes shortest path distances from a virtual root, connected to
+        every node at zero cost, in the residual graph of `flows`.
+        Since `flows` is optimal, the residual graph has no negative cycles,
+        and every residual arc has a non-negative reduced cost under these
+        potentials.
+        Returns None if the distances do not settle within
+        `max_potential_rounds` rounds.
+        """
+        forward = flows < self.capacities
+        backward = flows > 0
+        tails = np.concatenate(
+            [self.start_nodes[forward], self.end_nodes[backward]]
+        )
+        heads = np.concatenate(
+            [self.end_nodes[forward], self.start_nodes[backward]]
+        )
+        costs = np.concatenate([self.costs[forward], -self.costs[backward]])
+
+        # group the residual arcs by head, to relax them with one reduceat
+        order = np.argsort(heads, kind="stable")
+        tails, heads, costs = tails[order], heads[order], costs[order]
+        head_nodes, head_starts = np.unique(heads, return_index=True)
+
+        # Bellman-Ford, relaxing every residual arc at each round
+        potentials = np.zeros(self.num_nodes, dtype=np.int64)
+        for _ in range(min(self.num_nodes, self.max_potential_rounds)):
+            shortest = np.minimum.reduceat(
+                potentials[tails] + costs, head_starts
             )
+            improved = shortest < potentials[head_nodes]
+            if not improved.any():
+                return potentials
+            potentials[head_nodes[improved]] = shortest[improved]
+        return None
+
+    def _improving_arcs(self, solver_status):
+        """
+        Returns a mask of the excluded arcs that must be added to the graph:
+        those with a negative reduced cost under the node potentials of the
+        current solution, or all of them if there is no feasible solution or
+        no potentials.
+        """
+        if solver_status != self.min_cost_flow.OPTIMAL:
+            return np.ones(len(self._excluded_arcs[0]), dtype=bool)
 
-        for node in self.node_by_number.values():
-            self.min_cost_flow.set_nodes_supplies(node.number, node.supply)
+        flows = self.min_cost_flow.flows(
+            np.arange(self.min_cost_flow.num_arcs(), dtype=np.int32)
+        )
+        potentials = self._node_potentials(flows)
+        if potentials is None:
+            self.logger.debug(
+                "Node potentials did not settle, adding all excluded arcs"
+            )
+            return np.ones(len(self._excluded_arcs[0]), dtype=bool)
+        start_nodes, end_nodes, capacities, costs = self._excluded_arcs
+        reduced_costs = costs + potentials[start_nodes] - potentials[end_nodes]
+        return (capacities > 0) & (reduced_costs < 0)
 
     def solve(self):
         """
@@ -342,21 +610,59 @@ class SimpleSolver:
         ), "Solver not constructed. Run self.construct_solver() first."
         self.cost = 0
         solver_status = self.min_cost_flow.solve()
+        while self.candidate_limit is not None and len(self._excluded_arcs[0]):
+            improving_arcs = self._improving_arcs(solver_status)
+            if not improving_arcs.any():
+                # the solution is optimal for the full graph
+                break
+
+            self.logger.debug(
+                "Adding {} excluded arcs and solving again".format(
+                    np.count_nonzero(improving_arcs)
+                )
+            )
+            self.start_nodes, self.end_nodes, self.capacities, self.costs = (
+                np.concatenate([arc, excluded_arc[improving_arcs]])
+                for arc, excluded_arc in zip(
+                    [
+                        self.start_nodes,
+                        self.end_nodes,
+                        self.capacities,
+                        self.costs,
+                    ],
+                    self._excluded_arcs,
+                )
+            )
+            self._excluded_arcs = [
+                arc[~improving_arcs] for arc in self._excluded_arcs
+            ]
+            self._build_min_cost_flow()
+            solver_status = self.min_cost_flow.solve()
         if solver_status == self.min_cost_flow.OPTIMAL:
             self.solved = True
-            for i in range(self.min_cost_flow.num_arcs()):
-                self.cost += self.min_cost_flow.flow(
-                    i
-                ) * self.min_cost_flow.unit_cost(i)
-                r_node = self.node_by_number[self.min_cost_flow.tail(i)]
-                p_node = self.node_by_number[self.min_cost_flow.head(i)]
-                flow = self.min_cost_flow.flow(i)
-
-                if (
-                    r_node in self.reviewer_nodes
-                    and p_node in self.paper_nodes
-                ):
-                    self.flow_matrix[p_node.index, r_node.index] = flow
+            flows = self.min_cost_flow.flows(
+                np.arange(self.min_cost_flow.num_arcs(), dtype=np.int32)
+            )
+            self.cost = int(np.dot(flows, self.costs))
+
+            # reviewer -> paper arcs are the only ones with a reviewer tail
+            assignment_arcs = (self.start_nodes >= self.reviewer_offset) & (
+                self.start_nodes < self.paper_offset
+            )
+            r_indices = (
+                self.start_nodes[assignment_arcs] - self.reviewer_offset
+            )
+            p_indices = self.end_nodes[assignment_arcs] - self.paper_offset
+            assignment_flows = flows[assignment_arcs]
+
+            if self.sparse:
+                self.flow_matrix = sparse.csr_matrix(
+                    (assignment_flows, (p_indices, r_indices)),
+                    shape=np.shape(self.cost_matrix),
+                )
+                self.flow_matrix.eliminate_zeros()
+            else:
+                self.flow_matrix[p_indices, r_indices] = assignment_flows
         else:
             logging.debug("Solver status: {}".format(solver_status))
             self.solved = False
@@ -33,7 +33,7 @@ setup(
         "gurobipy",
         "kombu>=5.3.0,<6.0",
         "psutil",
-        "scipy"
+        "scipy>=1.15.0"
     ],
     extras_require={
         "full": ["flower"],
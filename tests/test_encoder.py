@@ -7,6 +7,7 @@ from collections import namedtuple
 
 import pytest
 import numpy as np
+from scipy import sparse as sp
 
 from matcher.encoder import Encoder, EncoderError
 from conftest import assert_arrays
@@ -547,3 +548,315 @@ def test_encoder_no_papers(encoder_context):
         )
 
     assert "Papers List can not be empty." == str(exc.value)
+
+
+def test_encoder_bulk_encoding_matches_edges(encoder_context):
+    """Bulk encoding writes every edge, later duplicates take precedence"""
+    papers, reviewers, matrix_shape = encoder_context(
+        n_reviewers=6, n_papers=5
+    )
+
+    rng = np.random.default_rng(0)
+    edges = [
+        (papers[p], reviewers[r], rng.random())
+        for p, r in zip(rng.integers(0, 5, 40), rng.integers(0, 6, 40))
+    ]
+    constraints = [
+        (papers[p], reviewers[r], int(c))
+        for p, r, c in zip(
+            rng.integers(0, 5, 10),
+            rng.integers(0, 6, 10),
+            rng.choice([-1, 0, 1], 10),
+        )
+    ]
+    prob_limits = [(papers[i], reviewers[i], 0.5) for i in range(5)]
+
+    encoder = Encoder(
+        reviewers,
+        papers,
+        constraints,
+        {"mock/-/score_edge": {"default": 0.1, "edges": edges}},
+        {"mock/-/score_edge": 1},
+        probability_limits=prob_limits,
+    )
+
+    expected_scores = np.full(matrix_shape, 0.1)
+    for forum, user, score in edges:
+        expected_scores[papers.index(forum), reviewers.index(user)] = score
+    expected_constraints = np.zeros(matrix_shape, dtype=int)
+    for forum, user, constraint in constraints:
+        expected_constraints[
+            papers.index(forum), reviewers.index(user)
+        ] = constraint
+    expected_limits = np.ones(matrix_shape)
+    for i in range(5):
+        expected_limits[i, i] = 0.5
+
+    assert np.array_equal(
+        encoder.score_matrices["mock/-/score_edge"], expected_scores
+    )
+    assert np.array_equal(encoder.constraint_matrix, expected_constraints)
+    assert np.array_equal(encoder.prob_limit_matrix, expected_limits)
+
+
+def test_encoder_unknown_edge_ids(encoder_context):
+    """Edges that reference unknown papers or reviewers are rejected"""
+    papers, reviewers, _ = encoder_context()
+
+    scores_by_type = {
+        "mock/-/score_edge": {"edges": [("paper0", "unknown_reviewer", 0.5)]}
+    }
+
+    with pytest.raises(KeyError):
+        Encoder(
+            reviewers,
+            papers,
+            [],
+            scores_by_type,
+            {"mock/-/score_edge": 1},
+        )
+
+
+def test_encoder_sparse_matches_dense(encoder_context):
+    """Sparse mode encodes the same matrices and assignments as dense mode"""
+    papers, reviewers, matrix_shape = encoder_context(
+        n_reviewers=7, n_papers=5
+    )
+
+    rng = np.random.default_rng(1)
+    scores_by_type = {
+        "mock/-/affinity": {
+            "default": 0,
+            "edges": [
+                (papers[p], reviewers[r], rng.random())
+                for p, r in zip(rng.integers(0, 5, 15), rng.integers(0, 7, 15))
+            ],
+        },
+        "mock/-/bid": {
+            "default": 0.2,
+            "edges": [
+                (papers[p], reviewers[r], rng.choice([0.0, 0.5, 1.0]))
+                for p, r in zip(rng.integers(0, 5, 10), rng.integers(0, 7, 10))
+            ],
+        },
+    }
+    weight_by_type = {"mock/-/affinity": 1, "mock/-/bid": 2}
+    constraints = [
+        ("paper0", "reviewer0", -1),
+        ("paper1", "reviewer2", 1),
+        ("paper4", "reviewer6", 0),
+    ]
+    prob_limits = [("paper2", "reviewer3", 0.5)]
+
+    for normalization_types in [[], ["mock/-/affinity"]]:
+        encoders = [
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                scores_by_type,
+                weight_by_type,
+                normalization_types=normalization_types,
+                probability_limits=prob_limits,
+                sparse=sparse,
+            )
+            for sparse in [False, True]
+        ]
+        dense_encoder, sparse_encoder = encoders
+
+        for name in [
+            "aggregate_score_matrix",
+            "cost_matrix",
+            "constraint_matrix",
+            "prob_limit_matrix",
+        ]:
+            dense_matrix = getattr(dense_encoder, name)
+            sparse_matrix = getattr(sparse_encoder, "sparse_" + name)
+            assert sparse_matrix.shape == matrix_shape
+            assert np.allclose(sparse_matrix.toarray(), dense_matrix)
+            assert np.allclose(getattr(sparse_encoder, name), dense_matrix)
+
+        flow_matrix = np.zeros(matrix_shape)
+        flow_matrix[[0, 1, 2, 3, 4], [1, 2, 3, 4, 5]] = 1
+        dense_assignments = dense_encoder.decode_assignments(flow_matrix)
+        sparse_assignments = sparse_encoder.decode_assignments(
+            sp.csr_matrix(flow_matrix)
+        )
+        assert dense_assignments.keys() == sparse_assignments.keys()
+        for forum, assignments in dense_assignments.items():
+            for expected, actual in zip(
+                assignments, sparse_assignments[forum]
+            ):
+                assert expected["user"] == actual["user"]
+                assert np.isclose(
+                    expected["aggregate_score"], actual["aggregate_score"]
+                )
+
+
+def test_encoder_compact(encoder_context):
+    """Compact mode uses smaller dtypes but encodes the same values"""
+    papers, reviewers, matrix_shape = encoder_context()
+
+    scores_by_type = {
+        "mock/-/affinity": {
+            "default": 0.1,
+            "edges": [
+                ("paper0", "reviewer0", 0.5),
+                ("paper1", "reviewer2", 0.25),
+                ("paper2", "reviewer3", 0.75),
+            ],
+        }
+    }
+    constraints = [("paper0", "reviewer1", -1), ("paper2", "reviewer0", 1)]
+
+    for sparse in [False, True]:
+        encoders = [
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                scores_by_type,
+                {"mock/-/affinity": 1},
+                probability_limits=0.5,
+                sparse=sparse,
+                compact=compact,
+            )
+            for compact in [False, True]
+        ]
+        full_encoder, compact_encoder = encoders
+
+        assert compact_encoder.constraint_matrix.dtype == np.int8
+        assert compact_encoder.aggregate_score_matrix.dtype == np.float32
+        assert compact_encoder.cost_matrix.dtype == np.float32
+        assert np.array_equal(
+            compact_encoder.constraint_matrix, full_encoder.constraint_matrix
+        )
+        assert np.allclose(
+            compact_encoder.cost_matrix, full_encoder.cost_matrix
+        )
+        assert np.array_equal(
+            compact_encoder.prob_limit_matrix, full_encoder.prob_limit_matrix
+        )
+
+        flow_matrix = np.zeros(matrix_shape)
+        flow_matrix[0, 0] = 1
+        assignments = compact_encoder.decode_assignments(flow_matrix)
+        assert type(assignments["paper0"][0]["aggregate_score"]) is float
+
+    # a uniform probability limit is not materialized
+    dense_compact_encoder = Encoder(
+        reviewers,
+        papers,
+        [],
+        scores_by_type,
+        {"mock/-/affinity": 1},
+        probability_limits=0.5,
+        compact=True,
+    )
+    assert dense_compact_encoder.prob_limit_matrix.shape == matrix_shape
+    assert dense_compact_encoder.prob_limit_matrix.strides == (0, 0)
+
+
+def test_encoder_streamed_edges(encoder_context, monkeypatch):
+    """Edges from generators and columnar batches encode like a list"""
+    papers, reviewers, matrix_shape = encoder_context(
+        n_reviewers=6, n_papers=5
+    )
+    monkeypatch.setattr(Encoder, "edge_chunk_size", 4)
+
+    rng = np.random.default_rng(2)
+    edges = [
+        (papers[p], reviewers[r], rng.random())
+        for p, r in zip(rng.integers(0, 5, 30), rng.integers(0, 6, 30))
+    ]
+    batches = [
+        tuple(list(column) for column in zip(*edges[start : start + 7]))
+        for start in range(0, len(edges), 7)
+    ]
+
+    for sparse in [False, True]:
+        score_matrices = [
+            Encoder(
+                reviewers,
+                papers,
+                [],
+                {"mock/-/score_edge": {"default": 0.1, **scores}},
+                {"mock/-/score_edge": 1},
+                sparse=sparse,
+            ).aggregate_score_matrix
+            for scores in [
+                {"edges": edges},
+                {"edges": (edge for edge in edges)},
+                {"batches": iter(batches)},
+                {"edges": iter(edges[:14]), "batches": batches[2:]},
+            ]
+        ]
+        for score_matrix in score_matrices[1:]:
+            assert np.array_equal(score_matrix, score_matrices[0])
+
+
+def test_encoder_unequal_edge_batch(encoder_context):
+    """Columnar batches must have columns of the same length"""
+    papers, reviewers, _ = encoder_context()
+
+    scores_by_type = {
+        "mock/-/score_edge": {
+            "batches": [(["paper0", "paper1"], ["reviewer0"], [0.5, 0.5])]
+        }
+    }
+
+    with pytest.raises(EncoderError):
+        Encoder(
+            reviewers,
+            papers,
+            [],
+            scores_by_type,
+            {"mock/-/score_edge": 1},
+        )
+
+
+def test_decode_alternates_ties(encoder_context):
+    """Alternates are the best unassigned reviewers, ties in reviewer order"""
+    papers, reviewers, matrix_shape = encoder_context(
+        n_reviewers=6, n_papers=2
+    )
+
+    scores = [[0.5, 0.9, 0.5, 0.7, 0.5, 0.9], [0.1, 0.1, 0.1, 0.1, 0.1, 0.1]]
+    scores_by_type = {
+        "mock/-/score_edge": {
+            "edges": [
+                (papers[p], reviewers[r], scores[p][r])
+                for p, r in itertools.product(range(2), range(6))
+            ]
+        }
+    }
+    encoder = Encoder(
+        reviewers, papers, [], scores_by_type, {"mock/-/score_edge": 1}
+    )
+
+    flow_matrix = np.zeros(matrix_shape)
+    flow_matrix[0, 1] = 1
+    flow_matrix[1, 2] = 1
+
+    def users(alternates):
+        return [entry["user"] for entry in alternates]
+
+    for solution in [flow_matrix, sp.csr_matrix(flow_matrix)]:
+        alternates_by_forum = encoder.decode_alternates(solution, 3)
+        assert users(alternates_by_forum["paper0"]) == [
+            "reviewer5",
+            "reviewer3",
+            "reviewer0",
+        ]
+        assert users(alternates_by_forum["paper1"]) == [
+            "reviewer0",
+            "reviewer1",
+            "reviewer3",
+        ]
+
+        alternates_by_forum = encoder.decode_alternates(solution, 10)
+        assert len(alternates_by_forum["paper0"]) == 5
+        assert encoder.decode_alternates(solution, 0) == {
+            "paper0": [],
+            "paper1": [],
+        }
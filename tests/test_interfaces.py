@@ -2359,3 +2359,76 @@ def test_confignote_interface_matching_users():
 
     interface.set_status(MatcherStatus.RUNNING)
     assert interface.config_note.content["status"] == "Running"
+
+
+def test_confignote_interface_score_edges_in_batches(monkeypatch):
+    """
+    Test that score edges are fetched one batch of papers at a time, while
+    they are consumed, and fetched again each time they are iterated over.
+    """
+    papers = ["paper{}".format(i) for i in range(5)]
+
+    def get_grouped_edges(groupby, invitation, head, select, domain):
+        return [
+            {
+                "id": {"head": head},
+                "values": [
+                    {"head": head, "tail": "~reviewer0", "weight": 0.5},
+                    {"head": head, "tail": "~outsider", "weight": 1},
+                ],
+            }
+        ]
+
+    client = mock.MagicMock(openreview.Client)
+    client.get_note.return_value = openreview.Note(
+        id="<config_note_id>",
+        readers=[],
+        writers=[],
+        signatures=["<match_group_id>"],
+        invitation="<config_note_invitation>",
+        content={
+            "title": "test-1",
+            "match_group": "<match_group_id>",
+            "assignment_invitation": "<assignment_invitation_id>",
+            "aggregate_score_invitation": "<aggregate_score_invitation_id>",
+            "alternates": 1,
+            "scores_specification": {
+                "<affinity_score_invitation>": {"weight": 1, "default": 0}
+            },
+        },
+    )
+    client.get_note.return_value.domain = "<venue_id>"
+    client.get_grouped_edges = mock.MagicMock(side_effect=get_grouped_edges)
+
+    requested_batches = []
+    concurrent_requests = openreview.tools.concurrent_requests
+
+    def record_batch(request_func, params, **kwargs):
+        requested_batches.append(list(params))
+        return concurrent_requests(request_func, params, **kwargs)
+
+    monkeypatch.setattr(openreview.tools, "concurrent_requests", record_batch)
+
+    interface = ConfigNoteInterfaceV1(client, "<config_note_id>")
+    interface._papers = papers
+    interface._reviewers = ["~reviewer0"]
+    interface.edge_paper_batch_size = 2
+
+    assert interface.scores_by_type is interface.scores_by_type
+    edges = interface.scores_by_type["<affinity_score_invitation>"]["edges"]
+    assert requested_batches == []
+
+    edge_iter = iter(edges)
+    assert next(edge_iter) == ("paper0", "~reviewer0", 0.5)
+    assert requested_batches == [["paper0", "paper1"]]
+
+    expected = [(paper, "~reviewer0", 0.5) for paper in papers]
+    assert [("paper0", "~reviewer0", 0.5)] + list(edge_iter) == expected
+    assert requested_batches == [
+        ["paper0", "paper1"],
+        ["paper2", "paper3"],
+        ["paper4"],
+    ]
+
+    assert list(edges) == expected
+    assert len(requested_batches) == 6
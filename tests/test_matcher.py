@@ -8,6 +8,7 @@ import pytest
 import logging
 from numpy import testing as nptest
 from matcher import Matcher
+from matcher.core import SOLVER_MAP
 
 
 def test_matcher_basic_minmax():
@@ -174,3 +175,173 @@ def test_matcher_fairflow_fixed_input():
     )
     assert test_fairflow_matcher.assignments
     assert test_fairflow_matcher.alternates
+
+
+def test_matcher_fairir_solver_resources(caplog):
+    reviewers = ["reviewer1", "reviewer2", "reviewer3"]
+    papers = ["paper1", "paper2", "paper3"]
+
+    scores = [
+        (paper, reviewer, random.random())
+        for paper, reviewer in itertools.product(papers, reviewers)
+    ]
+
+    test_matcher = Matcher(
+        {
+            "reviewers": reviewers,
+            "papers": papers,
+            "scores_by_type": {"affinity": {"edges": scores}},
+            "weight_by_type": {"affinity": 1},
+            "minimums": [1, 1, 1],
+            "maximums": [1, 1, 1],
+            "demands": [1, 1, 1],
+            "num_alternates": 1,
+            "solver_resources": {"threads": 1, "time_limit": 60},
+        },
+        solver_class="FairIR",
+    )
+
+    with caplog.at_level(logging.INFO):
+        test_matcher.run()
+
+    assert test_matcher.get_status() == "Complete"
+    assert test_matcher.assignments
+    # the effective settings are reported with the status
+    assert "'solver_resources': '{\"threads\": 1, " in caplog.text
+    assert '"time_limit": 60.0' in caplog.text
+
+
+def test_matcher_fairir_highs_lp_backend(caplog):
+    reviewers = ["reviewer1", "reviewer2", "reviewer3"]
+    papers = ["paper1", "paper2", "paper3"]
+
+    scores = [
+        (paper, reviewer, random.random())
+        for paper, reviewer in itertools.product(papers, reviewers)
+    ]
+
+    test_matcher = Matcher(
+        {
+            "reviewers": reviewers,
+            "papers": papers,
+            "scores_by_type": {"affinity": {"edges": scores}},
+            "weight_by_type": {"affinity": 1},
+            "minimums": [1, 1, 1],
+            "maximums": [1, 1, 1],
+            "demands": [1, 1, 1],
+            "num_alternates": 1,
+            "fairir_lp_backend": "highs",
+        },
+        solver_class="FairIR",
+    )
+
+    with caplog.at_level(logging.INFO):
+        test_matcher.run()
+
+    assert test_matcher.get_status() == "Complete"
+    assert len(test_matcher.assignments) == 3
+    assert "'fairir_lp_backend': 'highs'" in caplog.text
+
+
+def run_matcher_with_solver_options(
+    monkeypatch, tmp_path, solver_class, options
+):
+    """Run the matcher on a small random instance (the same on every call)
+    with the datasource options, and return it with the solver it ran. The
+    assignments and alternates are written to tmp_path."""
+    reviewers = ["reviewer1", "reviewer2", "reviewer3", "reviewer4"]
+    papers = ["paper1", "paper2", "paper3"]
+
+    rng = random.Random(0)
+    scores = [
+        (paper, reviewer, rng.random())
+        for paper, reviewer in itertools.product(papers, reviewers)
+    ]
+
+    solvers = []
+    solve = SOLVER_MAP[solver_class].solve
+
+    def record_solver(solver):
+        solvers.append(solver)
+        return solve(solver)
+
+    monkeypatch.setattr(SOLVER_MAP[solver_class], "solve", record_solver)
+
+    test_matcher = Matcher(
+        {
+            "reviewers": reviewers,
+            "papers": papers,
+            "scores_by_type": {"affinity": {"edges": scores}},
+            "weight_by_type": {"affinity": 1},
+            "minimums": [0, 1, 1, 1],
+            "maximums": [2, 2, 2, 2],
+            "demands": [2, 2, 2],
+            "num_alternates": 1,
+            "assignments_output": str(tmp_path / "assignments.json"),
+            "alternates_output": str(tmp_path / "alternates.json"),
+            **options,
+        },
+        solver_class=solver_class,
+    )
+    test_matcher.run()
+
+    assert test_matcher.get_status() == "Complete"
+    nptest.assert_array_equal(test_matcher.solution.sum(axis=1), [2, 2, 2])
+    assert len(solvers) == 1
+    return test_matcher, solvers[0]
+
+
+def test_matcher_minmax_single_flow(monkeypatch, tmp_path):
+    _, solver = run_matcher_with_solver_options(
+        monkeypatch, tmp_path, "MinMax", {"minmax_single_flow": True}
+    )
+    assert solver.single_flow
+
+
+def test_matcher_minmax_candidate_limit(monkeypatch, tmp_path):
+    _, solver = run_matcher_with_solver_options(
+        monkeypatch, tmp_path, "MinMax", {"minmax_candidate_limit": 1}
+    )
+    assert solver.candidate_limit == 1
+
+    # the pruned graphs give an optimal solution of the full ones
+    _, full_solver = run_matcher_with_solver_options(
+        monkeypatch, tmp_path, "MinMax", {}
+    )
+    assert full_solver.candidate_limit is None
+    assert solver.cost == full_solver.cost
+
+
+@pytest.mark.parametrize("solver_class", ["MinMax", "FairFlow"])
+def test_matcher_decompose_components(monkeypatch, tmp_path, solver_class):
+    _, solver = run_matcher_with_solver_options(
+        monkeypatch,
+        tmp_path,
+        solver_class,
+        {"decompose_components": True, "flow_processes": 1},
+    )
+    assert solver.decompose
+    assert solver.processes == 1
+
+
+def test_matcher_fairflow_parallel_search(monkeypatch, tmp_path):
+    _, solver = run_matcher_with_solver_options(
+        monkeypatch,
+        tmp_path,
+        "FairFlow",
+        {"fairflow_parallel_search": True, "flow_processes": 3},
+    )
+    assert solver.parallel_search
+    # 3 processes search two steps of the makespan search at once
+    assert solver.processes == 3
+
+
+def test_matcher_fairflow_search_options(monkeypatch, tmp_path):
+    _, solver = run_matcher_with_solver_options(
+        monkeypatch,
+        tmp_path,
+        "FairFlow",
+        {"fairflow_search_tolerance": 0.1, "fairflow_warm_start": True},
+    )
+    assert solver.search_tolerance == 0.1
+    assert solver.warm_start
@@ -626,3 +626,172 @@ def test_solver_fairflow_avoid_zero_scores_get_no_solution():
         SolverException, match=r".*Solver could not find a solution.*"
     ):
         res = solver.solve()
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_solver_fairflow_decompose(processes):
+    """
+    Tests 9 papers, 12 reviewers, in 3 tracks with conflicts between them.
+    Purpose: Make sure that each track is solved separately, and that the
+    combined solution respects the demands, limits and conflicts.
+    """
+    rng = np.random.default_rng(0)
+    tracks = [(range(0, 3), range(0, 4)), (range(3, 6), range(4, 8))]
+    tracks.append((range(6, 9), range(8, 12)))
+    aggregate_score_matrix = np.zeros((9, 12))
+    constraint_matrix = -np.ones((9, 12))
+    for papers, reviewers in tracks:
+        block = np.ix_(papers, reviewers)
+        aggregate_score_matrix[block] = rng.random((3, 4)) + 0.1
+        constraint_matrix[block] = 0
+
+    solver = FairFlow(
+        [1] * 12,
+        [2] * 12,
+        [2] * 9,
+        encoder(aggregate_score_matrix, constraint_matrix),
+        decompose=True,
+        processes=processes,
+    )
+    res = solver.solve()
+    assert solver.solved
+    assert res.shape == (9, 12)
+    assert np.all(np.sum(res, axis=1) == 2)
+    assert np.all(np.sum(res, axis=0) >= 1)
+    assert np.all(np.sum(res, axis=0) <= 2)
+    assert np.all(res[constraint_matrix == -1] == 0)
+    assert solver.makespan == pytest.approx(
+        np.min(np.sum(res * aggregate_score_matrix, axis=1)), abs=1
+    )
+
+
+def test_solver_fairflow_paper_scores():
+    """
+    Tests 30 papers, 20 reviewers, with a few strong reviewers, so that the
+    makespan improvement rounds reassign reviewers.
+    Purpose: Make sure that the paper scores and sorted paper reviewers that
+    are updated incrementally match the solution.
+    """
+    rng = np.random.default_rng(1)
+    aggregate_score_matrix = np.round(
+        rng.random((30, 20)) * rng.random(20) ** 3, 3
+    )
+    constraint_matrix = np.zeros((30, 20))
+    solver = FairFlow(
+        [1] * 20,
+        [6] * 20,
+        [3] * 30,
+        encoder(aggregate_score_matrix, constraint_matrix),
+    )
+    res = solver.solve()
+    assert solver.solved
+
+    assert np.allclose(
+        solver.paper_scores, np.sum(res * aggregate_score_matrix, axis=1)
+    )
+    for pap in range(30):
+        revs = np.flatnonzero(res[pap])
+        assert solver.paper_reviewers[pap] == sorted(
+            zip(aggregate_score_matrix[pap, revs].tolist(), revs.tolist())
+        )
+
+
+def test_solver_fairflow_parallel_search():
+    """
+    Tests 40 papers, 30 reviewers, with a few strong reviewers and some
+    conflicts.
+    Purpose: Make sure that evaluating the makespan search steps in a pool of
+    processes finds the same makespan and solution as the sequential search.
+    """
+    rng = np.random.default_rng(2)
+    aggregate_score_matrix = np.round(
+        rng.random((40, 30)) * rng.random(30) ** 3, 3
+    )
+    constraint_matrix = np.zeros((40, 30))
+    constraint_matrix[rng.random((40, 30)) < 0.05] = -1
+
+    solutions = []
+    for parallel_search in [False, True]:
+        solver = FairFlow(
+            [1] * 30,
+            [6] * 30,
+            [3] * 40,
+            encoder(aggregate_score_matrix, constraint_matrix),
+            processes=3,
+            parallel_search=parallel_search,
+        )
+        res = solver.solve()
+        assert solver.solved
+        solutions.append((solver.makespan, res))
+
+    assert solutions[0][0] == solutions[1][0]
+    assert np.array_equal(solutions[0][1], solutions[1][1])
+
+
+@pytest.mark.parametrize(
+    "search_tolerance, warm_start", [(0.05, False), (0.0, True), (0.05, True)]
+)
+def test_solver_fairflow_adaptive_search(search_tolerance, warm_start):
+    """
+    Tests 40 papers, 30 reviewers, with a few strong reviewers and some
+    conflicts.
+    Purpose: Make sure that stopping the makespan search early and warm
+    starting its iterations still finds a valid solution that reaches the
+    makespan up to the max affinity.
+    """
+    rng = np.random.default_rng(2)
+    aggregate_score_matrix = np.round(
+        rng.random((40, 30)) * rng.random(30) ** 3, 3
+    )
+    constraint_matrix = np.zeros((40, 30))
+    constraint_matrix[rng.random((40, 30)) < 0.05] = -1
+
+    solver = FairFlow(
+        [1] * 30,
+        [6] * 30,
+        [3] * 40,
+        encoder(aggregate_score_matrix, constraint_matrix),
+        search_tolerance=search_tolerance,
+        warm_start=warm_start,
+    )
+    res = solver.solve()
+    assert solver.solved
+    assert np.all(np.sum(res, axis=1) == 3)
+    assert np.all(np.sum(res, axis=0) <= 6)
+    assert np.all(res[constraint_matrix == -1] == 0)
+    assert np.min(np.sum(res * aggregate_score_matrix, axis=1)) >= (
+        solver.makespan - np.max(aggregate_score_matrix)
+    )
+
+
+def test_solver_fairflow_starter_solution():
+    """
+    Tests 3 papers, 4 reviewers, starting from a valid solution.
+    Purpose: Make sure that a solution matrix can be passed to start from.
+    """
+    aggregate_score_matrix = np.array(
+        [
+            [0.2, 0.5, 0.2, 0.7],
+            [0.1, 0.2, 0.0, 0.9],
+            [0.4, 0.3, 0.6, 0.3],
+        ]
+    )
+    constraint_matrix = np.zeros((3, 4))
+    starter = np.array(
+        [
+            [1, 0, 0, 1],
+            [1, 1, 0, 0],
+            [0, 1, 1, 0],
+        ]
+    )
+    solver = FairFlow(
+        [1] * 4,
+        [2] * 4,
+        [2] * 3,
+        encoder(aggregate_score_matrix, constraint_matrix),
+        solution=starter.transpose(),
+    )
+    res = solver.solve()
+    assert solver.valid
+    assert np.all(np.sum(res, axis=1) == 2)
+    assert np.all(np.sum(res, axis=0) <= 2)
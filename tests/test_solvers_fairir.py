@@ -2,6 +2,7 @@ from collections import namedtuple
 import pytest
 from matcher.core import SolverException
 import numpy as np
+from matcher.encoder import Encoder
 from matcher.solvers import FairIR
 from conftest import assert_arrays
 
@@ -330,4 +331,229 @@ def test_solvers_fairir_custom_demands_paper_with_0_demand():
     res_A = solver_A.solve()
     assert res_A.shape == (3, 4)
     result = [assignments for assignments in np.sum(res_A, axis=1)]
-    assert_arrays(result, demands)
\ No newline at end of file
+    assert_arrays(result, demands)
+
+
+def test_solvers_fairir_sparse_encoder():
+    """
+    Tests 5 papers, 6 reviewers, with a real Encoder in dense and sparse mode.
+    Purpose: Assert that the sparse score and constraint matrices give the
+    same assignment as the dense ones.
+    """
+    papers = ["paper{}".format(i) for i in range(5)]
+    reviewers = ["reviewer{}".format(i) for i in range(6)]
+    rng = np.random.default_rng(0)
+    edges = [
+        (paper, reviewer, float(np.round(rng.random(), 2)))
+        for paper in papers
+        for reviewer in reviewers
+        if rng.random() < 0.7
+    ]
+    constraints = [("paper0", "reviewer0", -1), ("paper2", "reviewer3", -1)]
+
+    results = []
+    for sparse in [False, True]:
+        solver = FairIR(
+            [1] * 6,
+            [2] * 6,
+            [2] * 5,
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                {"mock/-/affinity": {"edges": edges}},
+                {"mock/-/affinity": 1},
+                sparse=sparse,
+            ),
+        )
+        assert solver.sparse == sparse
+        results.append(solver.solve())
+
+    dense_result, sparse_result = results
+    assert_arrays(sparse_result.flatten(), dense_result.flatten())
+
+
+@pytest.mark.parametrize("lp_backend", ["gurobi", "highs"])
+def test_solvers_fairir_edge_list_model(lp_backend):
+    """
+    Tests 3 papers, 4 reviewers with a conflict, a forced assignment and a
+    pair without a score.
+    Purpose: Assert that the LP has one variable per scored, unconflicted
+    pair and that the forced pair is fixed to 1.
+    """
+    aggregate_score_matrix_A = np.transpose(np.array([
+        [0.2, 0.5, 0.1],
+        [0.4, 0, 0.3],
+        [0.6, 0.7, 0.2],
+        [0.1, 0.9, 0.8]
+    ]))
+    constraint_matrix = np.transpose(np.array([
+        [0, 0, 1],
+        [0, 0, 0],
+        [-1, 0, 0],
+        [0, 0, 0]
+    ]))
+    solver_A = FairIR(
+        [0,0,0,0],
+        [2,2,2,2],
+        [2,2,2],
+        encoder(aggregate_score_matrix_A, constraint_matrix, None),
+        lp_backend=lp_backend
+    )
+    assert solver_A.lp.num_variables == 10
+    assert solver_A.lp.num_constraints == 4 + 4 + 3 + 3
+    forced_idx = solver_A._paper_number_to_lp_idx(0, 2)
+    assert solver_A.lp.get_bounds(forced_idx) == (1, 1)
+    with pytest.raises(SolverException):
+        solver_A._paper_number_to_lp_idx(2, 0)
+
+    res_A = solver_A.solve()
+    assert res_A.shape == (3,4)
+    assert res_A[2][0] == 1
+    assert res_A[0][2] == 0
+    assert res_A[1][1] == 0
+    assert_arrays(res_A.sum(axis=1), [2, 2, 2])
+
+
+@pytest.mark.parametrize("lp_backend", ["gurobi", "highs"])
+def test_solvers_fairir_change_makespan_in_place(lp_backend):
+    """
+    Tests 3 papers, 4 reviewers.
+    Purpose: Assert that changing the makespan updates the right hand sides
+    of the existing makespan constraints instead of rebuilding them.
+    """
+    aggregate_score_matrix_A = np.transpose(np.array([
+        [0.2, 0.5, 0.1],
+        [0.4, 0.1, 0.3],
+        [0.6, 0.7, 0.2],
+        [0.1, 0.9, 0.8]
+    ]))
+    constraint_matrix = np.zeros(np.shape(aggregate_score_matrix_A))
+    solver_A = FairIR(
+        [0,0,0,0],
+        [2,2,2,2],
+        [2,2,2],
+        encoder(aggregate_score_matrix_A, constraint_matrix, None),
+        lp_backend=lp_backend
+    )
+    num_constraints = solver_A.lp.num_constraints
+
+    solver_A.change_makespan(0.5)
+    assert solver_A.lp.num_constraints == num_constraints
+    assert_arrays(solver_A.lp.get_rhs(solver_A.ms_rows), [0.5, 0.5, 0.5])
+
+    solver_A.change_makespan(0.4, existing_makespans=['ms0', 'ms2'])
+    assert solver_A.lp.num_constraints == num_constraints
+    rhs = solver_A.lp.get_rhs(solver_A.ms_rows)
+    assert rhs[0] == rhs[2] == 0.4
+    assert rhs[1] == -np.inf
+
+    res_A = solver_A.solve()
+    assert res_A.shape == (3,4)
+    assert_arrays(res_A.sum(axis=1), [2, 2, 2])
+
+
+def test_solvers_fairir_highs_lp_backend():
+    """
+    Tests 8 papers, 10 reviewers with conflicts, forced assignments and an
+    attribute constraint, solved with each LP backend.
+    Purpose: Assert that the HiGHS backend finds a valid assignment with the
+    same total affinity as the Gurobi backend.
+    """
+    rng = np.random.default_rng(1)
+    aggregate_score_matrix_A = np.round(rng.random((8, 10)), 2)
+    constraint_matrix = np.zeros(np.shape(aggregate_score_matrix_A))
+    constraint_matrix[0, 0] = constraint_matrix[3, 5] = -1
+    constraint_matrix[2, 7] = 1
+    attr_constraints = [{
+            'name': 'Seniority',
+            'comparator': '>=',
+            'bound': 1,
+            'members': [0, 1, 2]
+        }]
+
+    results = {}
+    for lp_backend in ["gurobi", "highs"]:
+        solver = FairIR(
+            [1] * 10,
+            [3] * 10,
+            [3] * 8,
+            encoder(aggregate_score_matrix_A, constraint_matrix, attr_constraints),
+            lp_backend=lp_backend
+        )
+        res = solver.solve()
+        assert solver.solved
+        assert_arrays(res.sum(axis=1), [3] * 8)
+        assert np.all(res.sum(axis=0) <= 3)
+        assert np.all(res.sum(axis=0) >= 1)
+        assert res[0][0] == res[3][5] == 0
+        assert res[2][7] == 1
+        assert np.all(res[:, [0, 1, 2]].sum(axis=1) >= 1)
+        results[lp_backend] = (res * aggregate_score_matrix_A).sum()
+
+    assert results["highs"] == pytest.approx(results["gurobi"])
+
+
+def test_solvers_fairir_unknown_lp_backend():
+    """FairIR raises a SolverException for an LP backend it does not know."""
+    aggregate_score_matrix_A = np.ones((3, 4))
+    constraint_matrix = np.zeros(np.shape(aggregate_score_matrix_A))
+    with pytest.raises(SolverException, match="LP backend"):
+        FairIR(
+            [0,0,0,0],
+            [2,2,2,2],
+            [2,2,2],
+            encoder(aggregate_score_matrix_A, constraint_matrix, None),
+            lp_backend="glpk"
+        )
+
+
+def test_solvers_fairir_fix_assignment_with_constraints():
+    """
+    Tests 3 papers, 4 reviewers with a '<=' and a '>=' attribute constraint.
+    Purpose: Assert that pairs are only rounded when the current assignments
+    of the members to the paper allow it.
+    """
+    aggregate_score_matrix_A = np.transpose(np.array([
+        [0.2, 0.5, 0.1],
+        [0.4, 0.1, 0.3],
+        [0.6, 0.7, 0.2],
+        [0.1, 0.9, 0.8]
+    ]))
+    constraint_matrix = np.zeros(np.shape(aggregate_score_matrix_A))
+    attr_constraints = [{
+            'name': 'Junior',
+            'comparator': '<=',
+            'bound': 2,
+            'members': [0, 1]
+        }, {
+            'name': 'Senior',
+            'comparator': '>=',
+            'bound': 1,
+            'members': [2, 3]
+        }]
+    solver_A = FairIR(
+        [0,0,0,0],
+        [2,2,2,2],
+        [2,2,2],
+        encoder(aggregate_score_matrix_A, constraint_matrix, attr_constraints)
+    )
+    integral_assignments = np.zeros(solver_A.n_edges, dtype=np.float16)
+
+    solver_A.fix_assignment_to_one_with_constraints(0, 1, integral_assignments)
+    idx = solver_A._paper_number_to_lp_idx(0, 1)
+    assert solver_A.lp.get_bounds(idx) == (1, 1)
+    assert integral_assignments[idx] == 1
+    # a second junior reviewer would reach the bound of paper 1
+    solver_A.fix_assignment_to_one_with_constraints(1, 1, integral_assignments)
+    idx = solver_A._paper_number_to_lp_idx(1, 1)
+    assert solver_A.lp.get_bounds(idx) == (0, 1)
+    # but not the one of paper 2
+    solver_A.fix_assignment_to_one_with_constraints(1, 2, integral_assignments)
+    idx = solver_A._paper_number_to_lp_idx(1, 2)
+    assert solver_A.lp.get_bounds(idx) == (1, 1)
+
+    solver_A.fix_assignment_to_zero_with_constraints(2, 0, integral_assignments)
+    idx = solver_A._paper_number_to_lp_idx(2, 0)
+    assert solver_A.lp.get_bounds(idx) == (0, 0)
+    assert integral_assignments[idx] == 0
@@ -1,7 +1,10 @@
 from collections import namedtuple
+import copy
+import tracemalloc
 import pytest
 import numpy as np
 from matcher.solvers import SolverException, FairSequence
+from matcher.solvers.fairsequence import _ReviewerQueue
 from conftest import assert_arrays
 
 encoder = namedtuple(
@@ -917,3 +920,221 @@ def test_solvers_fairsequence_make_trades_2():
         ]
     )
     assert np.all(res_A == expected_solution)
+
+
+def test_solver_fairsequence_incremental_wef1_checks():
+    """
+    Tests 8 papers, 12 reviewers, for random partial allocations.
+    Purpose: Ensure that the WEF1 checks on the vectorized bundle values
+        agree with checking every paper's bundle directly.
+    """
+    rng = np.random.default_rng(0)
+    num_papers = 8
+    num_reviewers = 12
+    demands = [1, 2, 3, 1, 2, 3, 1, 2]
+    aggregate_score_matrix = np.round(
+        rng.random((num_papers, num_reviewers)), 1
+    )
+    solver = FairSequence(
+        [0] * num_reviewers,
+        [3] * num_reviewers,
+        demands,
+        encoder(aggregate_score_matrix, np.zeros((num_papers, num_reviewers))),
+    )
+    affinities = solver.affinity_matrix
+
+    for _ in range(20):
+        dict_alloc = {
+            p: rng.choice(
+                num_reviewers, rng.integers(0, 3), replace=False
+            ).tolist()
+            for p in range(num_papers)
+        }
+        own_values = solver._own_values(dict_alloc)
+        previous_attained_scores = np.ones(num_papers) * 1000
+        for p in range(num_papers):
+            if dict_alloc[p]:
+                previous_attained_scores[p] = np.min(
+                    affinities[dict_alloc[p], p]
+                )
+
+        for p in range(num_papers):
+            for r in set(range(num_reviewers)) - set(dict_alloc[p]):
+                bundle = dict_alloc[p] + [r]
+                expected = True
+                for p_prime in range(num_papers):
+                    values = affinities[bundle, p_prime]
+                    if np.all(values <= previous_attained_scores[p_prime]):
+                        continue
+                    other = (np.sum(values) - np.max(values)) / demands[p]
+                    curr = np.sum(affinities[dict_alloc[p_prime], p_prime])
+                    curr /= demands[p_prime]
+                    if other > curr and not np.isclose(other, curr):
+                        expected = False
+                assert expected == solver._is_valid_assignment(
+                    r,
+                    p,
+                    solver._bundle_values(p, dict_alloc),
+                    own_values,
+                    previous_attained_scores,
+                )
+
+
+def test_solver_fairsequence_many_papers_memory():
+    """
+    Tests 2000 papers, 100 reviewers, with random affinities.
+    Reviewers review min: 0, max: 20 papers.
+    Each paper needs 1 review.
+    Purpose: Ensure that the WEF1 picking sequence does not keep values for
+        every pair of papers, which would take 2 * 2000 * 2000 floats (64 MB).
+    """
+    num_papers = 2000
+    num_reviewers = 100
+    rng = np.random.default_rng(0)
+    aggregate_score_matrix = np.round(
+        rng.random((num_papers, num_reviewers)), 1
+    )
+    constraint_matrix = np.zeros((num_papers, num_reviewers))
+
+    tracemalloc.start()
+    try:
+        solver = FairSequence(
+            [0] * num_reviewers,
+            [20] * num_reviewers,
+            [1] * num_papers,
+            encoder(aggregate_score_matrix, constraint_matrix),
+        )
+        res = solver.solve()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert solver.safe_mode
+    assert_arrays(np.sum(res, axis=1), [1] * num_papers)
+    assert np.all(np.sum(res, axis=0) <= 20)
+    assert peak < 24 * 2**20
+
+
+def test_solver_fairsequence_reviewer_queue():
+    """
+    Tests the lazily sorted queue of the best reviewers of a paper, with many
+    ties in affinity.
+    Purpose: Ensure that sorting the queue one chunk at a time gives the
+        reviewers in decreasing affinity order, with ties broken by index,
+        and that removed reviewers are skipped.
+    """
+    rng = np.random.default_rng(0)
+    affinities = np.round(rng.random(200), 1)
+    queue = _ReviewerQueue(affinities)
+    assert list(queue) == []
+
+    while queue.sort_chunk():
+        pass
+    expected = np.argsort(-affinities, kind="stable").tolist()
+    assert list(queue) == expected
+
+    queue = _ReviewerQueue(affinities)
+    queue.sort_chunk()
+    queue.remove(expected[:5] + expected[10:12])
+    while queue.sort_chunk():
+        pass
+    assert list(queue) == expected[5:10] + expected[12:]
+    assert queue.removed == set(expected[10:12])
+
+    # copies do not share their removed reviewers
+    copied = copy.copy(queue)
+    queue.remove(expected[5:10])
+    assert list(queue) == expected[12:]
+    assert queue.removed == set()
+    assert list(copied) == expected[5:10] + expected[12:]
+
+    # the removed front of the queue is dropped once it is most of it
+    queue.remove(expected[12:150])
+    assert list(queue) == expected[150:]
+    assert queue.sorted_reviewers == expected[150:]
+
+
+def test_solvers_fairsequence_resume_picking_sequence():
+    """
+    Tests 30 papers, 20 reviewers, with a few strong reviewers, for random
+    affinity matrices on which the WEF1 picking sequence fails.
+    Reviewers review min: 0, max: 5 papers.
+    Each paper needs 3 reviews.
+    Purpose: Ensure that resuming the picking sequence without WEF1 guarantees
+        from the checkpoint of the failed one gives the same allocation as
+        running it from scratch.
+    """
+    for seed in range(3):
+        rng = np.random.default_rng(seed)
+        aggregate_score_matrix = np.round(
+            rng.random((30, 20)) * rng.random(20) ** 2, 2
+        )
+        aggregate_score_matrix[rng.random((30, 20)) < 0.2] = 0
+        constraint_matrix = np.zeros((30, 20))
+
+        solvers = []
+        for safe_mode in [True, False]:
+            solver = FairSequence(
+                [0] * 20,
+                [5] * 20,
+                [3] * 30,
+                encoder(aggregate_score_matrix, constraint_matrix),
+            )
+            solver.safe_mode = safe_mode
+            solver.solve()
+            assert solver.solved
+            solvers.append(solver)
+
+        assert not solvers[0].safe_mode
+        assert solvers[0].checkpoint is not None
+        assert np.array_equal(solvers[0].solution, solvers[1].solution)
+
+
+def test_solvers_fairsequence_multi_hop_trade(monkeypatch):
+    """
+    Tests 3 papers, 3 reviewers, where paper 0 conflicts with reviewers 1 and
+    2, and paper 1 conflicts with reviewer 2.
+    Reviewers review min: 0, max: 1 papers.
+    Each paper needs 1 review.
+    Purpose: Ensure that when the picking sequence assigns reviewer 0 to
+        paper 1 and reviewer 1 to paper 2, paper 0 gets its reviewer through
+        a trade of two hops: reviewer 0 moves to paper 0, reviewer 1 to
+        paper 1 and the available reviewer 2 to paper 2.
+    """
+    aggregate_score_matrix = np.array(
+        [
+            [0.5, 0.4, 0.4],
+            [0.9, 0.6, 0.1],
+            [0.3, 0.8, 0.3],
+        ]
+    )
+    constraint_matrix = np.array(
+        [
+            [0, -1, -1],
+            [0, 0, -1],
+            [0, 0, 0],
+        ]
+    )
+    solver = FairSequence(
+        [0] * 3,
+        [1] * 3,
+        [1] * 3,
+        encoder(aggregate_score_matrix, constraint_matrix),
+    )
+
+    trades = []
+    find_trade = solver._find_trade
+
+    def record_trade(*args):
+        trades.append(find_trade(*args))
+        return trades[-1]
+
+    monkeypatch.setattr(solver, "_find_trade", record_trade)
+    res = solver.solve()
+
+    assert not solver.safe_mode
+    assert trades == [[(-1, 0), (0, 1), (1, 2), (2, -1)]]
+    assert_arrays(np.sum(res, axis=1), [1, 1, 1])
+    assert_arrays(np.sum(res, axis=0), [1, 1, 1])
+    assert np.all(res[constraint_matrix != 0] == 0)
+    assert np.all(res == np.eye(3))
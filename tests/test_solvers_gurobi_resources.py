@@ -0,0 +1,91 @@
+from collections import namedtuple
+import pytest
+import numpy as np
+from matcher.core import SolverException
+from matcher.solvers import FairIR
+from matcher.solvers.gurobi_resources import available_cpus, get_resources
+
+encoder = namedtuple('Encoder', ['aggregate_score_matrix', 'constraint_matrix', 'attribute_constraints'])
+
+
+@pytest.fixture
+def clean_environment(monkeypatch):
+    for env_var in [
+        "MATCHER_GUROBI_THREADS",
+        "MATCHER_GUROBI_MEMORY_LIMIT",
+        "MATCHER_GUROBI_METHOD",
+        "MATCHER_GUROBI_TIME_LIMIT",
+        "MATCHER_CONCURRENT_WORKERS",
+    ]:
+        monkeypatch.delenv(env_var, raising=False)
+    return monkeypatch
+
+
+def fairir_solver(resources):
+    aggregate_score_matrix_A = np.transpose(np.array([
+        [0.2, 0.5, 0.1],
+        [0.4, 0.1, 0.3],
+        [0.6, 0.7, 0.2],
+        [0.1, 0.9, 0.8]
+    ]))
+    constraint_matrix = np.zeros(np.shape(aggregate_score_matrix_A))
+    return FairIR(
+        [0,0,0,0],
+        [2,2,2,2],
+        [2,2,2],
+        encoder(aggregate_score_matrix_A, constraint_matrix, None),
+        resources=resources,
+    )
+
+
+def test_gurobi_resources_defaults(clean_environment):
+    '''Without settings, one worker gets every CPU and no other limits'''
+    resources = get_resources()
+    assert resources["cpus"] == available_cpus()
+    assert resources["threads"] == available_cpus()
+    assert resources["concurrent_workers"] == 1
+    assert resources["memory_limit"] is None
+    assert resources["method"] is None
+    assert resources["time_limit"] is None
+
+
+def test_gurobi_resources_split_between_workers(clean_environment):
+    '''Concurrent workers split the CPUs and the memory of the host'''
+    cpus = available_cpus()
+    resources = get_resources({"concurrent_workers": 2 * cpus})
+    assert resources["threads"] == 1
+    assert resources["memory_limit"] > 0
+
+    clean_environment.setenv("MATCHER_CONCURRENT_WORKERS", "1")
+    resources = get_resources()
+    assert resources["threads"] == cpus
+    assert resources["memory_limit"] is None
+
+
+def test_gurobi_resources_precedence(clean_environment):
+    '''Configured settings override the environment, which overrides the defaults'''
+    clean_environment.setenv("MATCHER_GUROBI_THREADS", "3")
+    clean_environment.setenv("MATCHER_GUROBI_METHOD", "1")
+    clean_environment.setenv("MATCHER_GUROBI_TIME_LIMIT", "60")
+    resources = get_resources({"threads": "2", "method": None, "time_limit": ""})
+    assert resources["threads"] == 2
+    assert resources["method"] == 1
+    assert resources["time_limit"] == 60.0
+
+
+def test_solvers_fairir_gurobi_resources(clean_environment):
+    '''FairIR sets the resolved resources as Gurobi parameters'''
+    solver = fairir_solver({"threads": 1, "method": 1, "time_limit": 30})
+    assert solver.lp.model.Params.Threads == 1
+    assert solver.lp.model.Params.Method == 1
+    assert solver.lp.model.Params.TimeLimit == 30
+    res = solver.solve()
+    assert res.shape == (3,4)
+    assert solver.resources["threads"] == 1
+
+
+def test_solvers_fairir_time_limit(clean_environment):
+    '''FairIR raises a SolverException when an LP solve hits the time limit'''
+    solver = fairir_solver({"time_limit": 0})
+    with pytest.raises(SolverException, match="time limit"):
+        solver.solve()
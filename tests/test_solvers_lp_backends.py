@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from matcher.solvers import SolverException
+from matcher.solvers.gurobi_resources import get_resources
+from matcher.solvers.lp_backends import (
+    LP_BACKENDS,
+    LESS_EQUAL,
+    GREATER_EQUAL,
+    EQUAL,
+    OPTIMAL,
+    INFEASIBLE,
+)
+from conftest import assert_arrays
+
+
+def small_lp(lp_backend):
+    """max x0 + 2 x1 + 3 x2 s.t. x0 + x1 + x2 == 2, x1 + x2 <= 1.5,
+    x0 >= 0.2 over [0, 1]^3."""
+    lp = LP_BACKENDS[lp_backend]("test", get_resources())
+    lp.add_variables(np.array([1.0, 2.0, 3.0]), ["x0", "x1", "x2"])
+    cov = lp.add_constraints(
+        sparse.csr_matrix(np.ones((1, 3))), EQUAL, np.array([2.0]), ["cov"]
+    )
+    rows = lp.add_constraints(
+        sparse.csr_matrix(np.array([[0.0, 1.0, 1.0], [1.0, 0.0, 0.0]])),
+        np.array([LESS_EQUAL, GREATER_EQUAL]),
+        np.array([1.5, 0.2]),
+        ["cap", "low"],
+    )
+    return lp, cov, rows
+
+
+@pytest.mark.parametrize("lp_backend", ["gurobi", "highs"])
+def test_lp_backends_update_between_solves(lp_backend):
+    """Fixed variables and right hand sides apply to the next solve"""
+    lp, cov, rows = small_lp(lp_backend)
+    assert_arrays(cov, [0])
+    assert_arrays(rows, [1, 2])
+    assert lp.num_variables == 3
+    assert lp.num_constraints == 3
+
+    assert lp.solve() == OPTIMAL
+    np.testing.assert_allclose(lp.values(), [0.5, 0.5, 1.0], atol=1e-9)
+
+    # drop the capacity row
+    lp.set_rhs(rows[:1], np.inf)
+    assert lp.get_rhs(rows[:1])[0] == np.inf
+    assert lp.solve() == OPTIMAL
+    np.testing.assert_allclose(lp.values(), [0.2, 0.8, 1.0], atol=1e-9)
+
+    lp.fix_variables(np.array([2]), 0.0)
+    assert lp.get_bounds(2) == (0, 0)
+    assert lp.solve() == OPTIMAL
+    np.testing.assert_allclose(lp.values(), [1.0, 1.0, 0.0], atol=1e-9)
+
+    lp.set_rhs(rows[1:], 1.5)
+    assert lp.solve() == INFEASIBLE
+
+
+def test_highs_lp_backend_without_gurobipy(monkeypatch):
+    """The HiGHS backend solves without importing gurobipy"""
+    monkeypatch.setitem(sys.modules, "gurobipy", None)
+    lp, _, _ = small_lp("highs")
+    assert lp.solve() == OPTIMAL
+    with pytest.raises(ImportError):
+        small_lp("gurobi")
+
+
+def test_highs_lp_backend_snaps_integral_values():
+    """Values within the feasibility tolerance of 0 or 1 are snapped"""
+    lp = LP_BACKENDS["highs"]("test", get_resources())
+    lp.add_variables(np.array([1.0, 0.5]), ["x0", "x1"])
+    lp.add_constraints(
+        sparse.csr_matrix(np.ones((1, 2))),
+        EQUAL,
+        np.array([2 - 5e-8]),
+        ["cov"],
+    )
+    assert lp.solve() == OPTIMAL
+    assert lp.values().tolist() == [1.0, 1.0]
+
+
+def test_highs_lp_backend_unavailable(monkeypatch):
+    """Without the HiGHS bindings, the solvers still import, and only the
+    HiGHS backend fails, with a SolverException"""
+    block_highs = (
+        "import sys; "
+        "sys.modules['highspy'] = None; "
+        "sys.modules['scipy.optimize._highspy'] = None; "
+        "import matcher.solvers"
+    )
+    subprocess.run(
+        [sys.executable, "-c", block_highs],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+    monkeypatch.setitem(sys.modules, "highspy", None)
+    monkeypatch.setitem(sys.modules, "scipy.optimize._highspy", None)
+    with pytest.raises(SolverException, match="highspy"):
+        small_lp("highs")
@@ -2,7 +2,8 @@
 from collections import namedtuple
 import pytest
 import numpy as np
-from matcher.solvers import MinMaxSolver
+from matcher.encoder import Encoder
+from matcher.solvers import MinMaxSolver, SimpleSolver
 
 encoder = namedtuple("Encoder", ["cost_matrix", "constraint_matrix"])
 
@@ -544,3 +545,306 @@ def test_solver_minmax_avoid_zero_scores_get_no_solution():
 
     res = solver.solve()
     assert solver.solved is False
+
+
+def test_solver_minmax_sparse_encoder():
+    """
+    Tests 6 papers, 8 reviewers, with a real Encoder in dense and sparse mode.
+    Purpose: Assert that the sparse cost and constraint matrices give the same
+    assignment as the dense ones.
+    """
+    papers = ["paper{}".format(i) for i in range(6)]
+    reviewers = ["reviewer{}".format(i) for i in range(8)]
+    rng = np.random.default_rng(0)
+    edges = [
+        (paper, reviewer, float(np.round(rng.random(), 2)))
+        for paper in papers
+        for reviewer in reviewers
+        if rng.random() < 0.6
+    ]
+    constraints = [
+        ("paper0", "reviewer0", -1),
+        ("paper1", "reviewer1", 1),
+        ("paper3", "reviewer5", -1),
+    ]
+
+    solvers = []
+    for sparse in [False, True]:
+        solver = MinMaxSolver(
+            [1] * 8,
+            [3] * 8,
+            [2] * 6,
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                {"mock/-/affinity": {"edges": edges}},
+                {"mock/-/affinity": 1},
+                sparse=sparse,
+            ),
+        )
+        solver.solve()
+        assert solver.solved
+        solvers.append(solver)
+
+    dense_solver, sparse_solver = solvers
+    assert sparse_solver.sparse
+    assert sparse_solver.cost == dense_solver.cost
+    assert sparse_solver.optimal_cost == dense_solver.optimal_cost
+    assert np.array_equal(
+        sparse_solver.flow_matrix.toarray(), dense_solver.flow_matrix
+    )
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_solver_minmax_single_flow_matches_two_phase(sparse):
+    """
+    Tests 12 papers, 20 reviewers, with random scores and constraints.
+    Purpose: Assert that the single flow mode satisfies the same minimums,
+    maximums and demands as the two SimpleSolver iterations, at the same or
+    lower cost.
+    """
+    papers = ["paper{}".format(i) for i in range(12)]
+    reviewers = ["reviewer{}".format(i) for i in range(20)]
+    rng = np.random.default_rng(1)
+    edges = [
+        (paper, reviewer, float(np.round(rng.random(), 2)))
+        for paper in papers
+        for reviewer in reviewers
+        if rng.random() < 0.7
+    ]
+    constraints = [
+        ("paper0", "reviewer0", -1),
+        ("paper1", "reviewer1", 1),
+        ("paper3", "reviewer5", -1),
+    ]
+    minimums = [1] * 10 + [2] * 10
+    maximums = [4] * 20
+    demands = [3] * 12
+
+    solvers = []
+    for single_flow in [False, True]:
+        solver = MinMaxSolver(
+            list(minimums),
+            maximums,
+            demands,
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                {"mock/-/affinity": {"edges": edges}},
+                {"mock/-/affinity": 1},
+                sparse=sparse,
+            ),
+            single_flow=single_flow,
+        )
+        solver.solve()
+        assert solver.solved
+        solvers.append(solver)
+
+    two_phase_solver, single_flow_solver = solvers
+    for solver in solvers:
+        flows = solver.flow_matrix
+        if sparse:
+            flows = flows.toarray()
+        assert np.all(flows.sum(axis=0) >= minimums)
+        assert np.all(flows.sum(axis=0) <= maximums)
+        assert np.array_equal(flows.sum(axis=1), demands)
+        assert np.all(flows <= 1)
+        assert flows[0, 0] == 0
+        assert flows[1, 1] == 1
+    assert single_flow_solver.optimal_cost <= two_phase_solver.optimal_cost
+    assert single_flow_solver.cost <= two_phase_solver.cost
+
+
+def test_solver_minmax_single_flow_minimums():
+    """
+    Tests 3 papers, 4 reviewers, as in test_solver_minmax_respects_two_minimum.
+    Purpose: Make sure the single flow mode gives every reviewer (including
+    reviewer 4) their minimum, and that it fails like the two phase mode
+    when the minimums can't be met.
+    """
+    cost_matrix = np.transpose(
+        np.array([[0, 0, 0], [0, 0, 0], [0, 0, 0], [2000, 2000, 2000]])
+    )
+    constraint_matrix = np.zeros(np.shape(cost_matrix))
+    solver = MinMaxSolver(
+        [2] * 4,
+        [3] * 4,
+        [3] * 3,
+        encoder(cost_matrix, constraint_matrix),
+        allow_zero_score_assignments=True,
+        single_flow=True,
+    )
+    res = solver.solve()
+    assert solver.solved
+    assert np.all(res.sum(axis=0) >= 2)
+    check_solution(solver, 4000)
+
+    constraint_matrix[:, 3] = -1
+    constraint_matrix[0, 3] = 0
+    solver = MinMaxSolver(
+        [2] * 4,
+        [3] * 4,
+        [3] * 3,
+        encoder(cost_matrix, constraint_matrix),
+        allow_zero_score_assignments=True,
+        single_flow=True,
+    )
+    solver.solve()
+    assert solver.solved is False
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("processes", [1, 2])
+def test_solver_minmax_decompose(sparse, processes):
+    """
+    Tests 12 papers, 16 reviewers, in 4 tracks: reviewers only have scores
+    for the papers in their track.
+    Purpose: Assert that solving each track separately gives the same
+    optimal cost as solving them together.
+    """
+    papers = ["paper{}".format(i) for i in range(12)]
+    reviewers = ["reviewer{}".format(i) for i in range(16)]
+    rng = np.random.default_rng(2)
+    edges = [
+        (paper, reviewer, float(np.round(rng.random(), 2)) + 0.01)
+        for paper_index, paper in enumerate(papers)
+        for reviewer_index, reviewer in enumerate(reviewers)
+        if paper_index // 3 == reviewer_index // 4
+    ]
+    constraints = [("paper0", "reviewer0", -1), ("paper4", "reviewer5", 1)]
+
+    solvers = []
+    for decompose in [False, True]:
+        solver = MinMaxSolver(
+            [1] * 16,
+            [2] * 16,
+            [2] * 12,
+            Encoder(
+                reviewers,
+                papers,
+                constraints,
+                {"mock/-/affinity": {"edges": edges}},
+                {"mock/-/affinity": 1},
+                sparse=sparse,
+            ),
+            single_flow=True,
+            decompose=decompose,
+            processes=processes,
+        )
+        solver.solve()
+        assert solver.solved
+        solvers.append(solver)
+
+    whole_solver, decomposed_solver = solvers
+    flows = decomposed_solver.flow_matrix
+    if sparse:
+        flows = flows.toarray()
+    assert np.array_equal(flows.sum(axis=1), [2] * 12)
+    assert np.all(flows.sum(axis=0) >= 1)
+    assert np.all(flows.sum(axis=0) <= 2)
+    assert flows[0, 0] == 0
+    assert flows[4, 5] == 1
+    assert decomposed_solver.cost == whole_solver.cost
+
+
+@pytest.mark.parametrize("single_flow", [False, True])
+@pytest.mark.parametrize("candidate_limit", [1, 3])
+def test_solver_minmax_candidate_limit(single_flow, candidate_limit):
+    """
+    Tests 30 papers, 40 reviewers, with random costs, conflicts and forced
+    assignments.
+    Purpose: Assert that solving a pruned graph, with excluded arcs added
+    until the solution is certified optimal, gives the same optimal cost as
+    solving the full graph.
+    """
+    rng = np.random.default_rng(3)
+    cost_matrix = -rng.integers(1, 1000, size=(30, 40))
+    constraint_matrix = np.where(rng.random((30, 40)) < 0.05, -1, 0)
+    constraint_matrix[0, :2] = 1
+
+    solvers = []
+    for limit in [None, candidate_limit]:
+        solver = MinMaxSolver(
+            [1] * 40,
+            [4] * 40,
+            [3] * 30,
+            encoder(cost_matrix, constraint_matrix),
+            single_flow=single_flow,
+            candidate_limit=limit,
+        )
+        res = solver.solve()
+        assert solver.solved
+        assert np.all(res[constraint_matrix == -1] == 0)
+        assert np.array_equal(res.sum(axis=1), [3] * 30)
+        solvers.append(solver)
+
+    full_solver, pruned_solver = solvers
+    if single_flow:
+        assert pruned_solver.optimal_cost == full_solver.optimal_cost
+
+
+def test_simple_solver_candidate_limit():
+    """
+    Tests 3 papers, 3 reviewers, where every paper's cheapest reviewer is
+    reviewer 0, and every reviewer's cheapest paper is paper 0.
+    Purpose: Assert that the excluded arcs are added when the candidate arcs
+    alone have no feasible solution.
+    """
+    cost_matrix = np.array([[-10, -10, -10], [-9, -1, -1], [-8, -1, -1]])
+    constraint_matrix = np.zeros((3, 3))
+
+    full_solver = SimpleSolver(
+        [1] * 3, [1] * 3, cost_matrix, constraint_matrix
+    )
+    full_solver.solve()
+
+    solver = SimpleSolver(
+        [1] * 3, [1] * 3, cost_matrix, constraint_matrix, candidate_limit=1
+    )
+    assert (
+        solver.min_cost_flow.num_arcs() < full_solver.min_cost_flow.num_arcs()
+    )
+    res = solver.solve()
+    assert solver.solved
+    assert solver.min_cost_flow.optimal_cost() == -20
+    assert np.array_equal(res.sum(axis=0), [1] * 3)
+    assert np.array_equal(res.sum(axis=1), [1] * 3)
+
+
+def test_simple_solver_candidate_limit_potential_rounds(monkeypatch):
+    """
+    Tests 30 papers, 40 reviewers, with random costs and conflicts, when the
+    node potentials may not take more than one round of Bellman-Ford.
+    Purpose: Assert that the solver falls back to the full graph when the
+    potentials do not settle, and still finds the optimal cost.
+    """
+    rng = np.random.default_rng(3)
+    cost_matrix = -rng.integers(1, 1000, size=(30, 40))
+    constraint_matrix = np.where(rng.random((30, 40)) < 0.05, -1, 0)
+
+    full_solver = SimpleSolver(
+        [3] * 40, [4] * 30, cost_matrix, constraint_matrix
+    )
+    full_solver.solve()
+
+    monkeypatch.setattr(SimpleSolver, "max_potential_rounds", 1)
+    solver = SimpleSolver(
+        [3] * 40, [4] * 30, cost_matrix, constraint_matrix, candidate_limit=5
+    )
+    assert len(solver._excluded_arcs[0])
+    status = solver.min_cost_flow.solve()
+    assert status == solver.min_cost_flow.OPTIMAL
+    flows = solver.min_cost_flow.flows(
+        np.arange(solver.min_cost_flow.num_arcs(), dtype=np.int32)
+    )
+    assert solver._node_potentials(flows) is None
+
+    solver.solve()
+    assert solver.solved
+    assert len(solver._excluded_arcs[0]) == 0
+    assert (
+        solver.min_cost_flow.optimal_cost()
+        == full_solver.min_cost_flow.optimal_cost()
+    )